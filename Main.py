@@ -1,29 +1,35 @@
 # ~~~~~~~~~~~~ Imports ~~~~~~~~~~~~
 import os
+import json
 import argparse
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from Utils.Agents import Cardiologist, Psychologist, Pulmonologist, MultidisciplinaryTeam
+from Utils.AnalysisEngine import AnalysisEngine, PipelineHooks, get_engine
+from Utils.BatchRunner import BatchRunner, print_summary
 from Utils.PDFProcessor import PDFProcessor
+from Utils.ExtractionCache import get_extraction_cache
+from Utils.ModelRegistry import BACKENDS, set_backend
 
 # ~~~~~~~~~~~~ Load Environment Variables ~~~~~~~~~~~~
+# Heavy dependencies (the Gemini client, PDF libraries) load on first use
 load_dotenv('apikey.env')
 
 def process_medical_report(file_path):
-    """Process medical report from either text file or PDF"""
+    """Process medical report from either text file or PDF.
+
+    Returns (report text, structured form data or None), or (None, None) on failure.
+    """
     if not os.path.exists(file_path):
         print(f"❌ File not found: {file_path}")
-        return None
+        return None, None
     
     file_extension = os.path.splitext(file_path)[1].lower()
     
     if file_extension == '.pdf':
         print("📄 Processing PDF file...")
         pdf_processor = PDFProcessor(file_path)
-        extraction_result = pdf_processor.process_pdf()
+        extraction_result, medical_report = pdf_processor.process_with_cache(get_extraction_cache())
         
         if extraction_result['success']:
-            medical_report = pdf_processor.format_for_agents(extraction_result)
             print("✅ PDF processed successfully")
             
             # Save extracted text for reference
@@ -33,10 +39,10 @@ def process_medical_report(file_path):
                 f.write(medical_report)
             print(f"📝 Extracted text saved to: {extracted_text_path}")
             
-            return medical_report
+            return medical_report, extraction_result.get('structured_data')
         else:
             print("❌ Failed to extract text from PDF")
-            return None
+            return None, None
             
     elif file_extension == '.txt':
         print("📝 Processing text file...")
@@ -44,14 +50,43 @@ def process_medical_report(file_path):
             with open(file_path, "r", encoding="utf-8") as file:
                 medical_report = file.read()
             print("✅ Text file processed successfully")
-            return medical_report
+            return medical_report, None
         except Exception as e:
             print(f"❌ Error reading text file: {e}")
-            return None
+            return None, None
     else:
         print(f"❌ Unsupported file format: {file_extension}")
         print("Supported formats: .pdf, .txt")
-        return None
+        return None, None
+
+class ConsoleHooks(PipelineHooks):
+    """Print pipeline progress to the console"""
+
+    def on_routing(self, decision):
+        print(f"🧭 Specialists: {', '.join(decision['selected']) or 'none'} ({decision['reason']})")
+
+    def on_agent_done(self, agent_name, response):
+        print(f"✅ {agent_name} completed analysis")
+
+    def on_team_start(self):
+        print("\n🏥 Running multidisciplinary team analysis...")
+
+def run_batch(args, use_cache):
+    """Analyze every report under --batch, resuming where a previous run stopped"""
+    engine = AnalysisEngine(max_concurrency=args.max_concurrency) if args.max_concurrency else get_engine()
+    runner = BatchRunner(engine, output_dir=args.output_dir, extract_workers=args.extract_workers,
+                         max_in_flight=args.max_in_flight, use_cache=use_cache, force=args.force,
+                         run_all=args.all_specialists)
+    summary = runner.run(args.batch)
+    print_summary(summary)
+    
+    summary_path = os.path.join(args.output_dir, "batch_summary.json")
+    os.makedirs(args.output_dir, exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"\n📁 Summary saved to: {summary_path}")
+    if summary['failed']:
+        exit(1)
 
 def main():
     # ~~~~~~~~~~~~ Parse Command Line Arguments ~~~~~~~~~~~~
@@ -60,49 +95,52 @@ def main():
                        help='Path to medical report file (.txt or .pdf)',
                        default=os.path.join("Medical Reports", "Medical Rerort - Michael Johnson - Panic Attack Disorder.txt"))
     
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Bypass the LLM response cache for this run')
+    
+    parser.add_argument('--all-specialists', action='store_true',
+                       help='Run every specialist instead of only the ones relevant to the report')
+    
+    parser.add_argument('--backend', choices=sorted(BACKENDS),
+                       help='Model backend (default: MODEL_BACKEND or gemini; "local" needs no API key)')
+    
+    # ~~~~~~~~~~~~ Batch Mode ~~~~~~~~~~~~
+    parser.add_argument('--batch', '-b',
+                       help='Directory or glob of reports to analyze (e.g. "archive/**/*.pdf")')
+    parser.add_argument('--output-dir', default=os.path.join("results", "batch"),
+                       help='Batch mode: folder that gets one sub-folder per report')
+    parser.add_argument('--extract-workers', type=int,
+                       help='Batch mode: PDF extraction processes (default: 2, or the CPU count if lower)')
+    parser.add_argument('--max-in-flight', type=int,
+                       help='Batch mode: reports extracted or analyzed at once')
+    parser.add_argument('--max-concurrency', type=int,
+                       help='Model calls in flight across the batch (default: MAX_CONCURRENT_MODEL_CALLS)')
+    parser.add_argument('--force', action='store_true',
+                       help='Batch mode: re-analyze reports that already completed')
+    
     args = parser.parse_args()
+    use_cache = not args.no_cache
+    if args.backend:
+        set_backend(args.backend)
+    
+    if args.batch:
+        run_batch(args, use_cache)
+        return
     
     # ~~~~~~~~~~~~ Process Medical Report ~~~~~~~~~~~~
-    medical_report = process_medical_report(args.file)
+    medical_report, structured_data = process_medical_report(args.file)
     if not medical_report:
         exit(1)
     
     print(f"\n🔍 Analyzing medical report from: {args.file}")
     
-    # ~~~~~~~~~~~~ Initialize Specialist Agents ~~~~~~~~~~~~
-    agents = {
-        "Cardiologist": Cardiologist(medical_report),
-        "Psychologist": Psychologist(medical_report),
-        "Pulmonologist": Pulmonologist(medical_report)
-    }
-
     # ~~~~~~~~~~~~ Concurrent Agent Execution ~~~~~~~~~~~~
-    def get_response(agent_name, agent):
-        try:
-            return agent_name, agent.run()
-        except Exception as e:
-            print(f"⚠️ Error in {agent_name}: {e}")
-            return agent_name, "No response."
-
-    responses = {}
     print("\n🤖 Running AI agents in parallel...")
-    
-    with ThreadPoolExecutor() as executor:
-        futures = {executor.submit(get_response, name, agent): name for name, agent in agents.items()}
-        for future in as_completed(futures):
-            agent_name, response = future.result()
-            responses[agent_name] = response
-            print(f"✅ {agent_name} completed analysis")
-
-    # ~~~~~~~~~~~~ Run Multidisciplinary Team Agent ~~~~~~~~~~~~
-    print("\n🏥 Running multidisciplinary team analysis...")
-    team_agent = MultidisciplinaryTeam(
-        cardiologist_report=responses.get("Cardiologist", ""),
-        psychologist_report=responses.get("Psychologist", ""),
-        pulmonologist_report=responses.get("Pulmonologist", "")
+    engine = get_engine()
+    responses, final_diagnosis = engine.run(
+        engine.analyze(medical_report, use_cache=use_cache, hooks=ConsoleHooks(), run_all=args.all_specialists,
+                       structured_data=structured_data)
     )
-
-    final_diagnosis = team_agent.run()
     final_diagnosis_text = "### Final Diagnosis:\n\n" + (final_diagnosis or "No diagnosis returned.")
 
     # ~~~~~~~~~~~~ Save Output to File ~~~~~~~~~~~~
@@ -1,183 +1,24 @@
 import os
-import pdfplumber
-import pytesseract
-from PIL import Image
-from pdf2image import convert_from_path
-import PyPDF2
-import re
-from typing import Dict, List, Optional
-import google.generativeai as genai
-
-class PDFProcessor:
-    def __init__(self, pdf_path: str):
-        self.pdf_path = pdf_path
-        self.extracted_text = ""
-        self.structured_data = {}
-        
-    def extract_text_pdfplumber(self) -> str:
-        """Extract text using pdfplumber (best for forms and structured PDFs)"""
-        try:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                return text
-        except Exception as e:
-            print(f"❌ Error with pdfplumber: {e}")
-            return ""
-    
-    def extract_text_pypdf2(self) -> str:
-        """Fallback method using PyPDF2"""
-        try:
-            with open(self.pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
-        except Exception as e:
-            print(f"❌ Error with PyPDF2: {e}")
-            return ""
-    
-    def extract_text_ocr(self) -> str:
-        """Extract text using OCR for scanned PDFs"""
-        try:
-            # Convert PDF to images
-            images = convert_from_path(self.pdf_path)
-            text = ""
-            
-            for i, image in enumerate(images):
-                # Use OCR to extract text from image
-                page_text = pytesseract.image_to_string(image)
-                text += f"--- Page {i+1} ---\n{page_text}\n"
-            
-            return text
-        except Exception as e:
-            print(f"❌ Error with OCR: {e}")
-            return ""
-    
-    def extract_form_data(self) -> Dict:
-        """Extract structured form data from medical incident reports"""
-        form_data = {}
-        
-        try:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                for page in pdf.pages:
-                    # Extract tables if any
-                    tables = page.extract_tables()
-                    if tables:
-                        form_data['tables'] = tables
-                    
-                    # Extract text and look for form fields
-                    text = page.extract_text()
-                    if text:
-                        # Parse common medical form fields
-                        form_data.update(self.parse_medical_form_fields(text))
-                        
-        except Exception as e:
-            print(f"❌ Error extracting form data: {e}")
-            
-        return form_data
-    
-    def parse_medical_form_fields(self, text: str) -> Dict:
-        """Parse common medical form fields using regex patterns"""
-        fields = {}
-        
-        # Common patterns for medical forms
-        patterns = {
-            'patient_name': r'(?:Name|Patient Name|PATIENT NAME)[\s:]*([A-Za-z\s]+)',
-            'date_of_birth': r'(?:DOB|Date of Birth|Birth Date)[\s:]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            'incident_date': r'(?:Date|Incident Date|Date of Incident)[\s:]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            'age': r'(?:Age)[\s:]*(\d{1,3})',
-            'gender': r'(?:Gender|Sex)[\s:]*([MF]|Male|Female)',
-            'staff_id': r'(?:Staff ID|Staff No|Employee ID)[\s:]*(\d+)',
-            'location': r'(?:Location|Where)[\s:]*([A-Za-z\s]+)',
-            'symptoms': r'(?:Symptoms|Signs|Complaint)[\s:]*([A-Za-z\s,.-]+)',
-            'injury_type': r'(?:Injury|Type of Injury)[\s:]*([A-Za-z\s,.-]+)',
-        }
-        
-        for field, pattern in patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                fields[field] = match.group(1).strip()
-        
-        return fields
-    
-    def process_pdf(self) -> Dict:
-        """Main method to process PDF and extract all relevant information"""
-        result = {
-            'success': False,
-            'text': '',
-            'structured_data': {},
-            'method_used': ''
-        }
-        
-        print(f"🔍 Processing PDF: {self.pdf_path}")
-        
-        # Try different extraction methods
-        methods = [
-            ('pdfplumber', self.extract_text_pdfplumber),
-            ('pypdf2', self.extract_text_pypdf2),
-            ('ocr', self.extract_text_ocr)
-        ]
-        
-        for method_name, method_func in methods:
-            print(f"📄 Trying {method_name}...")
-            text = method_func()
-            
-            if text and len(text.strip()) > 50:  # Ensure meaningful text
-                result['text'] = text
-                result['method_used'] = method_name
-                result['success'] = True
-                print(f"✅ Successfully extracted text using {method_name}")
-                break
-        
-        # Extract structured form data
-        if result['success']:
-            result['structured_data'] = self.extract_form_data()
-            
-        return result
-    
-    def format_for_agents(self, extraction_result: Dict) -> str:
-        """Format extracted data for medical agents"""
-        if not extraction_result['success']:
-            return "Error: Could not extract text from PDF"
-        
-        formatted_text = f"""
-Medical Report Analysis
-=======================
-Extraction Method: {extraction_result['method_used']}
-
-RAW TEXT CONTENT:
-{extraction_result['text']}
-
-STRUCTURED DATA EXTRACTED:
-"""
-        
-        structured_data = extraction_result['structured_data']
-        if structured_data:
-            for key, value in structured_data.items():
-                if key != 'tables':
-                    formatted_text += f"{key.replace('_', ' ').title()}: {value}\n"
-            
-            # Add tables if present
-            if 'tables' in structured_data:
-                formatted_text += "\nTABULAR DATA:\n"
-                for i, table in enumerate(structured_data['tables']):
-                    formatted_text += f"Table {i+1}:\n{table}\n"
-        
-        return formatted_text        
-
-# --- Agent classes (place at the bottom of Agents.py, NOT inside any method) ---
+import asyncio
+from Utils.ResponseCache import get_response_cache
+from Utils.RateLimiter import get_rate_limiter
+from Utils.ModelRegistry import get_model, model_key
+from Utils.ReportCompactor import compact_reports
+from Utils.Tokens import estimate_tokens
+
+
 class Agent:
+    model_name = "gemini-2.5-flash"
+    generation_config = None
+
     def __init__(self, medical_report=None, role=None, extra_info=None):
         self.medical_report = medical_report
         self.role = role
         self.extra_info = extra_info
-        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
+        self.model = get_model(self.model_name, self.generation_config)
+        self.model_key = model_key(self.model_name)
+        self.response_cache = get_response_cache()
+        self.rate_limiter = get_rate_limiter()
         self.prompt_template = self.create_prompt_template()
 
     def create_prompt_template(self):
@@ -205,14 +46,123 @@ Medical Report:
 {medical_report}
 """
 
-    def run(self):
-        prompt = self.prompt_template.format(medical_report=self.medical_report)
+    def build_prompt(self):
+        return self.prompt_template.format(medical_report=self.medical_report)
+
+    def _cached_response(self, prompt, use_cache):
+        cache = self.response_cache if use_cache else None
+        if cache is None:
+            return None
+        cached = cache.get(self.model_key, self.role, prompt)
+        if cached is not None:
+            print(f"⚡ Response cache hit for {self.role}")
+        return cached
+
+    def _store_response(self, prompt, text, use_cache):
+        if use_cache and self.response_cache is not None:
+            self.response_cache.put(self.model_key, self.role, prompt, text)
+
+    def run(self, use_cache=True):
+        prompt = self.build_prompt()
+        cached = self._cached_response(prompt, use_cache)
+        if cached is not None:
+            return cached
+        try:
+            response = self.rate_limiter.call_sync(lambda: self.model.generate_content(prompt), estimate_tokens(prompt))
+            text = response.text
+        except Exception as e:
+            print("Error occurred:", e)
+            return None
+        self._store_response(prompt, text, use_cache)
+        return text
+
+    async def run_async(self, use_cache=True):
+        """Same as run(), using the async generate API so it can run on an event loop"""
+        prompt = self.build_prompt()
+        cached = self._cached_response(prompt, use_cache)
+        if cached is not None:
+            return cached
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            response = await self.rate_limiter.call(lambda: self.model.generate_content_async(prompt),
+                                                    estimate_tokens(prompt))
+            text = response.text
         except Exception as e:
             print("Error occurred:", e)
             return None
+        self._store_response(prompt, text, use_cache)
+        return text
+
+    async def run_stream_async(self, on_chunk=None, use_cache=True):
+        """Stream the response, calling on_chunk(text, tokens_received) as chunks arrive.
+
+        Returns the full text, or None on error, like run().
+        """
+        prompt = self.build_prompt()
+        cached = self._cached_response(prompt, use_cache)
+        if cached is not None:
+            if on_chunk:
+                on_chunk(cached, estimate_tokens(cached))
+            return cached
+        parts = []
+
+        async def open_stream():
+            # Retries and hedging cover the wait for the first chunk; once text has
+            # been handed to on_chunk the stream can't be restarted
+            stream = (await self.model.generate_content_async(prompt, stream=True)).__aiter__()
+            try:
+                return await stream.__anext__(), stream
+            except StopAsyncIteration:
+                return None, None
+            except BaseException:
+                # Timed out, or cancelled as a losing hedge: don't leave the request open
+                if hasattr(stream, 'aclose'):
+                    await stream.aclose()
+                raise
+
+        async def chunks(first, stream):
+            if first is None:
+                return
+            timeout = self.rate_limiter.call_timeout or None
+            try:
+                yield first
+                while True:
+                    try:
+                        # Bound every wait, so a stream that stalls mid-response can't hold a model-call slot
+                        chunk = await asyncio.wait_for(stream.__anext__(), timeout)
+                    except StopAsyncIteration:
+                        return
+                    except asyncio.TimeoutError:
+                        raise TimeoutError(f"Response stream stalled for {timeout:.0f}s")
+                    yield chunk
+            finally:
+                if hasattr(stream, 'aclose'):
+                    try:
+                        await stream.aclose()
+                    except Exception:
+                        pass
+
+        received = None
+        try:
+            first, stream = await self.rate_limiter.call(open_stream, estimate_tokens(prompt), kind='first_chunk')
+            received = chunks(first, stream)
+            async for chunk in received:
+                text = chunk.text
+                if not text:
+                    continue
+                parts.append(text)
+                if on_chunk:
+                    usage = getattr(chunk, 'usage_metadata', None)
+                    tokens = getattr(usage, 'candidates_token_count', 0) or estimate_tokens("".join(parts))
+                    on_chunk(text, tokens)
+        except Exception as e:
+            print("Error occurred:", e)
+            return None
+        finally:
+            if received is not None:
+                await received.aclose()
+        text = "".join(parts)
+        self._store_response(prompt, text, use_cache)
+        return text
 
 class Cardiologist(Agent):
     def __init__(self, medical_report):
@@ -227,10 +177,61 @@ class Pulmonologist(Agent):
         super().__init__(medical_report, "Pulmonologist")
 
 class MultidisciplinaryTeam(Agent):
-    def __init__(self, cardiologist_report, psychologist_report, pulmonologist_report):
-        extra_info = {
-            "cardiologist_report": cardiologist_report,
-            "psychologist_report": psychologist_report,
-            "pulmonologist_report": pulmonologist_report
-        }
-        super().__init__(role="MultidisciplinaryTeam", extra_info=extra_info)
\ No newline at end of file
+    # Budget for the specialist findings handed to the team (TEAM_INPUT_TOKENS overrides)
+    input_tokens = int(os.getenv('TEAM_INPUT_TOKENS', 3000))
+
+    def __init__(self, specialist_reports, medical_report=None):
+        """specialist_reports maps each specialist that ran to its report; any subset works.
+
+        medical_report is what the team reviews when no specialist report came
+        back (none was relevant, or every one failed).
+        """
+        self.specialist_reports = specialist_reports
+        extra_info = {f"{name.lower()}_report": report for name, report in specialist_reports.items()}
+        super().__init__(medical_report, role="MultidisciplinaryTeam", extra_info=extra_info)
+
+    def create_prompt_template(self):
+        return """
+You are a multidisciplinary team of healthcare professionals reviewing the findings below.
+Combine them into one final assessment in a positive, structured, and easy-to-read format.
+**Do NOT use tables.**
+List the three most likely health issues, each with a short reason based on the findings,
+followed by joint recommendations. Organize your output into clear sections with headings and bullet points.
+Never mention missing, corrupted, unreadable, or unavailable data.
+
+{findings}
+"""
+
+    def build_prompt(self):
+        reports = {name: report for name, report in self.specialist_reports.items() if report}
+        if reports:
+            compacted = compact_reports(reports, self.input_tokens)
+            findings = "\n\n".join(f"{name} Findings:\n{text}" for name, text in compacted.items())
+        else:
+            findings = f"Medical Report:\n{self.medical_report or ''}"
+        return self.prompt_template.format(findings=findings)
+
+class ChunkReducer(Agent):
+    """Merge one specialist's findings on separate excerpts of a long report into one report"""
+
+    def __init__(self, specialist, findings):
+        self.specialist = specialist
+        self.findings = findings
+        super().__init__(role=f"{specialist}Reducer")
+
+    def create_prompt_template(self):
+        return """
+You are a {specialist} consolidating your own findings from consecutive excerpts of one long medical report.
+Merge them into a single report: combine duplicate findings, keep every distinct finding and recommendation,
+and resolve overlaps in favour of the most specific statement.
+**Do NOT use tables.**
+Organize your output into clear sections with headings and bullet points, in the same format as the findings below.
+Do not mention excerpts, parts or chunks.
+
+{findings}
+"""
+
+    def build_prompt(self):
+        findings = "\n\n".join(f"Findings from part {i} of {len(self.findings)}:\n{text}"
+                               for i, text in enumerate(self.findings, 1))
+        return self.prompt_template.format(specialist=self.specialist, findings=findings)
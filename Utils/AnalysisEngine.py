@@ -0,0 +1,231 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from Utils.Agents import (Cardiologist, Psychologist, Pulmonologist, MultidisciplinaryTeam,
+                          ChunkReducer, estimate_tokens)
+from Utils.Chunker import split_report, group_by_budget
+from Utils.SpecialistRouter import get_router
+from Utils.Metrics import Span, get_metrics
+
+# Specialists the router can choose from, in display order
+SPECIALISTS = {
+    "Cardiologist": Cardiologist,
+    "Psychologist": Psychologist,
+    "Pulmonologist": Pulmonologist,
+}
+
+
+class PipelineHooks:
+    """Progress callbacks for AnalysisEngine.analyze(); all no-ops by default.
+
+    Hooks are called on the engine's event loop thread and must not block.
+    """
+
+    def on_routing(self, decision: Dict):
+        pass
+
+    def on_agent_start(self, agent_name: str):
+        pass
+
+    def on_agent_chunk(self, agent_name: str, chunk: str, tokens_received: int):
+        pass
+
+    def on_agent_done(self, agent_name: str, response: Optional[str]):
+        pass
+
+    def on_team_start(self):
+        pass
+
+    def on_team_chunk(self, chunk: str, tokens_received: int):
+        pass
+
+    def on_team_done(self, final_diagnosis: Optional[str]):
+        pass
+
+    def on_stage(self, span: Span):
+        """A timed stage (each specialist, the team) finished"""
+        pass
+
+
+class AnalysisEngine:
+    """Runs analysis pipelines as coroutines on a single background event loop.
+
+    Specialist fan-out and the team stage are awaited on one loop thread, and
+    a global semaphore caps the number of model calls in flight across every
+    analysis in the process. Blocking work such as PDF extraction is handed to
+    a small bounded thread pool.
+
+    Reports longer than long_report_tokens are split into chunk_tokens sized
+    chunks; each specialist maps over the chunks (chunk_parallelism at a time)
+    and its findings are reduced into one report before the team stage.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, blocking_workers: Optional[int] = None,
+                 chunk_tokens: Optional[int] = None, chunk_parallelism: Optional[int] = None,
+                 long_report_tokens: Optional[int] = None):
+        self.max_concurrency = max_concurrency or int(os.getenv('MAX_CONCURRENT_MODEL_CALLS', 8))
+        self.blocking_workers = blocking_workers or int(os.getenv('BLOCKING_WORKERS', min(4, os.cpu_count() or 1)))
+        self.chunk_tokens = chunk_tokens or int(os.getenv('CHUNK_TOKENS', 6000))
+        self.chunk_parallelism = chunk_parallelism or int(os.getenv('CHUNK_PARALLELISM', 4))
+        self.long_report_tokens = long_report_tokens or int(os.getenv('LONG_REPORT_TOKENS', 2 * self.chunk_tokens))
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._blocking_executor = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the event loop thread (idempotent)"""
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                ready.set()
+                loop.run_forever()
+
+            self._blocking_executor = ThreadPoolExecutor(max_workers=self.blocking_workers,
+                                                         thread_name_prefix='analysis-blocking')
+            self._thread = threading.Thread(target=run_loop, name='analysis-engine', daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+
+    def submit(self, coro) -> Future:
+        """Schedule a coroutine on the engine loop from any thread"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro):
+        """Run a coroutine on the engine loop and block until it finishes"""
+        return self.submit(coro).result()
+
+    async def run_blocking(self, func, *args, executor: Optional[ThreadPoolExecutor] = None):
+        """Await a blocking call on the bounded worker pool (or on executor, if given)"""
+        return await asyncio.get_running_loop().run_in_executor(executor or self._blocking_executor, func, *args)
+
+    async def run_agent(self, agent, use_cache: bool = True, on_chunk=None) -> Optional[str]:
+        """Run one agent under the global model-call concurrency limit.
+
+        With on_chunk the response is streamed and on_chunk(text, tokens_received)
+        is called for every chunk.
+        """
+        async with self._semaphore:
+            if on_chunk is not None:
+                return await agent.run_stream_async(on_chunk=on_chunk, use_cache=use_cache)
+            return await agent.run_async(use_cache=use_cache)
+
+    async def run_chunked(self, agent_name: str, agent_class, chunks: List[str], use_cache: bool = True,
+                          on_chunk=None) -> Optional[str]:
+        """Map one specialist over report chunks, then reduce its findings into one report.
+
+        Only the last reduce step is streamed to on_chunk.
+        """
+        limit = asyncio.Semaphore(self.chunk_parallelism)
+
+        async def limited(agent):
+            async with limit:
+                return await self.run_agent(agent, use_cache)
+
+        findings = await asyncio.gather(*[
+            limited(agent_class(f"[Part {i} of {len(chunks)} of a longer report]\n{chunk}"))
+            for i, chunk in enumerate(chunks, 1)
+        ])
+        findings = [text for text in findings if text]
+
+        # Reduce in rounds until the findings fit one prompt
+        while len(findings) > 1:
+            groups = group_by_budget(findings, self.chunk_tokens)
+            if len(groups) == 1:
+                return await self.run_agent(ChunkReducer(agent_name, groups[0]), use_cache, on_chunk=on_chunk)
+            reduced = await asyncio.gather(*[
+                limited(ChunkReducer(agent_name, group)) if len(group) > 1 else asyncio.sleep(0, group[0])
+                for group in groups
+            ])
+            findings = [text for text in reduced if text]
+
+        if not findings:
+            return None
+        if on_chunk:
+            on_chunk(findings[0], estimate_tokens(findings[0]))
+        return findings[0]
+
+    async def analyze(self, medical_report: str, use_cache: bool = True,
+                      hooks: Optional[PipelineHooks] = None, run_all: bool = False,
+                      structured_data: Optional[Dict] = None) -> Tuple[Dict[str, str], Optional[str]]:
+        """Fan the report out to the relevant specialists, then run the team stage.
+
+        The router picks the specialists unless run_all is set. Returns
+        (responses of the specialists that ran, by name, final diagnosis).
+        """
+        hooks = hooks or PipelineHooks()
+
+        decision = get_router().route(medical_report, structured_data, SPECIALISTS, run_all=run_all)
+        if decision['skipped']:
+            print(f"🧭 Routing to {', '.join(decision['selected']) or 'team review only'}; "
+                  f"skipping {', '.join(decision['skipped'])}")
+        hooks.on_routing(decision)
+
+        chunks = None
+        if estimate_tokens(medical_report) > self.long_report_tokens:
+            chunks = split_report(medical_report, self.chunk_tokens)
+            print(f"📚 Long report: analyzing {len(chunks)} chunks per specialist")
+
+        metrics = get_metrics()
+
+        async def run_specialist(agent_name, agent_class):
+            hooks.on_agent_start(agent_name)
+            on_chunk = lambda chunk, tokens: hooks.on_agent_chunk(agent_name, chunk, tokens)
+            with metrics.span('specialist', agent_name) as span:
+                try:
+                    if chunks:
+                        response = await self.run_chunked(agent_name, agent_class, chunks, use_cache,
+                                                          on_chunk=on_chunk)
+                    else:
+                        response = await self.run_agent(agent_class(medical_report), use_cache, on_chunk=on_chunk)
+                except Exception as e:
+                    print(f"⚠️ Error in {agent_name}: {e}")
+                    response = f"Analysis error: {str(e)}"
+                    span.fail()
+                if response is None:
+                    span.fail()
+            hooks.on_stage(span)
+            hooks.on_agent_done(agent_name, response)
+            return agent_name, response
+
+        responses = {}
+        tasks = [run_specialist(name, SPECIALISTS[name]) for name in decision['selected']]
+        for finished in asyncio.as_completed(tasks):
+            agent_name, response = await finished
+            responses[agent_name] = response
+
+        hooks.on_team_start()
+        # Display order, whichever subset ran; the team reads the report itself if none produced findings
+        team_agent = MultidisciplinaryTeam({name: responses[name] for name in SPECIALISTS if name in responses},
+                                           medical_report=medical_report)
+        with metrics.span('team') as span:
+            final_diagnosis = await self.run_agent(team_agent, use_cache, on_chunk=hooks.on_team_chunk)
+            if final_diagnosis is None:
+                span.fail()
+        hooks.on_stage(span)
+        hooks.on_team_done(final_diagnosis)
+        return responses, final_diagnosis
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_engine() -> AnalysisEngine:
+    """Process-wide engine configured from MAX_CONCURRENT_MODEL_CALLS / BLOCKING_WORKERS"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = AnalysisEngine()
+        return _default_engine
@@ -0,0 +1,231 @@
+import os
+import glob
+import json
+import time
+import asyncio
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from Utils.AnalysisEngine import AnalysisEngine, PipelineHooks
+from Utils.PDFProcessor import PDFProcessor, extract_pdf
+from Utils.ExtractionCache import get_extraction_cache
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt')
+STAGES = ('extract', 'specialists', 'team', 'save')
+
+
+def find_documents(source: str) -> Tuple[str, List[str]]:
+    """Resolve a directory or glob pattern to (root, sorted report paths)"""
+    if os.path.isdir(source):
+        root = source
+        paths = [os.path.join(dirpath, name)
+                 for dirpath, _, names in os.walk(source) for name in names]
+    else:
+        root = os.path.dirname(source.split('*')[0]) or '.'
+        paths = glob.glob(source, recursive=True)
+    documents = [p for p in paths if os.path.isfile(p) and os.path.splitext(p)[1].lower() in SUPPORTED_EXTENSIONS]
+    return root, sorted(documents)
+
+
+def output_folder_name(root: str, file_path: str) -> str:
+    """Stable per-document folder name, e.g. 2024/jan/report.pdf -> 2024__jan__report_pdf_1a2b3c4d.
+
+    The readable part can repeat across paths (report.pdf / report.PDF, a b.pdf / a_b.pdf),
+    so a short hash of the relative path keeps every document's folder distinct.
+    """
+    relative = os.path.relpath(file_path, root)
+    stem, extension = os.path.splitext(relative)
+    name = stem.replace(os.sep, '__').replace('/', '__') + '_' + extension.lstrip('.').lower()
+    name = ''.join(ch if ch.isalnum() or ch in '._-' else '_' for ch in name)
+    digest = hashlib.sha1(relative.replace(os.sep, '/').encode('utf-8')).hexdigest()[:8]
+    return f"{name}_{digest}"
+
+
+def _read_text(file_path: str) -> str:
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class _TeamTimer(PipelineHooks):
+    """Record the routing decision and when the team stage starts"""
+
+    def __init__(self):
+        self.team_started = None
+        self.routing = None
+
+    def on_routing(self, decision):
+        self.routing = decision
+
+    def on_team_start(self):
+        self.team_started = time.perf_counter()
+
+
+class BatchRunner:
+    """Analyze many reports with extraction and model calls overlapped.
+
+    Extraction runs on a process pool while earlier documents are with the
+    model. The extraction cache is read and written here, so its byte budget
+    holds for the whole batch. The engine's semaphore caps model calls and
+    max_in_flight bounds how many documents are held in memory at once.
+    Each document gets its own output folder with a manifest.json written
+    last, so an interrupted batch resumes by skipping completed folders.
+    """
+
+    def __init__(self, engine: AnalysisEngine, output_dir: str = os.path.join("results", "batch"),
+                 extract_workers: Optional[int] = None, max_in_flight: Optional[int] = None,
+                 use_cache: bool = True, force: bool = False, run_all: bool = False):
+        self.engine = engine
+        self.output_dir = output_dir
+        # Each extraction worker may start its own OCR pool, so keep this small
+        self.extract_workers = extract_workers or min(2, os.cpu_count() or 1)
+        # Enough documents in flight to keep every model-call slot busy
+        self.max_in_flight = max_in_flight or max(4, engine.max_concurrency)
+        self.use_cache = use_cache
+        self.force = force
+        self.run_all = run_all
+        self.stage_seconds = {stage: 0.0 for stage in STAGES}
+        self.stage_runs = {stage: 0 for stage in STAGES}
+        self.counts = {'completed': 0, 'failed': 0, 'skipped': 0}
+        self.specialists_skipped = 0
+
+    def _manifest_path(self, folder: str) -> str:
+        return os.path.join(folder, "manifest.json")
+
+    def is_done(self, folder: str) -> bool:
+        try:
+            with open(self._manifest_path(folder), "r", encoding="utf-8") as f:
+                return json.load(f).get('status') == 'completed'
+        except (OSError, ValueError):
+            return False
+
+    def _write_manifest(self, folder: str, manifest: Dict):
+        tmp_path = self._manifest_path(folder) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self._manifest_path(folder))
+
+    def _save(self, folder: str, medical_report: str, responses: Dict[str, str], final_diagnosis: Optional[str]):
+        with open(os.path.join(folder, "extracted_text.txt"), "w", encoding="utf-8") as f:
+            f.write(medical_report)
+        for agent_name, response in responses.items():
+            with open(os.path.join(folder, f"{agent_name.lower()}_report.txt"), "w", encoding="utf-8") as f:
+                f.write(f"### {agent_name} Report:\n\n{response}")
+        with open(os.path.join(folder, "final_diagnosis.txt"), "w", encoding="utf-8") as f:
+            f.write("### Final Diagnosis:\n\n" + (final_diagnosis or "No diagnosis returned."))
+
+    async def _extract(self, file_path: str, pool: ProcessPoolExecutor) -> Tuple[str, Optional[Dict]]:
+        """(report text, structured form data or None); cache lookups here, PDF parsing in the pool"""
+        if not file_path.lower().endswith('.pdf'):
+            return await self.engine.run_blocking(_read_text, file_path), None
+
+        cache = get_extraction_cache()
+        key = await self.engine.run_blocking(cache.make_key, file_path, PDFProcessor.EXTRACTOR_VERSION)
+        entry = await self.engine.run_blocking(cache.get, key)
+        if entry is not None:
+            result, text = entry['result'], entry['formatted']
+        else:
+            result, text = await asyncio.get_running_loop().run_in_executor(pool, extract_pdf, file_path)
+            if result['success']:
+                await self.engine.run_blocking(cache.put, key, result, text)
+        if not result['success']:
+            raise RuntimeError('Failed to extract text from PDF')
+        return text, result.get('structured_data')
+
+    async def _run_document(self, file_path: str, folder: str, pool: ProcessPoolExecutor,
+                            in_flight: asyncio.Semaphore, index: int, total: int):
+        async with in_flight:
+            os.makedirs(folder, exist_ok=True)
+            timings = {}
+            manifest = {'source': os.path.abspath(file_path), 'status': 'error', 'timings': timings}
+            try:
+                started = time.perf_counter()
+                text, structured_data = await self._extract(file_path, pool)
+                timings['extract'] = time.perf_counter() - started
+                if not text or not text.strip():
+                    raise RuntimeError('Empty report')
+
+                started = time.perf_counter()
+                timer = _TeamTimer()
+                responses, final_diagnosis = await self.engine.analyze(text, use_cache=self.use_cache, hooks=timer,
+                                                                       run_all=self.run_all,
+                                                                       structured_data=structured_data)
+                finished = time.perf_counter()
+                team_started = timer.team_started or finished
+                timings['specialists'] = team_started - started
+                timings['team'] = finished - team_started
+
+                await self.engine.run_blocking(self._save, folder, text, responses, final_diagnosis)
+                timings['save'] = time.perf_counter() - finished
+                manifest['routing'] = timer.routing
+                self.specialists_skipped += len(timer.routing['skipped']) if timer.routing else 0
+                # Outputs are kept for inspection, but the document stays pending so a rerun retries it
+                failed = [name for name, response in responses.items() if response is None]
+                if final_diagnosis is None:
+                    raise RuntimeError('No final diagnosis returned')
+                if failed:
+                    raise RuntimeError(f"No response from {', '.join(failed)}")
+                manifest['status'] = 'completed'
+                self.counts['completed'] += 1
+                print(f"✅ [{index}/{total}] {file_path}")
+            except Exception as e:
+                manifest['error'] = str(e)
+                self.counts['failed'] += 1
+                print(f"❌ [{index}/{total}] {file_path}: {e}")
+
+            for stage, seconds in timings.items():
+                self.stage_seconds[stage] += seconds
+                self.stage_runs[stage] += 1
+            await self.engine.run_blocking(self._write_manifest, folder, manifest)
+
+    def plan(self, root: str, documents: List[str]) -> List[Tuple[str, str]]:
+        """(file, output folder) pairs still to analyze; completed ones are skipped unless force"""
+        pending = []
+        for file_path in documents:
+            folder = os.path.join(self.output_dir, output_folder_name(root, file_path))
+            if not self.force and self.is_done(folder):
+                self.counts['skipped'] += 1
+            else:
+                pending.append((file_path, folder))
+        if self.counts['skipped']:
+            print(f"⏭️ Skipping {self.counts['skipped']} already analyzed documents")
+        return pending
+
+    async def run_async(self, pending: List[Tuple[str, str]]) -> Dict:
+        started = time.perf_counter()
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        # Spawned, not forked: the engine's loop, executor and rate-limiter threads are already running
+        with ProcessPoolExecutor(max_workers=self.extract_workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            await asyncio.gather(*[
+                self._run_document(file_path, folder, pool, in_flight, index, len(pending))
+                for index, (file_path, folder) in enumerate(pending, 1)
+            ])
+        return self.summary(time.perf_counter() - started)
+
+    def run(self, source: str) -> Dict:
+        """Analyze every report under a directory or matching a glob"""
+        root, documents = find_documents(source)
+        print(f"📚 Found {len(documents)} reports in {source}")
+        return self.engine.run(self.run_async(self.plan(root, documents)))
+
+    def summary(self, wall_seconds: float) -> Dict:
+        return {
+            **self.counts,
+            'specialists_skipped': self.specialists_skipped,
+            'wall_seconds': round(wall_seconds, 2),
+            'docs_per_minute': round(self.counts['completed'] * 60 / wall_seconds, 2) if wall_seconds else 0.0,
+            'stage_seconds': {stage: round(seconds, 2) for stage, seconds in self.stage_seconds.items()},
+            'stage_mean_seconds': {stage: round(seconds / self.stage_runs[stage], 3) if self.stage_runs[stage] else 0.0
+                                   for stage, seconds in self.stage_seconds.items()},
+        }
+
+
+def print_summary(summary: Dict):
+    print("\n📊 Batch summary")
+    print(f"   Completed: {summary['completed']}  Failed: {summary['failed']}  Skipped: {summary['skipped']}")
+    print(f"   Specialist runs skipped by routing: {summary['specialists_skipped']}")
+    print(f"   Wall time: {summary['wall_seconds']}s  Throughput: {summary['docs_per_minute']} docs/min")
+    for stage in STAGES:
+        print(f"   {stage:<12} total {summary['stage_seconds'][stage]:>9.2f}s   "
+              f"mean {summary['stage_mean_seconds'][stage]:>7.3f}s")
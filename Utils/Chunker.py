@@ -0,0 +1,63 @@
+import re
+from typing import List
+from Utils.Tokens import CHARS_PER_TOKEN
+
+# Boundaries tried in order, coarsest first. All but the page break are zero-width,
+# so a split never drops text.
+PAGE_BREAK = re.compile(r'\f|^(?=--- Page \d+ ---$)', re.MULTILINE)
+SECTION_HEADING = re.compile(
+    r'^(?=(?:#{1,6} \S[^\n]*'                   # markdown heading
+    r'|[A-Z][A-Z0-9 ,/&()\-]{2,60}:?'           # ALL CAPS HEADING
+    r'|[A-Z][^\n:]{0,60}:'                      # Short Title:
+    r'|={3,}|-{3,})[ \t]*$)',                   # ===== underline
+    re.MULTILINE
+)
+PARAGRAPH = re.compile(r'(?<=\n\n)')
+LINE = re.compile(r'(?<=\n)')
+
+
+def _fit(text: str, max_chars: int, splitters) -> List[str]:
+    """Split text at the coarsest boundary that brings every piece under max_chars"""
+    if len(text) <= max_chars:
+        return [text] if text.strip() else []
+    for position, splitter in enumerate(splitters):
+        pieces = splitter.split(text)
+        if len(pieces) > 1:
+            return [fitted for piece in pieces for fitted in _fit(piece, max_chars, splitters[position + 1:])]
+    # A single line longer than the budget: hard cut
+    return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+
+def _pack(pieces: List[str], max_chars: int) -> List[List[str]]:
+    """Greedily group consecutive pieces while each group stays under max_chars"""
+    groups, current, size = [], [], 0
+    for piece in pieces:
+        if current and size + len(piece) > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def split_report(text: str, max_tokens: int) -> List[str]:
+    """Split a report into chunks of at most max_tokens, along page and section boundaries.
+
+    Whole pages are packed together while they fit; a page that is too big on
+    its own is split at section headings, then paragraphs, then lines.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = [piece for page in PAGE_BREAK.split(text)
+              for piece in _fit(page, max_chars, (SECTION_HEADING, PARAGRAPH, LINE))]
+    return ["".join(group) for group in _pack(pieces, max_chars)]
+
+
+def group_by_budget(texts: List[str], max_tokens: int) -> List[List[str]]:
+    """Group texts for a reduce step; every group has at least two texts when there are two"""
+    groups = _pack(texts, max_tokens * CHARS_PER_TOKEN)
+    if len(groups) == len(texts) and len(texts) > 1:
+        # Nothing fits together, so pair them up to keep the reduction moving
+        groups = [texts[i:i + 2] for i in range(0, len(texts), 2)]
+    return groups
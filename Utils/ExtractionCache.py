@@ -0,0 +1,168 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join("cache", "extraction")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256MB on disk
+
+
+class ExtractionCache:
+    """Disk-backed, size-bounded LRU cache for PDF extraction results.
+
+    Entries are keyed by the SHA-256 of the file bytes plus the extractor
+    version, so re-uploads of the same document skip the whole extraction
+    chain and any change to the extractor invalidates old entries.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the in-memory LRU order from the files already on disk"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-len('.json')], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        with self._lock:
+            self._evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def make_key(file_path: str, extractor_version: str) -> str:
+        """Hash the file contents together with the extractor version"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        digest.update(f"|extractor={extractor_version}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached entry ({'result', 'formatted'}) or None"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                # Entry vanished or is corrupt - drop it and treat as a miss
+                self._total_bytes -= self._entries.pop(key)
+                self._remove_file(path)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            try:
+                os.utime(path, None)  # keep LRU order across restarts
+            except OSError:
+                pass
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, result: Dict, formatted: str):
+        """Store an extraction result and its agent-formatted text"""
+        payload = json.dumps({'result': result, 'formatted': formatted}, ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"❌ Error writing extraction cache: {e}")
+                self._remove_file(tmp_path)
+                return
+
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until under the byte budget (lock held)"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self._remove_file(self._path(key))
+            self.evictions += 1
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove_file(self._path(key))
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Process-wide cache configured from EXTRACTION_CACHE_DIR / EXTRACTION_CACHE_MAX_MB"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            cache_dir = os.getenv('EXTRACTION_CACHE_DIR', DEFAULT_CACHE_DIR)
+            max_mb = os.getenv('EXTRACTION_CACHE_MAX_MB')
+            max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+            _default_cache = ExtractionCache(cache_dir, max_bytes)
+        return _default_cache
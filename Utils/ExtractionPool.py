@@ -0,0 +1,230 @@
+import os
+import queue
+import signal
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+DEFAULT_TIMEOUT = 300  # seconds per document; OCR of a long scan is the slow case
+DEFAULT_MAX_JOBS = 50  # documents per worker before it is replaced
+DEFAULT_STARTUP_TIMEOUT = 60  # seconds for a new worker to import its dependencies
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+class ExtractionWorkerError(Exception):
+    pass
+
+
+def _worker_main(conn):
+    """Worker process: import the PDF stack once, then extract one path at a time until told to stop"""
+    if hasattr(os, 'setpgrp'):
+        # Own process group, so killing a stuck worker also kills the OCR processes it started
+        os.setpgrp()
+    from Utils.PDFProcessor import extract_pdf
+    for module in ('pdfplumber', 'PyPDF2', 'pdf2image', 'pytesseract'):
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+    conn.send(('ready', os.getpid()))
+    while True:
+        try:
+            pdf_path = conn.recv()
+        except EOFError:  # the parent went away
+            break
+        if pdf_path is None:
+            break
+        try:
+            conn.send(('ok', extract_pdf(pdf_path)))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        # Not a daemon: OCR starts its own process pool inside the worker
+        self.process = context.Process(target=_worker_main, args=(child_conn,), name='extraction-worker')
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.ready = False
+
+    def wait_ready(self, timeout: float):
+        if not self.conn.poll(timeout):
+            raise ExtractionWorkerError(f"Extraction worker did not start within {timeout:.0f}s")
+        self.conn.recv()
+        self.ready = True
+
+    def stop(self, graceful: bool = True):
+        if graceful and self.process.is_alive():
+            try:
+                self.conn.send(None)
+                self.process.join(5)
+            except OSError:
+                pass
+        if self.process.is_alive():
+            self._kill()
+            self.process.join(5)
+        self.conn.close()
+
+    def _kill(self):
+        if self.ready and hasattr(os, 'killpg'):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+                return
+            except OSError:  # the group is already gone
+                pass
+        self.process.terminate()
+
+
+class ExtractionPool:
+    """Pre-started worker processes for CPU-bound PDF extraction.
+
+    pdfplumber layout analysis, table detection and OCR image handling hold
+    the GIL, so running them on threads slows every request the server is
+    handling. Workers here import the PDF stack as soon as they start and
+    then take one PDF path at a time, returning the extraction result dict
+    and the agent-formatted text. A job that runs past timeout has its worker
+    killed and replaced, together with any OCR processes it started (each
+    worker leads its own process group), and each worker is replaced after
+    max_jobs documents so memory that parsing leaves behind is returned to
+    the OS.
+
+    Workers are spawned rather than forked from the threaded server. The
+    extraction cache and model calls stay in the calling process. With
+    workers=0, extract() runs in the calling thread instead.
+
+    extract() blocks its caller until the worker answers, so async callers
+    should run it on wait_executor() rather than a thread pool meant for
+    short blocking work.
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = None,
+                 max_jobs: Optional[int] = None, start_method: Optional[str] = None):
+        self.workers = workers if workers is not None else \
+            int(os.getenv('EXTRACTION_WORKERS', min(2, os.cpu_count() or 1)))
+        self.timeout = timeout or float(os.getenv('EXTRACTION_TIMEOUT', DEFAULT_TIMEOUT))
+        self.max_jobs = max_jobs or int(os.getenv('EXTRACTION_MAX_JOBS_PER_WORKER', DEFAULT_MAX_JOBS))
+        self.startup_timeout = DEFAULT_STARTUP_TIMEOUT
+        self._context = multiprocessing.get_context(start_method or os.getenv('EXTRACTION_START_METHOD', 'spawn'))
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self.counts = {'completed': 0, 'failed': 0, 'timeouts': 0, 'crashed': 0, 'recycled': 0}
+        self.busy = 0
+        self._wait_executor = None
+
+    def start(self):
+        """Start the workers (idempotent); they import their dependencies in the background"""
+        with self._lock:
+            if self._started or self._closed or self.workers <= 0:
+                return
+            for _ in range(self.workers):
+                self._idle.put(_Worker(self._context))
+            self._started = True
+        atexit.register(self.close)
+        print(f"🏭 Started {self.workers} extraction worker(s)")
+
+    def wait_executor(self) -> Optional[ThreadPoolExecutor]:
+        """One thread per worker for callers of extract(); None with workers=0, where the caller does the work"""
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._wait_executor is None:
+                self._wait_executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                         thread_name_prefix='extraction-wait')
+            return self._wait_executor
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def _release(self, worker: _Worker, replace: bool, graceful: bool = True):
+        with self._lock:
+            self.busy -= 1
+            closed = self._closed
+        if replace or closed:
+            worker.stop(graceful)
+            if closed:
+                return
+            worker = _Worker(self._context)
+        self._idle.put(worker)
+
+    def extract(self, pdf_path: str) -> Tuple[Dict, str]:
+        """Extract a PDF in a worker; returns (extraction result, formatted text).
+
+        Raises ExtractionTimeout or ExtractionWorkerError if the job fails.
+        """
+        if self.workers <= 0:
+            from Utils.PDFProcessor import extract_pdf
+            return extract_pdf(pdf_path)
+
+        self.start()
+        worker = self._idle.get()
+        with self._lock:
+            self.busy += 1
+        replace, graceful = True, False
+        try:
+            if not worker.ready:
+                worker.wait_ready(self.startup_timeout)
+            worker.conn.send(os.path.abspath(pdf_path))
+            if not worker.conn.poll(self.timeout):
+                self._count('timeouts')
+                raise ExtractionTimeout(f"Extraction took longer than {self.timeout:.0f}s: {pdf_path}")
+            status, payload = worker.conn.recv()
+            worker.jobs += 1
+            replace, graceful = worker.jobs >= self.max_jobs, True
+            if replace:
+                self._count('recycled')
+            if status == 'error':
+                self._count('failed')
+                raise ExtractionWorkerError(payload)
+            self._count('completed')
+            return payload
+        except (EOFError, OSError) as e:
+            # Killed mid-job, e.g. by the OOM killer
+            self._count('crashed')
+            raise ExtractionWorkerError(f"Extraction worker exited unexpectedly: {e!r}")
+        finally:
+            self._release(worker, replace, graceful)
+
+    def close(self):
+        """Stop idle workers now and busy ones as they finish"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'busy': self.busy,
+                'timeout_seconds': self.timeout,
+                'max_jobs_per_worker': self.max_jobs,
+                **self.counts,
+            }
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Process-wide pool configured from EXTRACTION_WORKERS / EXTRACTION_TIMEOUT / EXTRACTION_MAX_JOBS_PER_WORKER"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ExtractionPool()
+        return _default_pool
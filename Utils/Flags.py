@@ -0,0 +1,14 @@
+import os
+from typing import Optional
+
+# Values accepted as "on" for boolean env vars and form fields
+TRUTHY = ('1', 'true', 'yes')
+
+
+def is_truthy(value: Optional[str]) -> bool:
+    return (value or '').lower() in TRUTHY
+
+
+def env_flag(name: str) -> bool:
+    """True when the environment variable is set to 1/true/yes"""
+    return is_truthy(os.getenv(name))
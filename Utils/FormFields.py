@@ -0,0 +1,128 @@
+import re
+import threading
+from typing import Dict, List, Tuple
+
+# Common fields on medical incident forms: (field name, label variants, value pattern)
+DEFAULT_FIELDS = [
+    ('patient_name', ['Name', 'Patient Name', 'PATIENT NAME'], r'[A-Za-z\s]+'),
+    ('date_of_birth', ['DOB', 'Date of Birth', 'Birth Date'], r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'),
+    ('incident_date', ['Date', 'Incident Date', 'Date of Incident'], r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'),
+    ('age', ['Age'], r'\d{1,3}'),
+    ('gender', ['Gender', 'Sex'], r'[MF]|Male|Female'),
+    ('staff_id', ['Staff ID', 'Staff No', 'Employee ID'], r'\d+'),
+    ('location', ['Location', 'Where'], r'[A-Za-z\s]+'),
+    ('symptoms', ['Symptoms', 'Signs', 'Complaint'], r'[A-Za-z\s,.-]+'),
+    ('injury_type', ['Injury', 'Type of Injury'], r'[A-Za-z\s,.-]+'),
+]
+
+# Characters of text lowered and scanned at a time
+SCAN_BLOCK = 4096
+
+
+class FormFieldExtractor:
+    """Keyword-anchored form field scanner.
+
+    All field labels are compiled into one alternation that walks the text
+    once. Only at positions where a label starts is the matching field's
+    own pattern tried (anchored), and a field stops being tried once found.
+    Each field returns the same value as re.search(label[\\s:]*(value),
+    IGNORECASE), because the scanner visits every label position in order.
+    """
+
+    def __init__(self, fields: List[Tuple[str, List[str], str]] = ()):
+        self._lock = threading.Lock()
+        self._fields = {}  # name -> (labels, value pattern, compiled field regex)
+        for name, labels, value_pattern in fields:
+            self._add(name, labels, value_pattern)
+        self._compile()
+
+    def _add(self, name: str, labels: List[str], value_pattern: str):
+        if not name.isidentifier():
+            raise ValueError(f"Invalid field name: {name!r}")
+        if not labels:
+            raise ValueError(f"Field {name!r} needs at least one label")
+        label_pattern = '|'.join(re.escape(label) for label in labels)
+        pattern = re.compile(rf'(?:{label_pattern})[\s:]*({value_pattern})', re.IGNORECASE)
+        if pattern.groups != 1:
+            raise ValueError(f"Value pattern for {name!r} must not contain capturing groups")
+        self._fields[name] = (list(labels), value_pattern, pattern)
+
+    def _compile(self):
+        """Build the combined label scanners and the label -> candidate fields map"""
+        label_owners = {}
+        for name, (labels, _, _) in self._fields.items():
+            for label in labels:
+                label_owners.setdefault(label.lower(), []).append(name)
+
+        # Longest labels first, so the alternation reports the longest label at each position;
+        # every other label starting there is a prefix of it
+        ordered = sorted(label_owners, key=len, reverse=True)
+        alternation = '|'.join(re.escape(label) for label in ordered)
+        ascii_scanner = re.compile(f'(?=({alternation}))')
+        unicode_scanner = re.compile(f'(?=({alternation}))', re.IGNORECASE)
+
+        field_order = list(self._fields)
+        every_field = [(name, self._fields[name][2]) for name in field_order]
+        candidates = {}
+        for label in ordered:
+            names = {name for other, owners in label_owners.items()
+                     if label.startswith(other) for name in owners}
+            candidates[label] = [(name, pattern) for name, pattern in every_field if name in names]
+
+        # Swapped in as one tuple so a concurrent register() can't tear a running scan
+        overlap = max(len(label) for label in ordered) - 1 if ordered else 0
+        self._state = (field_order, candidates, every_field, ascii_scanner, unicode_scanner, overlap)
+
+    def register(self, name: str, labels: List[str], value_pattern: str):
+        """Add (or replace) a field; it is picked up by the same single scan"""
+        with self._lock:
+            self._add(name, labels, value_pattern)
+            self._compile()
+
+    @property
+    def field_names(self) -> List[str]:
+        return list(self._state[0])
+
+    def extract(self, text: str) -> Dict:
+        """Return {field: value} for every field found in text"""
+        order, candidates, every_field, ascii_scanner, unicode_scanner, overlap = self._state
+        found = {}
+        remaining = len(order)
+
+        # Scan block by block so a page whose fields sit near the top never lower()s the rest.
+        # Each block carries enough overlap to see a label that starts inside it in full.
+        for block_start in range(0, len(text), SCAN_BLOCK):
+            window = text[block_start:block_start + SCAN_BLOCK + overlap]
+            if window.isascii():
+                # Lower-casing ASCII keeps offsets, and a case-sensitive scan is much faster
+                hits = ascii_scanner.finditer(window.lower())
+            else:
+                hits = unicode_scanner.finditer(window)
+
+            for hit in hits:
+                if hit.start() >= SCAN_BLOCK:
+                    break
+                position = block_start + hit.start()
+                # Case-folded non-ASCII labels may not lower() back to a key; try every field then
+                for name, pattern in candidates.get(hit.group(1).lower(), every_field):
+                    if name in found:
+                        continue
+                    match = pattern.match(text, position)
+                    if match:
+                        found[name] = match.group(1).strip()
+                        remaining -= 1
+                if not remaining:
+                    break
+            if not remaining:
+                break
+
+        return {name: found[name] for name in order if name in found}
+
+
+# Compiled once at import time and shared by every PDFProcessor
+default_extractor = FormFieldExtractor(DEFAULT_FIELDS)
+
+
+def register_field(name: str, labels: List[str], value_pattern: str):
+    """Register an extra form field with the shared extractor"""
+    default_extractor.register(name, labels, value_pattern)
@@ -0,0 +1,131 @@
+import os
+import math
+import asyncio
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+class QueueFullError(Exception):
+    """Raised by JobQueue.admit() when no more jobs can wait"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Analysis queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """FIFO admission queue with a bounded depth and a cap on jobs in flight.
+
+    admit() is called from request threads and fails fast with QueueFullError
+    when max_depth jobs are already waiting. acquire()/release() are awaited
+    on the analysis engine loop. Wait estimates use a moving average of
+    recent job durations.
+    """
+
+    def __init__(self, max_depth: Optional[int] = None, max_in_flight: Optional[int] = None,
+                 initial_duration: float = 60.0, on_change: Optional[Callable[[List[str]], None]] = None):
+        self.max_depth = max_depth or int(os.getenv('MAX_QUEUE_DEPTH', 20))
+        self.max_in_flight = max_in_flight or int(os.getenv('MAX_IN_FLIGHT_ANALYSES', 4))
+        self.avg_duration = initial_duration
+        self.on_change = on_change
+        self._pending = deque()
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._slot_freed = None  # asyncio.Condition, created on the engine loop
+        self._loop = None
+
+    def admit(self, job_id: str):
+        """Reserve a place in the queue or raise QueueFullError"""
+        with self._lock:
+            if len(self._pending) >= self.max_depth:
+                raise QueueFullError(self._retry_after())
+            self._pending.append(job_id)
+
+    def cancel(self, job_id: str):
+        """Drop a job that was admitted but never started (safe from any thread)"""
+        with self._lock:
+            if job_id not in self._pending:
+                return
+            self._pending.remove(job_id)
+            changed = list(self._pending)
+        # The cancelled job may have been the head of the line that others wait behind
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._wake_waiters(), self._loop)
+        self._changed(changed)
+
+    async def _wake_waiters(self):
+        async with self._slot_freed:
+            self._slot_freed.notify_all()
+
+    def _retry_after(self) -> int:
+        # Roughly when the next in-flight job finishes and frees a queue slot (lock held)
+        return max(1, math.ceil(self.avg_duration / self.max_in_flight))
+
+    def _can_start(self, job_id: str) -> bool:
+        return bool(self._pending) and self._pending[0] == job_id and len(self._in_flight) < self.max_in_flight
+
+    async def acquire(self, job_id: str):
+        """Wait until job_id is at the head of the queue and a slot is free"""
+        if self._slot_freed is None:
+            self._slot_freed = asyncio.Condition()
+            self._loop = asyncio.get_running_loop()
+        async with self._slot_freed:
+            while True:
+                with self._lock:
+                    if self._can_start(job_id):
+                        self._pending.popleft()
+                        self._in_flight.add(job_id)
+                        changed = list(self._pending)
+                        break
+                await self._slot_freed.wait()
+            # The next job in line may also fit if several slots are free
+            self._slot_freed.notify_all()
+        self._changed(changed)
+
+    async def release(self, job_id: str, duration: Optional[float] = None):
+        """Free the job's slot and fold its duration into the wait estimate"""
+        with self._lock:
+            self._in_flight.discard(job_id)
+            if duration is not None:
+                self.avg_duration = 0.8 * self.avg_duration + 0.2 * duration
+        if self._slot_freed is not None:
+            await self._wake_waiters()
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based place in line, 0 if running, None if unknown"""
+        with self._lock:
+            if job_id in self._in_flight:
+                return 0
+            try:
+                return self._pending.index(job_id) + 1
+            except ValueError:
+                return None
+
+    def estimated_wait(self, job_id: str) -> Optional[int]:
+        """Seconds until job_id is expected to start"""
+        position = self.position(job_id)
+        if position is None:
+            return None
+        if position == 0:
+            return 0
+        with self._lock:
+            free_slots = self.max_in_flight - len(self._in_flight)
+            if position <= free_slots:
+                return 0
+            rounds = math.ceil((position - free_slots) / self.max_in_flight)
+            return int(rounds * self.avg_duration)
+
+    def _changed(self, pending: List[str]):
+        if self.on_change:
+            self.on_change(pending)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'queued': len(self._pending),
+                'in_flight': len(self._in_flight),
+                'max_depth': self.max_depth,
+                'max_in_flight': self.max_in_flight,
+                'avg_duration_seconds': round(self.avg_duration, 1),
+            }
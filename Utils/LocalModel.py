@@ -0,0 +1,168 @@
+import os
+import re
+import math
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+from Utils.Tokens import CHARS_PER_TOKEN, estimate_tokens
+
+DEFAULT_LATENCY = "lognormal:0.8,0.3"
+DEFAULT_CHUNK_CHARS = 80
+DEFAULT_CHUNK_DELAY = 0.05
+DEFAULT_RESPONSE_TOKENS = 300
+# Prompts whose attempt count is remembered; retries follow their first call closely
+MAX_TRACKED_PROMPTS = 10000
+
+SECTION_TITLES = ("Key Findings", "Clinical Impression", "Risk Factors", "Follow-up")
+WORD = re.compile(r'[A-Za-z][A-Za-z-]{4,}')
+
+
+class LocalModelError(Exception):
+    """Injected failure; the 503 code makes the rate limiter treat it as transient"""
+    code = 503
+
+
+class LocalUsage:
+    __slots__ = ('candidates_token_count',)
+
+    def __init__(self, candidates_token_count: int):
+        self.candidates_token_count = candidates_token_count
+
+
+class LocalResponse:
+    """Minimal stand-in for a Gemini response or stream chunk: .text and .usage_metadata"""
+    __slots__ = ('text', 'usage_metadata')
+
+    def __init__(self, text: str, tokens: int):
+        self.text = text
+        self.usage_metadata = LocalUsage(tokens)
+
+
+def parse_latency(spec: str) -> Tuple[str, List[float]]:
+    """Parse "fixed:S", "uniform:LOW,HIGH", "normal:MEAN,STDDEV" or "lognormal:MEDIAN,SIGMA" (a bare number is fixed)"""
+    name, _, params = spec.strip().partition(':')
+    if not params:
+        name, params = 'fixed', name
+    name = name.lower()
+    values = [float(value) for value in params.split(',')]
+    expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+    if name not in expected or len(values) != expected[name]:
+        raise ValueError(f"Invalid latency distribution: {spec!r}")
+    return name, values
+
+
+class LocalModel:
+    """Offline stand-in for a Gemini GenerativeModel, for load tests and benchmarks.
+
+    Responses are built from the words of the prompt, so the same prompt
+    always gets the same text. Time to first chunk follows the configured
+    latency distribution, further chunks arrive every chunk_delay seconds,
+    and error_rate of calls fail with a transient LocalModelError. Latency
+    and failures are drawn from a hash of (seed, prompt, attempt number),
+    so a run is repeatable however the calls interleave.
+    """
+
+    def __init__(self, model_name: str = "local", generation_config: Optional[Dict] = None,
+                 latency: Optional[str] = None, chunk_chars: Optional[int] = None,
+                 chunk_delay: Optional[float] = None, error_rate: Optional[float] = None,
+                 response_tokens: Optional[int] = None, seed: Optional[str] = None):
+        self.model_name = model_name
+        self.latency = parse_latency(latency or os.getenv('LOCAL_MODEL_LATENCY', DEFAULT_LATENCY))
+        self.chunk_chars = chunk_chars or int(os.getenv('LOCAL_MODEL_CHUNK_CHARS', DEFAULT_CHUNK_CHARS))
+        self.chunk_delay = chunk_delay if chunk_delay is not None else \
+            float(os.getenv('LOCAL_MODEL_CHUNK_DELAY', DEFAULT_CHUNK_DELAY))
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv('LOCAL_MODEL_ERROR_RATE', 0))
+        self.response_tokens = response_tokens or int(os.getenv('LOCAL_MODEL_RESPONSE_TOKENS', DEFAULT_RESPONSE_TOKENS))
+        max_output = (generation_config or {}).get('max_output_tokens')
+        if max_output:
+            self.response_tokens = min(self.response_tokens, int(max_output))
+        self.seed = seed if seed is not None else os.getenv('LOCAL_MODEL_SEED', '0')
+        self._attempts = OrderedDict()  # prompt digest -> calls so far, least recently used first
+        self._lock = threading.Lock()
+
+    def _digest(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{prompt}".encode('utf-8')).hexdigest()
+
+    def _draw(self, prompt: str) -> Tuple[float, bool]:
+        """Latency and whether to fail, for this attempt at this prompt"""
+        digest = self._digest(prompt)
+        with self._lock:
+            attempt = self._attempts.pop(digest, 0)
+            self._attempts[digest] = attempt + 1
+            if len(self._attempts) > MAX_TRACKED_PROMPTS:
+                self._attempts.popitem(last=False)
+        rng = random.Random(f"{self.seed}:{digest}:{attempt}")
+        name, params = self.latency
+        if name == 'fixed':
+            latency = params[0]
+        elif name == 'uniform':
+            latency = rng.uniform(*params)
+        elif name == 'normal':
+            latency = rng.gauss(*params)
+        else:
+            latency = params[0] * math.exp(rng.gauss(0, params[1]))
+        return max(0.0, latency), rng.random() < self.error_rate
+
+    def respond(self, prompt: str) -> str:
+        """Deterministic specialist-style text (sections and bullets) built from the prompt's words"""
+        digest = self._digest(prompt)
+        rng = random.Random(digest)
+        words = list(dict.fromkeys(word.lower() for word in WORD.findall(prompt))) or ['report']
+        target = self.response_tokens * CHARS_PER_TOKEN
+        lines = [f"Section: Local model response {digest[:8]}"]
+        used = len(lines[0])
+        for title in SECTION_TITLES * (target // 200 + 1):
+            lines.append(f"{title}:")
+            for _ in range(3):
+                bullet = "- " + " ".join(rng.choice(words) for _ in range(rng.randint(4, 9))).capitalize()
+                lines.append(bullet)
+                used += len(bullet) + 1
+            if used >= target:
+                break
+        return "\n".join(lines)
+
+    def _chunks(self, text: str) -> Iterator[LocalResponse]:
+        for start in range(0, len(text), self.chunk_chars):
+            end = start + self.chunk_chars
+            yield LocalResponse(text[start:end], estimate_tokens(text[:end]))
+
+    def _generation_seconds(self, text: str) -> float:
+        return max(0, math.ceil(len(text) / self.chunk_chars) - 1) * self.chunk_delay
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        latency, fail = self._draw(prompt)
+        time.sleep(latency)
+        if fail:
+            raise LocalModelError("Injected local model failure")
+        text = self.respond(prompt)
+        if stream:
+            return self._stream_sync(text)
+        time.sleep(self._generation_seconds(text))
+        return LocalResponse(text, estimate_tokens(text))
+
+    def _stream_sync(self, text: str) -> Iterator[LocalResponse]:
+        for position, chunk in enumerate(self._chunks(text)):
+            if position:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        latency, fail = self._draw(prompt)
+        await asyncio.sleep(latency)
+        if fail:
+            raise LocalModelError("Injected local model failure")
+        text = self.respond(prompt)
+        if stream:
+            return self._stream_async(text)
+        await asyncio.sleep(self._generation_seconds(text))
+        return LocalResponse(text, estimate_tokens(text))
+
+    async def _stream_async(self, text: str):
+        for position, chunk in enumerate(self._chunks(text)):
+            if position:
+                await asyncio.sleep(self.chunk_delay)
+            yield chunk
@@ -0,0 +1,224 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+PREFIX = "healthassist"
+
+# Seconds; wide enough for a text upload save and for a long OCR or model call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values = {}  # sorted label tuple -> value
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: Dict) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_labels(key)} {_number(value)}" for key, value in values]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class CallbackMetric(_Metric):
+    """Value read when /metrics is scraped, e.g. queue depth owned by another object.
+
+    callback returns a number, or {labels dict as tuple of pairs: number}.
+    """
+
+    def __init__(self, name: str, help_text: str, kind: str, callback: Callable):
+        super().__init__(name, help_text)
+        self.kind = kind
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        try:
+            values = self.callback()
+        except Exception as e:
+            print(f"❌ Error collecting metric {self.name}: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return self._header() + [f"{self.name}{_labels(key)} {_number(value)}"
+                                 for key, value in sorted(values.items()) if value is not None]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket (not cumulative) counts, then sum and count
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        lines = self._header()
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {total!r}")
+            lines.append(f"{self.name}_count{_labels(key)} {count}")
+        return lines
+
+
+class Span:
+    """Timing of one stage; set detail (e.g. the extraction method) or call fail() before it ends"""
+    __slots__ = ('stage', 'detail', 'seconds', 'failed')
+
+    def __init__(self, stage: str, detail: str = ''):
+        self.stage = stage
+        self.detail = detail
+        self.seconds = None
+        self.failed = False
+
+    def fail(self):
+        """Count this stage as an error without raising"""
+        self.failed = True
+
+
+class MetricsRegistry:
+    """Process-wide metrics in the Prometheus text exposition format.
+
+    span(stage) times a pipeline stage into a latency histogram, keeps an
+    in-flight gauge per stage and counts stages that raised or were marked
+    failed. Other components add their own counters, gauges and callbacks.
+    """
+
+    def __init__(self, prefix: str = PREFIX):
+        self.prefix = prefix
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.stage_seconds = self.histogram('stage_duration_seconds', 'Duration of pipeline stages')
+        self.stage_in_flight = self.gauge('stage_in_flight', 'Pipeline stages currently running')
+        self.stage_errors = self.counter('stage_errors_total', 'Pipeline stages that failed')
+
+    def _register(self, name: str, factory: Callable[[str], _Metric]) -> _Metric:
+        full_name = f"{self.prefix}_{name}"
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = factory(full_name)
+            return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(name, lambda full_name: Counter(full_name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(name, lambda full_name: Gauge(full_name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(name, lambda full_name: Histogram(full_name, help_text, buckets))
+
+    def callback(self, name: str, help_text: str, callback: Callable, kind: str = 'gauge') -> CallbackMetric:
+        """Register (or replace) a metric whose value is read at scrape time"""
+        metric = CallbackMetric(f"{self.prefix}_{name}", help_text, kind, callback)
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    @contextmanager
+    def span(self, stage: str, detail: str = ''):
+        span = Span(stage, detail)
+        self.stage_in_flight.inc(stage=stage)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException:
+            span.failed = True
+            raise
+        finally:
+            span.seconds = time.perf_counter() - started
+            self.stage_in_flight.dec(stage=stage)
+            self.stage_seconds.observe(span.seconds, stage=stage, detail=span.detail)
+            if span.failed:
+                self.stage_errors.inc(stage=stage, detail=span.detail)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide metrics registry"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = MetricsRegistry()
+        return _default_registry
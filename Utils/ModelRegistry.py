@@ -0,0 +1,100 @@
+import os
+import json
+import threading
+from typing import Callable, Dict, Optional
+
+DEFAULT_BACKEND = "gemini"
+
+_lock = threading.Lock()
+_configured = False
+_backend = None  # set_backend() override of MODEL_BACKEND
+_models = {}  # (backend, model name, generation config JSON) -> model
+
+
+def _gemini_configure(api_key: Optional[str] = None):
+    import google.generativeai as genai
+    genai.configure(api_key=api_key or os.getenv("GOOGLE_API_KEY"))
+
+
+def _gemini_model(model_name: str, generation_config: Optional[Dict] = None):
+    import google.generativeai as genai
+    return genai.GenerativeModel(model_name, generation_config=generation_config)
+
+
+def _local_model(model_name: str, generation_config: Optional[Dict] = None):
+    from Utils.LocalModel import LocalModel
+    return LocalModel(model_name, generation_config)
+
+
+# Backend name -> (configure(api_key) or None, factory(model_name, generation_config)).
+# A model must offer generate_content(prompt) and generate_content_async(prompt, stream=False)
+# returning objects with .text (stream=True: an async iterable of such chunks).
+BACKENDS = {
+    'gemini': (_gemini_configure, _gemini_model),
+    'local': (None, _local_model),
+}
+
+
+def register_backend(name: str, factory: Callable, configure_backend: Optional[Callable] = None):
+    """Add a model backend that MODEL_BACKEND (or set_backend) can select"""
+    BACKENDS[name.lower()] = (configure_backend, factory)
+
+
+def backend_name() -> str:
+    """The selected backend: set_backend() if called, else MODEL_BACKEND, else gemini"""
+    name = (_backend or os.getenv('MODEL_BACKEND') or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model backend {name!r} (available: {', '.join(sorted(BACKENDS))})")
+    return name
+
+
+def set_backend(name: Optional[str]):
+    """Select the backend for models built from now on (None goes back to MODEL_BACKEND)"""
+    global _backend, _configured
+    with _lock:
+        _backend = name.lower() if name else None
+        _configured = False
+    backend_name()
+
+
+def model_key(model_name: str) -> str:
+    """Model name qualified by backend, so cached responses from different backends never mix"""
+    backend = backend_name()
+    return model_name if backend == DEFAULT_BACKEND else f"{backend}/{model_name}"
+
+
+def configure(api_key: Optional[str] = None):
+    """Configure the selected backend's client once for the whole process"""
+    global _configured
+    with _lock:
+        if _configured:
+            return
+        configure_backend = BACKENDS[backend_name()][0]
+        if configure_backend:
+            configure_backend(api_key)
+        _configured = True
+
+
+def get_model(model_name: str, generation_config: Optional[Dict] = None):
+    """Return the shared model for this backend, name and generation config, building it once"""
+    backend = backend_name()
+    key = (backend, model_name, json.dumps(generation_config or {}, sort_keys=True))
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    configure()
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            model = BACKENDS[backend][1](model_name, generation_config)
+            _models[key] = model
+        return model
+
+
+def reset():
+    """Forget configuration and cached models (e.g. after rotating the API key)"""
+    global _configured
+    with _lock:
+        _models.clear()
+        _configured = False
@@ -1,20 +1,67 @@
 import os
-import pdfplumber
-import pytesseract
-from PIL import Image
-from pdf2image import convert_from_path
-import PyPDF2
-import re
-from typing import Dict, List, Optional
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from Utils.FormFields import default_extractor
+
+# pdfplumber, PyPDF2, pdf2image and pytesseract are imported where they are used:
+# together they take longer to import than the rest of the app, and many runs
+# (text reports, cached extractions, --help) never need them.
+
+# A page needs at least this much text to count as having a usable text layer
+MIN_PAGE_CHARS = 20
+
+# OCR rendering settings (override with OCR_DPI / OCR_MAX_WORKERS / OCR_MAX_RSS_MB)
+OCR_DPI = 200
+OCR_MAX_RSS_MB = 1024
+
+def _estimate_page_bytes(dpi: int) -> int:
+    """Approximate memory of one rendered US-letter RGB page at the given DPI"""
+    return int(8.5 * dpi) * int(11 * dpi) * 3
+
+def _page_windows(page_numbers: Iterable[int], window_size: int) -> List[Tuple[int, int]]:
+    """Group page numbers into contiguous (first_page, last_page) runs of at most window_size pages"""
+    windows = []
+    for page_number in sorted(set(page_numbers)):
+        if windows:
+            first, last = windows[-1]
+            if page_number == last + 1 and last - first + 1 < window_size:
+                windows[-1] = (first, page_number)
+                continue
+        windows.append((page_number, page_number))
+    return windows
+
+def _ocr_page_window(pdf_path: str, first_page: int, last_page: int, dpi: int) -> List[Tuple[int, str]]:
+    """Render and OCR one window of pages (runs inside a pool worker)"""
+    import pytesseract
+    from pdf2image import convert_from_path
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page)
+    texts = []
+    for offset, image in enumerate(images):
+        texts.append((first_page + offset, pytesseract.image_to_string(image)))
+        image.close()
+    return texts
+
+def extract_pdf(pdf_path: str) -> Tuple[Dict, str]:
+    """Uncached extraction returning (result, formatted text); a picklable entry point for worker processes"""
+    processor = PDFProcessor(pdf_path)
+    result = processor.process_pdf()
+    return result, processor.format_for_agents(result)
+
 
 class PDFProcessor:
+    # Bump whenever extraction output changes so cached results are invalidated
+    EXTRACTOR_VERSION = "5"
+
     def __init__(self, pdf_path: str):
         self.pdf_path = pdf_path
         self.extracted_text = ""
         self.structured_data = {}
+        self.cache_hit = False  # set by process_with_cache
         
     def extract_text_pdfplumber(self) -> str:
         """Extract text using pdfplumber (best for forms and structured PDFs)"""
+        import pdfplumber
         try:
             with pdfplumber.open(self.pdf_path) as pdf:
                 text = ""
@@ -29,6 +76,7 @@ class PDFProcessor:
     
     def extract_text_pypdf2(self) -> str:
         """Fallback method using PyPDF2"""
+        import PyPDF2
         try:
             with open(self.pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
@@ -40,131 +88,270 @@ class PDFProcessor:
             print(f"❌ Error with PyPDF2: {e}")
             return ""
     
-    def extract_text_ocr(self) -> str:
+    def extract_text_ocr(self, max_workers: Optional[int] = None, max_rss_mb: Optional[int] = None) -> str:
         """Extract text using OCR for scanned PDFs"""
+        from pdf2image import pdfinfo_from_path
         try:
-            # Convert PDF to images
-            images = convert_from_path(self.pdf_path)
-            text = ""
-            
-            for i, image in enumerate(images):
-                # Use OCR to extract text from image
-                page_text = pytesseract.image_to_string(image)
-                text += f"--- Page {i+1} ---\n{page_text}\n"
-            
-            return text
+            page_count = pdfinfo_from_path(self.pdf_path)['Pages']
+            page_texts = self.ocr_pages(range(1, page_count + 1), max_workers, max_rss_mb)
+            return "".join(f"--- Page {i} ---\n{page_texts[i]}\n" for i in sorted(page_texts))
         except Exception as e:
             print(f"❌ Error with OCR: {e}")
             return ""
+
+    def ocr_pages(self, page_numbers: Iterable[int], max_workers: Optional[int] = None,
+                  max_rss_mb: Optional[int] = None) -> Dict[int, str]:
+        """OCR the given 1-based pages in bounded render windows across a process pool.
+
+        Only a window of pages per worker is rasterised at a time, and the
+        window size is chosen so all workers together stay under max_rss_mb
+        of rendered images. Returns {page_number: text}.
+        """
+        page_numbers = sorted(set(page_numbers))
+        if not page_numbers:
+            return {}
+
+        dpi = int(os.getenv('OCR_DPI', OCR_DPI))
+        max_workers = max_workers or int(os.getenv('OCR_MAX_WORKERS', os.cpu_count() or 1))
+        max_rss_mb = max_rss_mb or int(os.getenv('OCR_MAX_RSS_MB', OCR_MAX_RSS_MB))
+
+        # Size workers and windows so rendered images fit the memory budget
+        page_bytes = _estimate_page_bytes(dpi)
+        budget_pages = max(1, (max_rss_mb * 1024 * 1024) // page_bytes)
+        workers = max(1, min(max_workers, len(page_numbers), budget_pages))
+        window_size = max(1, min(budget_pages // workers, -(-len(page_numbers) // workers)))
+        windows = _page_windows(page_numbers, window_size)
+
+        print(f"🔎 OCR {len(page_numbers)} page(s) in {len(windows)} window(s) with {workers} worker(s)")
+        page_texts = {}
+        if workers == 1:
+            for first_page, last_page in windows:
+                page_texts.update(_ocr_page_window(self.pdf_path, first_page, last_page, dpi))
+        else:
+            # Spawned, not forked: this can run inside the threaded server (profiled analyses, EXTRACTION_WORKERS=0)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = [executor.submit(_ocr_page_window, self.pdf_path, first_page, last_page, dpi)
+                           for first_page, last_page in windows]
+                for future in futures:
+                    page_texts.update(future.result())
+        return page_texts
     
+    def extract_pages(self) -> List[Dict]:
+        """Walk every page once, collecting text, tables and form fields together"""
+        import pdfplumber
+        pages = []
+        with pdfplumber.open(self.pdf_path) as pdf:
+            for page_number, page in enumerate(pdf.pages, start=1):
+                text = page.extract_text() or ""
+                tables = page.extract_tables() or []
+                pages.append({
+                    'page': page_number,
+                    'text': text,
+                    'tables': tables,
+                    'fields': self.parse_medical_form_fields(text) if text else {},
+                    'has_images': bool(page.images),
+                    'method': 'pdfplumber'
+                })
+                # Drop the parsed layout objects so long documents stay flat in memory
+                page.close()
+        return pages
+
+    def merge_page_results(self, pages: List[Dict]) -> Dict:
+        """Combine per-page fields and tables into a single structured_data dict"""
+        form_data = {}
+        tables = []
+        for page in pages:
+            form_data.update(page['fields'])
+            tables.extend(page['tables'])
+        if tables:
+            form_data['tables'] = tables
+        return form_data
+
     def extract_form_data(self) -> Dict:
         """Extract structured form data from medical incident reports"""
-        form_data = {}
-        
         try:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                for page in pdf.pages:
-                    # Extract tables if any
-                    tables = page.extract_tables()
-                    if tables:
-                        form_data['tables'] = tables
-                    
-                    # Extract text and look for form fields
-                    text = page.extract_text()
-                    if text:
-                        # Parse common medical form fields
-                        form_data.update(self.parse_medical_form_fields(text))
-                        
+            return self.merge_page_results(self.extract_pages())
         except Exception as e:
             print(f"❌ Error extracting form data: {e}")
-            
-        return form_data
+            return {}
     
     def parse_medical_form_fields(self, text: str) -> Dict:
-        """Parse common medical form fields using regex patterns"""
-        fields = {}
-        
-        # Common patterns for medical forms
-        patterns = {
-            'patient_name': r'(?:Name|Patient Name|PATIENT NAME)[\s:]*([A-Za-z\s]+)',
-            'date_of_birth': r'(?:DOB|Date of Birth|Birth Date)[\s:]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            'incident_date': r'(?:Date|Incident Date|Date of Incident)[\s:]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            'age': r'(?:Age)[\s:]*(\d{1,3})',
-            'gender': r'(?:Gender|Sex)[\s:]*([MF]|Male|Female)',
-            'staff_id': r'(?:Staff ID|Staff No|Employee ID)[\s:]*(\d+)',
-            'location': r'(?:Location|Where)[\s:]*([A-Za-z\s]+)',
-            'symptoms': r'(?:Symptoms|Signs|Complaint)[\s:]*([A-Za-z\s,.-]+)',
-            'injury_type': r'(?:Injury|Type of Injury)[\s:]*([A-Za-z\s,.-]+)',
-        }
-        
-        for field, pattern in patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                fields[field] = match.group(1).strip()
-        
-        return fields
+        """Parse common medical form fields with the shared single-scan extractor"""
+        return default_extractor.extract(text)
     
+    def extract_text_pypdf2_pages(self, page_numbers: Iterable[int]) -> Dict[int, str]:
+        """Extract text for selected 1-based pages with PyPDF2"""
+        import PyPDF2
+        page_texts = {}
+        try:
+            with open(self.pdf_path, 'rb') as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                for page_number in page_numbers:
+                    page_texts[page_number] = pdf_reader.pages[page_number - 1].extract_text() or ""
+        except Exception as e:
+            print(f"❌ Error with PyPDF2: {e}")
+        return page_texts
+
+    def count_pages(self) -> int:
+        """Number of pages, without relying on pdfplumber"""
+        import PyPDF2
+        from pdf2image import pdfinfo_from_path
+        try:
+            with open(self.pdf_path, 'rb') as file:
+                return len(PyPDF2.PdfReader(file).pages)
+        except Exception:
+            return pdfinfo_from_path(self.pdf_path)['Pages']
+
     def process_pdf(self) -> Dict:
-        """Main method to process PDF and extract all relevant information"""
+        """Main method to process PDF and extract all relevant information.
+
+        Extraction is decided page by page: pages with a usable pdfplumber
+        text layer keep it, thin pages are retried with PyPDF2, and only
+        pages that are still empty but carry images are rendered and OCR'd.
+        method_used maps each method to the pages it produced.
+        """
         result = {
             'success': False,
             'text': '',
             'structured_data': {},
-            'method_used': ''
+            'method_used': {},
+            'pages': []
         }
         
         print(f"🔍 Processing PDF: {self.pdf_path}")
         
-        # Try different extraction methods
-        methods = [
-            ('pdfplumber', self.extract_text_pdfplumber),
-            ('pypdf2', self.extract_text_pypdf2),
-            ('ocr', self.extract_text_ocr)
-        ]
+        # Single pdfplumber pass gives us text, tables and fields per page
+        print("📄 Trying pdfplumber...")
+        try:
+            pages = self.extract_pages()
+        except Exception as e:
+            print(f"❌ Error with pdfplumber: {e}")
+            # Without pdfplumber we know nothing about the pages, so every page is an OCR candidate
+            try:
+                page_count = self.count_pages()
+            except Exception as count_error:
+                print(f"❌ Could not read page count: {count_error}")
+                return result
+            pages = [{'page': n, 'text': '', 'tables': [], 'fields': {}, 'has_images': True, 'method': 'none'}
+                     for n in range(1, page_count + 1)]
         
-        for method_name, method_func in methods:
-            print(f"📄 Trying {method_name}...")
-            text = method_func()
-            
-            if text and len(text.strip()) > 50:  # Ensure meaningful text
-                result['text'] = text
-                result['method_used'] = method_name
-                result['success'] = True
-                print(f"✅ Successfully extracted text using {method_name}")
-                break
+        def is_thin(page):
+            return len(page['text'].strip()) < MIN_PAGE_CHARS
+        
+        # Retry thin pages with PyPDF2's text extractor
+        thin_pages = [page['page'] for page in pages if is_thin(page)]
+        if thin_pages:
+            print(f"📄 Trying pypdf2 on {len(thin_pages)} page(s)...")
+            for page_number, text in self.extract_text_pypdf2_pages(thin_pages).items():
+                page = pages[page_number - 1]
+                if len(text.strip()) > len(page['text'].strip()):
+                    page['text'] = text
+                    page['method'] = 'pypdf2'
+        
+        # OCR only the image-only pages that still have no usable text
+        scanned_pages = [page['page'] for page in pages if is_thin(page) and page['has_images']]
+        if scanned_pages:
+            print(f"📄 Trying ocr on {len(scanned_pages)} page(s)...")
+            try:
+                for page_number, text in self.ocr_pages(scanned_pages).items():
+                    page = pages[page_number - 1]
+                    if len(text.strip()) > len(page['text'].strip()):
+                        page['text'] = text
+                        page['method'] = 'ocr'
+            except Exception as e:
+                print(f"❌ Error with OCR: {e}")
         
-        # Extract structured form data
-        if result['success']:
-            result['structured_data'] = self.extract_form_data()
+        method_used = {}
+        for page in pages:
+            if page['method'] != 'pdfplumber':
+                page['fields'] = self.parse_medical_form_fields(page['text']) if page['text'] else {}
+            if not page['text'].strip():
+                page['method'] = 'none'
+            method_used.setdefault(page['method'], []).append(page['page'])
+        
+        # Form feeds mark page boundaries for chunked analysis of long reports
+        text = "\f".join(page['text'] + "\n" for page in pages if page['text'])
+        result['pages'] = pages
+        result['method_used'] = method_used
+        if len(text.strip()) > 50:  # Ensure meaningful text
+            result['text'] = text
+            result['structured_data'] = self.merge_page_results(pages)
+            result['success'] = True
+            print(f"✅ Successfully extracted text using {self.describe_methods(method_used)}")
             
         return result
     
+    @staticmethod
+    def describe_methods(method_used) -> str:
+        """Human-readable per-page method breakdown, e.g. 'pdfplumber (pages 1-3), ocr (page 4)'"""
+        if isinstance(method_used, str):
+            return method_used
+        
+        parts = []
+        for method, page_numbers in method_used.items():
+            ranges = _page_windows(page_numbers, len(page_numbers))
+            spans = [str(first) if first == last else f"{first}-{last}" for first, last in ranges]
+            label = "page" if len(page_numbers) == 1 else "pages"
+            parts.append(f"{method} ({label} {', '.join(spans)})")
+        return ", ".join(parts)
+    
+    @staticmethod
+    def format_table(table: List[List[Optional[str]]]) -> str:
+        """Render a table as pipe-delimited rows, dropping empty cells and empty rows"""
+        rows = []
+        for row in table:
+            cells = [" ".join(str(cell).split()).replace("|", "/") for cell in row if cell is not None]
+            cells = [cell for cell in cells if cell]
+            if cells:
+                rows.append("|".join(cells))
+        return "\n".join(rows)
+
     def format_for_agents(self, extraction_result: Dict) -> str:
-        """Format extracted data for medical agents"""
+        """Format extracted data for medical agents as compactly as possible"""
         if not extraction_result['success']:
             return "Error: Could not extract text from PDF"
         
-        formatted_text = f"""
-Medical Report Analysis
-=======================
-Extraction Method: {extraction_result['method_used']}
-
-RAW TEXT CONTENT:
-{extraction_result['text']}
-
-STRUCTURED DATA EXTRACTED:
-"""
+        # Built in one buffer: the report is copied into every specialist prompt
+        parts = [
+            "\nMedical Report Analysis\n=======================\n",
+            f"Extraction Method: {self.describe_methods(extraction_result['method_used'])}\n\n",
+            "RAW TEXT CONTENT:\n", extraction_result['text'], "\n\nSTRUCTURED DATA EXTRACTED:\n",
+        ]
         
         structured_data = extraction_result['structured_data']
         if structured_data:
             for key, value in structured_data.items():
                 if key != 'tables':
-                    formatted_text += f"{key.replace('_', ' ').title()}: {value}\n"
+                    parts.append(f"{key.replace('_', ' ').title()}: {value}\n")
             
             # Add tables if present
-            if 'tables' in structured_data:
-                formatted_text += "\nTABULAR DATA:\n"
-                for i, table in enumerate(structured_data['tables']):
-                    formatted_text += f"Table {i+1}:\n{table}\n"
+            tables = [self.format_table(table) for table in structured_data.get('tables', [])]
+            tables = [table for table in tables if table]
+            if tables:
+                parts.append("\nTABULAR DATA:\n")
+                for i, table in enumerate(tables):
+                    parts.append(f"Table {i+1}:\n{table}\n")
         
-        return formatted_text
\ No newline at end of file
+        return "".join(parts)
+
+    def process_with_cache(self, cache, extract: Optional[Callable[[str], Tuple[Dict, str]]] = None
+                           ) -> Tuple[Dict, str]:
+        """Process the PDF through an ExtractionCache, returning (result, formatted text).
+
+        On a miss, extract(pdf_path) does the work if given (e.g. ExtractionPool.extract).
+        """
+        key = cache.make_key(self.pdf_path, self.EXTRACTOR_VERSION)
+        entry = cache.get(key)
+        self.cache_hit = entry is not None
+        if entry is not None:
+            print(f"⚡ Extraction cache hit for: {self.pdf_path}")
+            return entry['result'], entry['formatted']
+
+        if extract is not None:
+            extraction_result, formatted = extract(self.pdf_path)
+        else:
+            extraction_result = self.process_pdf()
+            formatted = self.format_for_agents(extraction_result)
+        if extraction_result['success']:
+            cache.put(key, extraction_result, formatted)
+        return extraction_result, formatted
\ No newline at end of file
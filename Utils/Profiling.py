@@ -0,0 +1,166 @@
+import os
+import io
+import types
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+from Utils.Flags import env_flag, is_truthy
+
+DEFAULT_TOP = 25
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_started = False  # True when this module started tracing (and so may stop it)
+
+
+def profiling_enabled(flag: Optional[str] = None) -> bool:
+    """True when the request flag or, for every analysis, ANALYSIS_PROFILE asks for profiling"""
+    return is_truthy(flag) or env_flag('ANALYSIS_PROFILE')
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_started = True
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_started:
+            tracemalloc.stop()
+            _tracemalloc_started = False
+
+
+def _enable(profiler: cProfile.Profile) -> bool:
+    # Python 3.12+ allows one active profiler per process; overlapping segments go unprofiled
+    try:
+        profiler.enable()
+        return True
+    except ValueError:
+        return False
+
+
+@types.coroutine
+def _drive(coro, profiler: cProfile.Profile):
+    """Run coro with the profiler enabled only while coro itself is executing"""
+    value, error = None, None
+    while True:
+        enabled = _enable(profiler)
+        try:
+            yielded = coro.throw(error) if error is not None else coro.send(value)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            if enabled:
+                profiler.disable()
+        try:
+            value, error = (yield yielded), None
+        except BaseException as e:
+            value, error = None, e
+
+
+class AnalysisProfiler:
+    """cProfile and tracemalloc around one analysis.
+
+    The analysis coroutine is profiled step by step, so other analyses
+    sharing the event loop are left out, and blocking work it hands to
+    worker threads is profiled in those threads and merged in. Tasks it
+    spawns (the concurrent specialist calls) are not included, so their
+    time only shows up in the analysis's stage timings. tracemalloc is
+    process-wide and only runs while at least one profiled analysis is
+    active (unless something else started it); the allocation summary is
+    the growth seen during this analysis.
+    """
+
+    def __init__(self, analysis_id: str, output_dir: str = 'results', top: int = DEFAULT_TOP):
+        self.analysis_id = analysis_id
+        self.output_dir = output_dir
+        self.top = top
+        self._profiles = []  # cProfile.Profile per coroutine / worker-thread call
+        self._lock = threading.Lock()
+        self._start_snapshot = None
+        self._end_snapshot = None
+        self._peak_bytes = 0
+
+    def _new_profile(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    async def run(self, coro):
+        """Await coro under the profiler; tracemalloc runs from start to finish"""
+        _start_tracemalloc()
+        self._start_snapshot = tracemalloc.take_snapshot()
+        try:
+            return await _drive(coro, self._new_profile())
+        finally:
+            self._end_snapshot = tracemalloc.take_snapshot()
+            self._peak_bytes = tracemalloc.get_traced_memory()[1]
+            _stop_tracemalloc()
+
+    def profiled(self, func):
+        """Wrap a blocking callable so it is profiled in whichever thread runs it"""
+        def call(*args):
+            profile = self._new_profile()
+            enabled = _enable(profile)
+            try:
+                return func(*args)
+            finally:
+                if enabled:
+                    profile.disable()
+        return call
+
+    def _stats(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            profiles = [profile for profile in self._profiles if profile.getstats()]
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def _allocation_lines(self) -> List[str]:
+        lines = [f"Peak traced memory (whole process): {self._peak_bytes / 1024 / 1024:.1f} MB",
+                 f"Top {self.top} allocation sites by growth during the analysis:"]
+        if self._start_snapshot is None:
+            return lines
+        # Leave out the profiler's own bookkeeping
+        filters = [tracemalloc.Filter(False, module.__file__) for module in (tracemalloc, cProfile, pstats)]
+        filters.append(tracemalloc.Filter(False, __file__))
+        start = self._start_snapshot.filter_traces(filters)
+        end = self._end_snapshot.filter_traces(filters)
+        for stat in end.compare_to(start, 'lineno')[:self.top]:
+            lines.append(f"  {stat}")
+        return lines
+
+    def save(self) -> Dict[str, str]:
+        """Write <id>_profile.prof and <id>_profile_summary.txt; returns their file names"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        files = {}
+        stats = self._stats()
+        if stats is not None:
+            files['prof'] = f"{self.analysis_id}_profile.prof"
+            stats.dump_stats(os.path.join(self.output_dir, files['prof']))
+
+        summary = io.StringIO()
+        summary.write(f"Profile of {self.analysis_id} ({datetime.now().isoformat()})\n")
+        summary.write("Specialist calls run as separate tasks and are not included; see stage_timings.\n\n")
+        summary.write("\n".join(self._allocation_lines()) + "\n\n")
+        if stats is not None:
+            summary.write(f"Top {self.top} functions by cumulative time:\n")
+            stats.stream = summary
+            stats.sort_stats('cumulative').print_stats(self.top)
+        files['summary'] = f"{self.analysis_id}_profile_summary.txt"
+        with open(os.path.join(self.output_dir, files['summary']), "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        return files
@@ -0,0 +1,294 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+# Exception class names and HTTP status codes worth retrying
+TRANSIENT_ERRORS = ('ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable', 'InternalServerError',
+                    'DeadlineExceeded', 'GatewayTimeout', 'TimeoutError', 'ConnectionError')
+TRANSIENT_CODES = (429, 500, 502, 503, 504)
+
+# Requests/min when LLM_RPM is unset. This is a conservative free-tier figure:
+# paid Gemini tiers allow far more, and batch runs are throttled to this rate
+# until LLM_RPM is raised to the project's quota (0 disables the limit).
+DEFAULT_RPM = 60
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """True for rate limiting, overload and timeout errors that may succeed on retry"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, 'code', None)
+    if isinstance(code, int) and code in TRANSIENT_CODES:
+        return True
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens now, going into debt if needed; returns seconds to wait before using them"""
+        amount = min(amount, self.capacity)  # a request bigger than the bucket would never fit
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class LatencyTracker:
+    """Recent call latencies, for the hedging threshold"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = 20) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class RateLimiter:
+    """Process-wide gate in front of every model call.
+
+    Requests/min and tokens/min token buckets pace calls across all
+    analyses. Transient errors (429/5xx/timeouts) are retried with capped
+    exponential backoff and full jitter. With hedge_percentile set, a call
+    still unanswered after that percentile of recent latencies gets a
+    duplicate request, and whichever answers first wins; hedge_budget caps
+    duplicates at that fraction of all calls.
+
+    rpm defaults to DEFAULT_RPM, which is below most paid quotas; set LLM_RPM
+    to the project's quota so batch runs aren't held under it.
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None, call_timeout: Optional[float] = None,
+                 hedge_percentile: Optional[float] = None, hedge_budget: Optional[float] = None):
+        rpm = rpm if rpm is not None else float(os.getenv('LLM_RPM', DEFAULT_RPM))
+        tpm = tpm if tpm is not None else float(os.getenv('LLM_TPM', 1_000_000))
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('LLM_MAX_RETRIES', 4))
+        self.backoff_base = backoff_base if backoff_base is not None else float(os.getenv('LLM_BACKOFF_BASE', 1.0))
+        self.backoff_max = backoff_max if backoff_max is not None else float(os.getenv('LLM_BACKOFF_MAX', 30.0))
+        self.call_timeout = call_timeout if call_timeout is not None else float(os.getenv('LLM_CALL_TIMEOUT', 120))
+        hedge = hedge_percentile if hedge_percentile is not None else float(os.getenv('LLM_HEDGE_PERCENTILE', 0))
+        self.hedge_percentile = hedge or None
+        self.hedge_budget = hedge_budget if hedge_budget is not None else float(os.getenv('LLM_HEDGE_BUDGET', 0.1))
+        self.latency = {}  # call kind -> LatencyTracker
+        self.counters = {'calls': 0, 'retries': 0, 'failures': 0, 'hedges': 0, 'hedge_wins': 0}
+        self.throttled_seconds = 0.0
+        self.abandoned_calls = 0  # timed-out call_sync threads still waiting on their request
+        self._warned_throttle = False
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _reserve(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait:
+            with self._lock:
+                self.throttled_seconds += wait
+                warn, self._warned_throttle = not self._warned_throttle, True
+            if warn:
+                print("⏳ Model calls are being paced by the rate limiter; "
+                      "raise LLM_RPM / LLM_TPM if your quota allows more")
+        return wait
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _tracker(self, kind: str) -> LatencyTracker:
+        with self._lock:
+            return self.latency.setdefault(kind, LatencyTracker())
+
+    async def _attempt(self, factory: Callable[[], Awaitable], tokens: int):
+        await asyncio.sleep(self._reserve(tokens))
+        return await asyncio.wait_for(factory(), self.call_timeout) if self.call_timeout else await factory()
+
+    def _may_hedge(self) -> bool:
+        # Hedges are capped at a fraction of calls so a slow backend isn't hit with double load
+        with self._lock:
+            return self.counters['hedges'] < self.hedge_budget * self.counters['calls']
+
+    @staticmethod
+    def _close_result(result):
+        """Close any open streams in a losing request's result, e.g. (first chunk, stream) from open_stream"""
+        for item in result if isinstance(result, tuple) else (result,):
+            if hasattr(item, 'aclose'):
+                closing = asyncio.ensure_future(item.aclose())
+                closing.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    @classmethod
+    def _discard(cls, task: asyncio.Future):
+        """Cancel a losing request, closing its result if it finished anyway, and swallow any error"""
+        def cleanup(t):
+            if not t.cancelled() and t.exception() is None:
+                cls._close_result(t.result())
+        task.cancel()
+        task.add_done_callback(cleanup)
+
+    async def _hedged(self, factory: Callable[[], Awaitable], tokens: int, kind: str):
+        tracker = self._tracker(kind)
+        threshold = tracker.percentile(self.hedge_percentile) if self.hedge_percentile else None
+        started = time.monotonic()
+        tasks = [asyncio.ensure_future(self._attempt(factory, tokens))]
+        pending = set(tasks)
+        winner, error = None, None
+        try:
+            while pending:
+                timeout = threshold if len(tasks) == 1 and threshold is not None else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary is slower than the threshold: race a duplicate against it
+                    if not self._may_hedge():
+                        threshold = None
+                        continue
+                    self._count('hedges')
+                    tasks.append(asyncio.ensure_future(self._attempt(factory, tokens)))
+                    pending.add(tasks[-1])
+                    continue
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    tracker.record(time.monotonic() - started)
+                    if winner is not tasks[0]:
+                        self._count('hedge_wins')
+                    return winner.result()
+                error = next(iter(done)).exception()
+            raise error
+        finally:
+            # Losers still running are cancelled; ones that finished alongside the winner are closed
+            for task in tasks:
+                if task is not winner:
+                    self._discard(task)
+
+    async def call(self, factory: Callable[[], Awaitable], tokens: int = 0, kind: str = 'generate'):
+        """Await factory() under the rate limits, with retries and optional hedging.
+
+        factory must start a fresh request each time it is called. Non-transient
+        errors and the last transient error are raised to the caller.
+        """
+        self._count('calls')
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._hedged(factory, tokens, kind)
+            except Exception as e:
+                if attempt == self.max_retries or not is_transient_error(e):
+                    self._count('failures')
+                    raise
+                delay = self._backoff(attempt)
+                self._count('retries')
+                print(f"🔁 Transient model error ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def _call_with_timeout(self, func: Callable):
+        """Run func on its own thread so a hung request can't hold the caller past call_timeout.
+
+        A thread can't be interrupted, so a call that times out keeps its daemon
+        thread until the request returns; stats() reports how many are still
+        running as abandoned_calls.
+        """
+        if not self.call_timeout:
+            return func()
+        outcome = {}
+        finished = threading.Event()
+        state = {'abandoned': False}
+
+        def target():
+            try:
+                outcome['result'] = func()
+            except BaseException as e:
+                outcome['error'] = e
+            finally:
+                with self._lock:
+                    finished.set()
+                    if state['abandoned']:
+                        self.abandoned_calls -= 1
+
+        # Daemon: a request that never returns is abandoned rather than blocking shutdown
+        threading.Thread(target=target, name='llm-call', daemon=True).start()
+        if not finished.wait(self.call_timeout):
+            with self._lock:
+                if not finished.is_set():
+                    state['abandoned'] = True
+                    self.abandoned_calls += 1
+            if state['abandoned']:
+                raise TimeoutError(f"Model call took longer than {self.call_timeout:.0f}s")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
+
+    def call_sync(self, func: Callable, tokens: int = 0, kind: str = 'generate'):
+        """Blocking version of call() for synchronous callers (no hedging); attempts time out after call_timeout"""
+        self._count('calls')
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._reserve(tokens))
+            started = time.monotonic()
+            try:
+                result = self._call_with_timeout(func)
+                self._tracker(kind).record(time.monotonic() - started)
+                return result
+            except Exception as e:
+                if attempt == self.max_retries or not is_transient_error(e):
+                    self._count('failures')
+                    raise
+                delay = self._backoff(attempt)
+                self._count('retries')
+                print(f"🔁 Transient model error ({type(e).__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            latency = dict(self.latency)
+            stats = dict(self.counters, throttled_seconds=round(self.throttled_seconds, 2),
+                         abandoned_calls=self.abandoned_calls)
+        for kind, tracker in latency.items():
+            p50, p95 = tracker.percentile(50, 1), tracker.percentile(95, 1)
+            stats[f'{kind}_latency_p50'] = round(p50, 3) if p50 is not None else None
+            stats[f'{kind}_latency_p95'] = round(p95, 3) if p95 is not None else None
+        stats['rpm'] = self.requests.capacity if self.requests else None
+        stats['tpm'] = self.tokens.capacity if self.tokens else None
+        stats['hedge_percentile'] = self.hedge_percentile
+        return stats
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter configured from LLM_RPM, LLM_TPM (0 disables either), LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE, LLM_BACKOFF_MAX, LLM_CALL_TIMEOUT, LLM_HEDGE_PERCENTILE (0 = no hedging)
+    and LLM_HEDGE_BUDGET"""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
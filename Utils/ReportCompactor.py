@@ -0,0 +1,96 @@
+import re
+from typing import Dict, List, Tuple
+from Utils.Tokens import CHARS_PER_TOKEN
+
+BULLET = re.compile(r'^\s*(?:[-*•+]|\d+[.)])\s+(.*\S)')
+HEADING = re.compile(r'^\s*(?:#{1,6}\s+(.*\S)|\*\*(.+?)\*\*:?\s*$|((?:Section|Recommendations?|Findings?)\b.*)|'
+                     r'([A-Z][^.!?]{0,80}:)\s*$)')
+MARKDOWN = re.compile(r'\*\*|__|`')
+
+
+def _normalize(text: str) -> str:
+    """Key for spotting the same finding worded with different case or punctuation"""
+    return " ".join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+
+def _sections(report: str) -> List[Tuple[str, List[str]]]:
+    """Parse a report into (heading, bullets) pairs; prose lines are dropped"""
+    sections = []
+    heading, bullets = None, []
+    for line in report.splitlines():
+        bullet = BULLET.match(line)
+        if bullet:
+            bullets.append(MARKDOWN.sub('', bullet.group(1)).strip())
+            continue
+        match = HEADING.match(line)
+        if match:
+            if bullets or heading:
+                sections.append((heading, bullets))
+            heading = MARKDOWN.sub('', next(group for group in match.groups() if group)).strip()
+            bullets = []
+    if bullets or heading:
+        sections.append((heading, bullets))
+    return sections
+
+
+def _render(sections: List[Tuple[str, List[str]]], max_chars: int) -> str:
+    """Render sections in order until max_chars is used; empty sections are left out"""
+    lines, used = [], 0
+    for heading, bullets in sections:
+        if not bullets:
+            continue
+        heading_line = [heading] if heading else []
+        for bullet in bullets:
+            line = f"- {bullet}"
+            cost = len(line) + 1 + sum(len(h) + 1 for h in heading_line)
+            if used + cost > max_chars:
+                return "\n".join(lines)
+            lines.extend(heading_line)
+            lines.append(line)
+            used += cost
+            heading_line = []
+    return "\n".join(lines)
+
+
+def compact_reports(reports: Dict[str, str], max_tokens: int) -> Dict[str, str]:
+    """Shrink specialist reports to headings and bullet points within a shared token budget.
+
+    Findings repeated within or across reports are kept once (first
+    occurrence). Reports without any bullets keep their opening text. The
+    budget is split fairly: reports shorter than their share give the rest
+    to the longer ones.
+    """
+    seen = set()
+    parsed, prose = {}, set()
+    for name, report in reports.items():
+        sections = _sections(report or "")
+        had_bullets = any(bullets for _, bullets in sections)
+        for position, (heading, bullets) in enumerate(sections):
+            kept = []
+            for bullet in bullets:
+                key = _normalize(bullet)
+                if key and key not in seen:
+                    seen.add(key)
+                    kept.append(bullet)
+            sections[position] = (heading, kept)
+        if not had_bullets:
+            # Free-form prose: nothing to compact structurally
+            sections = [(None, [" ".join((report or "").split())])] if (report or "").strip() else []
+            prose.add(name)
+        parsed[name] = sections
+
+    full = {name: parsed[name][0][1][0] if name in prose and parsed[name] else _render(parsed[name], float('inf'))
+            for name in parsed}
+    remaining = max_tokens * CHARS_PER_TOKEN
+    compacted = {}
+    # Water-filling: smallest reports first, each capped at a fair share of what is left
+    for position, name in enumerate(sorted(full, key=lambda n: len(full[n]))):
+        share = remaining // (len(full) - position)
+        if len(full[name]) <= share:
+            compacted[name] = full[name]
+        elif name in prose:
+            compacted[name] = full[name][:share]
+        else:
+            compacted[name] = _render(parsed[name], share)
+        remaining -= len(compacted[name])
+    return {name: compacted[name] for name in reports}
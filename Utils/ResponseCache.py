@@ -0,0 +1,140 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional
+from Utils.Flags import env_flag
+
+DEFAULT_DB_PATH = os.path.join("cache", "llm_responses.sqlite3")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+
+class ResponseCache:
+    """SQLite-backed cache of model responses keyed by model, role and prompt hash.
+
+    Entries expire after ttl_seconds and the least recently used ones are
+    evicted once max_entries is exceeded. Only non-empty text responses are
+    ever stored.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                role TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, role: Optional[str], prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return f"{model_name}|{role or ''}|{prompt_hash}"
+
+    def get(self, model_name: str, role: Optional[str], prompt: str) -> Optional[str]:
+        """Return the cached response text, or None on a miss or expired entry"""
+        key = self.make_key(model_name, role, prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, model_name: str, role: Optional[str], prompt: str, response: Optional[str]):
+        """Store a response; None and empty responses are never cached"""
+        if not response or not response.strip():
+            return
+
+        key = self.make_key(model_name, role, prompt)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, role, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name, role, response, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired rows, then the least recently used rows over max_entries (lock held)"""
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache, or None unless LLM_CACHE_ENABLED is set.
+
+    Configured with LLM_CACHE_PATH, LLM_CACHE_TTL_HOURS and LLM_CACHE_MAX_ENTRIES.
+    """
+    global _default_cache
+    if not env_flag('LLM_CACHE_ENABLED'):
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            ttl_hours = os.getenv('LLM_CACHE_TTL_HOURS')
+            _default_cache = ResponseCache(
+                db_path=os.getenv('LLM_CACHE_PATH', DEFAULT_DB_PATH),
+                ttl_seconds=float(ttl_hours) * 3600 if ttl_hours else DEFAULT_TTL_SECONDS,
+                max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+            )
+        return _default_cache
@@ -0,0 +1,212 @@
+import os
+import base64
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_DB_PATH = os.path.join("cache", "results_index.sqlite3")
+DEFAULT_RESULTS_DIR = "results"
+FINAL_SUFFIX = "_final_diagnosis.txt"
+
+
+def _parse_analysis_id(filename: str) -> Optional[str]:
+    """The analysis ID in YYYYmmdd_HHMMSS_<analysis_id>_final_diagnosis.txt (None for older names)"""
+    if not filename.endswith(FINAL_SUFFIX):
+        return None
+    return '_'.join(filename[:-len(FINAL_SUFFIX)].split('_')[2:]) or None
+
+
+def _parse_timestamp(filename: str) -> Optional[datetime]:
+    """The YYYYmmdd_HHMMSS prefix of a saved result file"""
+    try:
+        return datetime.strptime('_'.join(filename.split('_')[:2]), '%Y%m%d_%H%M%S')
+    except ValueError:
+        return None
+
+
+class ResultsIndex:
+    """SQLite catalogue of saved final diagnoses.
+
+    Rows are added when results are written, so listing the archive is an
+    indexed range scan instead of a listdir() plus a stat() per file.
+    Rows are keyed on the analysis ID (the file name for results saved
+    before file names carried it), and pages are keyset-paginated on
+    (created_at, filename), newest first.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, results_dir: str = DEFAULT_RESULTS_DIR):
+        self.db_path = db_path
+        self.results_dir = results_dir
+        self._lock = threading.Lock()
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                analysis_id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                original_filename TEXT,
+                created_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                modified REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at, filename)")
+        self._conn.commit()
+
+    def _migrate(self):
+        """Re-key an index created when rows were keyed on filename"""
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(results)")]
+        if not columns or columns[0] == 'analysis_id':
+            return
+        self._conn.execute("ALTER TABLE results RENAME TO results_by_filename")
+        self._conn.execute("DROP INDEX IF EXISTS idx_results_created")
+        self._conn.execute("""
+            CREATE TABLE results (
+                analysis_id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                original_filename TEXT,
+                created_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                modified REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            INSERT OR REPLACE INTO results
+            SELECT COALESCE(analysis_id, filename), filename, original_filename, created_at, size, modified
+            FROM results_by_filename
+        """)
+        self._conn.execute("DROP TABLE results_by_filename")
+        self._conn.commit()
+
+    def _row_for(self, filename: str, analysis_id: Optional[str], original_filename: Optional[str]) -> Tuple:
+        stat = os.stat(os.path.join(self.results_dir, filename))
+        created = _parse_timestamp(filename)
+        created_at = created.timestamp() if created else stat.st_mtime
+        key = analysis_id or _parse_analysis_id(filename) or filename
+        return (key, filename, original_filename, created_at, stat.st_size, stat.st_mtime)
+
+    def add(self, filename: str, analysis_id: Optional[str] = None, original_filename: Optional[str] = None):
+        """Index a final diagnosis file that was just written to results_dir"""
+        row = self._row_for(filename, analysis_id, original_filename)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", row)
+            self._conn.commit()
+
+    def rebuild(self) -> int:
+        """Re-index every final diagnosis in results_dir; returns the number indexed"""
+        rows = []
+        if os.path.isdir(self.results_dir):
+            for filename in os.listdir(self.results_dir):
+                if filename.endswith(FINAL_SUFFIX):
+                    rows.append(self._row_for(filename, None, None))
+
+        with self._lock:
+            # Keep what only the live index knows (analysis IDs of older files, upload names)
+            known = {filename: (analysis_id, original_filename) for analysis_id, filename, original_filename
+                     in self._conn.execute("SELECT analysis_id, filename, original_filename FROM results")}
+            rows = [known[r[1]][:1] + r[1:2] + known[r[1]][1:] + r[3:] if r[1] in known else r for r in rows]
+            self._conn.execute("DELETE FROM results")
+            self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+        return len(rows)
+
+    @staticmethod
+    def encode_cursor(created_at: float, filename: str) -> str:
+        return base64.urlsafe_b64encode(f"{created_at!r}|{filename}".encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[float, str]:
+        """Raises ValueError on a malformed cursor"""
+        try:
+            created_at, filename = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|', 1)
+            return float(created_at), filename
+        except ValueError as e:  # also covers binascii and unicode errors
+            raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+    def page(self, limit: int = 10, cursor: Optional[str] = None, since: Optional[datetime] = None,
+             until: Optional[datetime] = None) -> Tuple[List[Dict], Optional[str]]:
+        """One page of results, newest first, plus the cursor for the next page (or None)"""
+        clauses, params = [], []
+        if cursor:
+            created_at, filename = self.decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND filename < ?))")
+            params += [created_at, created_at, filename]
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since.timestamp())
+        if until:
+            clauses.append("created_at < ?")
+            params.append(until.timestamp())
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT analysis_id, filename, original_filename, created_at, size, modified FROM results "
+                f"{where} ORDER BY created_at DESC, filename DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+
+        next_cursor = self.encode_cursor(rows[limit - 1][3], rows[limit - 1][1]) if len(rows) > limit else None
+        return [self._to_dict(row) for row in rows[:limit]], next_cursor
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        analysis_id, filename, original_filename, created_at, size, modified = row
+        timestamp_str = '_'.join(filename.split('_')[:2])
+        return {
+            'id': timestamp_str,
+            'analysis_id': analysis_id if analysis_id != filename else None,
+            'filename': original_filename or filename.replace(FINAL_SUFFIX, '').replace(timestamp_str + '_', ''),
+            'file': filename,
+            'date': datetime.fromtimestamp(created_at).strftime('%d/%m/%Y'),
+            'size': size,
+            'modified': datetime.fromtimestamp(modified).isoformat(),
+        }
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_results_index() -> ResultsIndex:
+    """Process-wide index configured from RESULTS_INDEX_PATH.
+
+    A new, empty index is filled from the results directory once, so existing
+    archives show up without running the rebuild command first.
+    """
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = ResultsIndex(db_path=os.getenv('RESULTS_INDEX_PATH', DEFAULT_DB_PATH))
+            if _default_index.count() == 0:
+                _default_index.rebuild()
+        return _default_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the saved results index")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every final diagnosis in the results directory")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR, help="Directory holding saved results")
+    parser.add_argument("--db", default=os.getenv('RESULTS_INDEX_PATH', DEFAULT_DB_PATH), help="Index database path")
+    args = parser.parse_args()
+
+    index = ResultsIndex(db_path=args.db, results_dir=args.results_dir)
+    if args.rebuild:
+        print(f"🔄 Rebuilding results index from {args.results_dir}...")
+        print(f"✅ Indexed {index.rebuild()} results into {args.db}")
+    else:
+        print(f"📊 {index.count()} results indexed in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+from Utils.Flags import env_flag
+
+# Terms that suggest a specialist is relevant, with weights. Multi-word terms
+# are matched as phrases; every term is matched on word boundaries.
+LEXICONS = {
+    "Cardiologist": {
+        'chest pain': 3, 'palpitation': 3, 'palpitations': 3, 'arrhythmia': 3, 'angina': 3,
+        'myocardial': 3, 'cardiac': 2, 'heart': 2, 'heart rate': 2, 'tachycardia': 3,
+        'bradycardia': 3, 'hypertension': 2, 'blood pressure': 2, 'ecg': 3, 'ekg': 3,
+        'syncope': 2, 'fainting': 2, 'cholesterol': 1, 'chest tightness': 2, 'bp': 1, 'hr': 1,
+    },
+    "Psychologist": {
+        'anxiety': 3, 'panic': 3, 'panic attack': 3, 'depression': 3, 'depressed': 3,
+        'stress': 2, 'mood': 2, 'insomnia': 2, 'sleep': 1, 'trauma': 2, 'ptsd': 3,
+        'suicidal': 3, 'self-harm': 3, 'psychiatric': 3, 'mental health': 3, 'counselling': 2,
+        'counseling': 2, 'agitation': 2, 'burnout': 2, 'fear': 1, 'worry': 1, 'distress': 2,
+    },
+    "Pulmonologist": {
+        'shortness of breath': 3, 'breathlessness': 3, 'dyspnea': 3, 'dyspnoea': 3,
+        'breathing': 2, 'cough': 2, 'wheeze': 3, 'wheezing': 3, 'asthma': 3, 'copd': 3,
+        'lung': 2, 'lungs': 2, 'respiratory': 2, 'spo2': 2, 'oxygen saturation': 2,
+        'pneumonia': 3, 'inhaler': 3, 'spirometry': 3, 'hyperventilation': 2, 'smoke inhalation': 3,
+    },
+}
+
+# Form fields that describe the complaint count double
+BOOSTED_FIELDS = ('symptoms', 'injury_type')
+
+# A term counts at most this many times, so one repeated word can't dominate
+MAX_HITS_PER_TERM = 3
+
+DEFAULT_THRESHOLD = 3.0
+
+
+class SpecialistRouter:
+    """Keyword/lexicon scorer that picks the specialists relevant to a report.
+
+    Each specialist scores the weighted hits of its lexicon in the report
+    text, plus double weight for hits in the symptom and injury fields.
+    Specialists at or above the threshold run. When none reach it, the best
+    scorer runs alone; when nothing matches at all (a sprained ankle, say)
+    no specialist runs and the team stage reviews the report directly.
+    """
+
+    def __init__(self, lexicons: Optional[Dict[str, Dict[str, float]]] = None, threshold: Optional[float] = None):
+        self.lexicons = lexicons or LEXICONS
+        self.threshold = threshold if threshold is not None else \
+            float(os.getenv('ROUTER_THRESHOLD', DEFAULT_THRESHOLD))
+        self._patterns = {}
+        for specialist, terms in self.lexicons.items():
+            alternation = '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+            self._patterns[specialist] = re.compile(rf'\b(?:{alternation})\b', re.IGNORECASE)
+
+    def score(self, text: str, structured_data: Optional[Dict] = None) -> Dict[str, float]:
+        boosted = " ".join(str(structured_data.get(field, '')) for field in BOOSTED_FIELDS) if structured_data else ""
+        scores = {}
+        for specialist, pattern in self._patterns.items():
+            weights = self.lexicons[specialist]
+            hits = {}
+            for match in pattern.finditer(text):
+                term = match.group(0).lower()
+                hits[term] = hits.get(term, 0) + 1
+            total = sum(weights[term] * min(count, MAX_HITS_PER_TERM) for term, count in hits.items())
+            total += 2 * sum(weights[match.group(0).lower()] for match in pattern.finditer(boosted))
+            scores[specialist] = float(total)
+        return scores
+
+    def route(self, text: str, structured_data: Optional[Dict] = None, specialists: Iterable[str] = None,
+              run_all: bool = False) -> Dict:
+        """Decide which specialists to run.
+
+        Returns {'selected', 'skipped', 'scores', 'threshold', 'reason'}.
+        """
+        specialists = list(specialists or self.lexicons)
+        if run_all or env_flag('ROUTER_RUN_ALL'):
+            return self._decision(specialists, [], {}, 'run_all')
+
+        scores = self.score(text, structured_data)
+        selected = [name for name in specialists if scores.get(name, 0) >= self.threshold]
+        reason = 'threshold'
+        if not selected:
+            best = max(specialists, key=lambda name: scores.get(name, 0))
+            if scores.get(best, 0) > 0:
+                selected, reason = [best], 'best_match'
+            else:
+                reason = 'no_signal'
+        skipped = [name for name in specialists if name not in selected]
+        return self._decision(selected, skipped, scores, reason)
+
+    def _decision(self, selected: List[str], skipped: List[str], scores: Dict[str, float], reason: str) -> Dict:
+        return {
+            'selected': selected,
+            'skipped': skipped,
+            'scores': scores,
+            'threshold': self.threshold,
+            'reason': reason,
+        }
+
+
+_default_router = None
+
+
+def get_router() -> SpecialistRouter:
+    """Process-wide router configured from ROUTER_THRESHOLD (ROUTER_RUN_ALL=1 disables routing)"""
+    global _default_router
+    if _default_router is None:
+        _default_router = SpecialistRouter()
+    return _default_router
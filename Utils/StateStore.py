@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAX_FINISHED = 100
+
+
+class AgentProgress:
+    __slots__ = ('status', 'progress')
+
+    def __init__(self, status='waiting', progress=0):
+        self.status = status
+        self.progress = progress
+
+
+class AnalysisRecord:
+    """Compact in-memory state of one analysis"""
+
+    __slots__ = ('analysis_id', 'status', 'progress', 'results', 'start_time', 'end_time',
+                 'file_path', 'original_filename', 'agent_progress', 'error', 'routing', 'stage_timings',
+                 'profile', 'finished_at', 'version')
+
+    def __init__(self, analysis_id: str, file_path: str, agent_keys: Iterable[str]):
+        self.analysis_id = analysis_id
+        self.status = 'queued'
+        self.progress = 0
+        self.results = {}
+        self.start_time = datetime.now()
+        self.end_time = None
+        self.file_path = file_path
+        self.original_filename = os.path.basename(file_path)
+        self.agent_progress = {key: AgentProgress() for key in agent_keys}
+        self.error = None
+        self.routing = None  # router decision: selected / skipped specialists and scores
+        self.stage_timings = []  # {'stage', 'seconds', 'detail', 'failed'} per finished stage
+        self.profile = None  # downloadable profiler output files, when profiling was requested
+        self.finished_at = None  # monotonic time, set once completed or failed
+        self.version = 0
+
+    def to_dict(self) -> Dict:
+        """The JSON-ready shape served by /status"""
+        status = {
+            'status': self.status,
+            'progress': self.progress,
+            'results': dict(self.results),
+            'start_time': self.start_time.isoformat(),
+            'file_path': self.file_path,
+            'original_filename': self.original_filename,
+            'agent_progress': {key: {'status': agent.status, 'progress': agent.progress}
+                               for key, agent in self.agent_progress.items()},
+        }
+        if self.end_time is not None:
+            status['end_time'] = self.end_time.isoformat()
+        if self.error is not None:
+            status['error'] = self.error
+        if self.routing is not None:
+            status['routing'] = self.routing
+        if self.stage_timings:
+            status['stage_timings'] = [dict(timing) for timing in self.stage_timings]
+        if self.profile is not None:
+            status['profile'] = dict(self.profile)
+        return status
+
+
+def _deep_sizeof(obj, seen=None) -> int:
+    """Approximate retained size of an object graph, following __slots__"""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__slots__'):
+        size += sum(_deep_sizeof(getattr(obj, slot), seen) for slot in obj.__slots__ if hasattr(obj, slot))
+    return size
+
+
+class StateStore:
+    """Lock-protected store of analysis records with eviction of finished analyses.
+
+    Every update bumps the record's version and wakes wait_for_change()
+    callers for that analysis only: each record has its own condition on
+    the shared lock, so a streamed chunk doesn't wake every listener.
+    Finished analyses are written to a small status file in persist_dir and
+    dropped from memory after ttl_seconds, or sooner when more than
+    max_finished are held. Evicted analyses are served from disk.
+    """
+
+    def __init__(self, persist_dir: str = 'results', ttl_seconds: Optional[float] = None,
+                 max_finished: Optional[int] = None):
+        self.persist_dir = persist_dir
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else \
+            float(os.getenv('ANALYSIS_STATE_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+        self.max_finished = max_finished if max_finished is not None else \
+            int(os.getenv('ANALYSIS_STATE_MAX_FINISHED', DEFAULT_MAX_FINISHED))
+        self.evictions = 0
+        self._records = {}
+        self._finished = OrderedDict()  # analysis_id -> finished_at, oldest first
+        self._lock = threading.RLock()
+        self._conditions = {}  # analysis_id -> Condition on _lock, for that record's listeners
+        self._created = threading.Condition(self._lock)  # listeners waiting for a record to appear
+
+    # ~~~~~~~~~~~~ Updates ~~~~~~~~~~~~
+    def _changed(self, record: AnalysisRecord):
+        # Lock held
+        record.version += 1
+        condition = self._conditions.get(record.analysis_id)
+        if condition is not None:  # None once evicted
+            condition.notify_all()
+
+    def create(self, analysis_id: str, file_path: str, agent_keys: Iterable[str]) -> AnalysisRecord:
+        with self._lock:
+            self._evict()
+            record = AnalysisRecord(analysis_id, file_path, agent_keys)
+            self._records[analysis_id] = record
+            self._conditions[analysis_id] = threading.Condition(self._lock)
+            self._changed(record)
+            self._created.notify_all()
+            return record
+
+    def update(self, record: AnalysisRecord, **fields):
+        """Set top-level fields (status, progress, error, ...) atomically"""
+        with self._lock:
+            for name, value in fields.items():
+                setattr(record, name, value)
+            self._changed(record)
+
+    def update_agent(self, record: AnalysisRecord, agent_key: str, status: Optional[str] = None,
+                     progress: Optional[int] = None, overall_progress: Optional[int] = None):
+        with self._lock:
+            agent = record.agent_progress.get(agent_key)
+            if agent is None:
+                return
+            if status is not None:
+                agent.status = status
+            if progress is not None:
+                agent.progress = progress
+            if overall_progress is not None:
+                record.progress = max(record.progress, overall_progress)
+            self._changed(record)
+
+    def append_result(self, record: AnalysisRecord, name: str, chunk: str):
+        with self._lock:
+            record.results[name] = (record.results.get(name) or '') + chunk
+            self._changed(record)
+
+    def set_result(self, record: AnalysisRecord, name: str, text: Optional[str]):
+        with self._lock:
+            record.results[name] = text
+            self._changed(record)
+
+    def add_stage(self, record: AnalysisRecord, span):
+        """Record how long a pipeline stage (a finished Metrics span) took for this analysis"""
+        timing = {'stage': span.stage, 'seconds': round(span.seconds, 4)}
+        if span.detail:
+            timing['detail'] = span.detail
+        if span.failed:
+            timing['failed'] = True
+        with self._lock:
+            record.stage_timings.append(timing)
+            self._changed(record)
+
+    def touch(self, analysis_id: str):
+        """Wake listeners without changing the record (e.g. queue position moved)"""
+        with self._lock:
+            record = self._records.get(analysis_id)
+            if record is not None:
+                self._changed(record)
+
+    def finish(self, record: AnalysisRecord, status: str, error: Optional[str] = None):
+        """Mark an analysis completed or failed and persist its final state"""
+        with self._lock:
+            record.status = status
+            record.error = error
+            record.end_time = datetime.now()
+            record.finished_at = time.monotonic()
+            if status == 'completed':
+                record.progress = 100
+            self._finished[record.analysis_id] = record.finished_at
+            snapshot = record.to_dict()
+            self._changed(record)
+        self._persist(record.analysis_id, snapshot)
+
+    # ~~~~~~~~~~~~ Persistence and eviction ~~~~~~~~~~~~
+    def _status_path(self, analysis_id: str) -> str:
+        return os.path.join(self.persist_dir, f"{analysis_id}_status.json")
+
+    def _persist(self, analysis_id: str, snapshot: Dict):
+        try:
+            os.makedirs(self.persist_dir, exist_ok=True)
+            with open(self._status_path(analysis_id), "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+        except OSError as e:
+            print(f"❌ Error saving analysis state: {e}")
+
+    def _load(self, analysis_id: str) -> Optional[Dict]:
+        # IDs come from URLs; never let them escape the results directory
+        if os.path.basename(analysis_id) != analysis_id:
+            return None
+        try:
+            with open(self._status_path(analysis_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _evict(self):
+        """Drop finished records past the TTL or over the count limit (lock held)"""
+        now = time.monotonic()
+        while self._finished:
+            analysis_id, finished_at = next(iter(self._finished.items()))
+            if now - finished_at < self.ttl_seconds and len(self._finished) <= self.max_finished:
+                break
+            del self._finished[analysis_id]
+            self._records.pop(analysis_id, None)
+            condition = self._conditions.pop(analysis_id, None)
+            if condition is not None:
+                condition.notify_all()  # listeners see the record is gone
+            self.evictions += 1
+
+    # ~~~~~~~~~~~~ Reads ~~~~~~~~~~~~
+    def get(self, analysis_id: str) -> Optional[AnalysisRecord]:
+        with self._lock:
+            self._evict()
+            return self._records.get(analysis_id)
+
+    def get_status(self, analysis_id: str) -> Optional[Dict]:
+        """Snapshot of an analysis, from memory or, once evicted, from disk"""
+        with self._lock:
+            self._evict()
+            record = self._records.get(analysis_id)
+            if record is not None:
+                return record.to_dict()
+        return self._load(analysis_id)
+
+    def version(self, analysis_id: str) -> int:
+        with self._lock:
+            record = self._records.get(analysis_id)
+            return record.version if record is not None else -1
+
+    def wait_for_change(self, analysis_id: str, seen_version: Optional[int], timeout: float = 15) -> int:
+        """Block until the record's version moves past seen_version; returns the current version"""
+        def current():
+            record = self._records.get(analysis_id)
+            return record.version if record is not None else -1
+
+        with self._lock:
+            condition = self._conditions.get(analysis_id, self._created)
+            condition.wait_for(lambda: current() != seen_version, timeout)
+            return current()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._records)
+
+    def memory_footprint(self) -> Dict:
+        with self._lock:
+            self._evict()
+            records = list(self._records.values())
+            finished = len(self._finished)
+        return {
+            'records': len(records),
+            'finished_records': finished,
+            'approx_bytes': sum(_deep_sizeof(record) for record in records),
+            'evictions': self.evictions,
+            'ttl_seconds': self.ttl_seconds,
+            'max_finished': self.max_finished,
+        }
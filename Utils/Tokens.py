@@ -0,0 +1,8 @@
+# Rough characters-per-token ratio for English text, used wherever a token count
+# is estimated without a tokenizer: progress, rate-limit budgets and chunk sizes
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for progress and budgeting"""
+    return len(text) // CHARS_PER_TOKEN
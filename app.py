@@ -8,18 +8,29 @@ import os
 import json
 import threading
 import time
+import uuid
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, send_from_directory
 from werkzeug.utils import secure_filename
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 from dotenv import load_dotenv
 
 # Import your existing modules
-from Utils.Agents import Cardiologist, Psychologist, Pulmonologist, MultidisciplinaryTeam
+from Utils.AnalysisEngine import PipelineHooks, get_engine
+from Utils.JobQueue import JobQueue, QueueFullError
+from Utils.StateStore import StateStore
+from Utils.ResultsIndex import get_results_index
 from Utils.PDFProcessor import PDFProcessor
+from Utils.ExtractionCache import get_extraction_cache
+from Utils.ExtractionPool import get_extraction_pool
+from Utils.ResponseCache import get_response_cache
+from Utils.RateLimiter import get_rate_limiter
+from Utils.Metrics import get_metrics
+from Utils.Profiling import AnalysisProfiler, profiling_enabled
+from Utils.ModelRegistry import backend_name, configure as configure_models
+from Utils.Flags import is_truthy
 
-# Load environment variables
+# Load environment variables (the model client itself is configured on first use)
 load_dotenv('apikey.env')
 
 app = Flask(__name__)
@@ -39,148 +50,233 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs('results', exist_ok=True)
 os.makedirs('templates', exist_ok=True)
 
+# Typical response length, used to turn streamed tokens into a progress estimate
+EXPECTED_RESPONSE_TOKENS = int(os.getenv('EXPECTED_RESPONSE_TOKENS', 900))
+
+def _stream_progress(tokens_received):
+    """Map tokens received so far onto 25-95% (100% is set only on completion)"""
+    return 25 + min(70, int(70 * tokens_received / EXPECTED_RESPONSE_TOKENS))
+
+class _StatusHooks(PipelineHooks):
+    """Mirror pipeline progress and streamed text into an analysis record"""
+
+    def __init__(self, store, record):
+        self.store = store
+        self.record = record
+
+    def _overall_progress(self, agent_key, progress):
+        # Specialists cover 30-80% of the overall bar
+        specialists = [agent.progress for key, agent in self.record.agent_progress.items()
+                       if key not in ('final', agent_key)]
+        specialists.append(progress)
+        return 30 + int(sum(specialists) / len(specialists) / 2)
+
+    def on_routing(self, decision):
+        logger.info(f"🧭 Specialists selected: {decision['selected']} ({decision['reason']})")
+        self.store.update(self.record, routing=decision)
+        for agent_name in decision['skipped']:
+            self.store.update_agent(self.record, agent_name.lower(), status='skipped', progress=100)
+
+    def on_agent_start(self, agent_name):
+        logger.info(f"🔄 Starting {agent_name} analysis...")
+        self.store.update_agent(self.record, agent_name.lower(), status='processing', progress=25)
+
+    def on_agent_chunk(self, agent_name, chunk, tokens_received):
+        agent_key = agent_name.lower()
+        if agent_key in self.record.agent_progress:
+            progress = _stream_progress(tokens_received)
+            self.store.append_result(self.record, agent_name, chunk)
+            self.store.update_agent(self.record, agent_key, progress=progress,
+                                    overall_progress=self._overall_progress(agent_key, progress))
+
+    def on_agent_done(self, agent_name, response):
+        agent_key = agent_name.lower()
+        if agent_key in self.record.agent_progress:
+            self.store.set_result(self.record, agent_name, response)
+            self.store.update_agent(self.record, agent_key, status='completed', progress=100,
+                                    overall_progress=self._overall_progress(agent_key, 100))
+        logger.info(f"✅ {agent_name} analysis completed and stored")
+
+    def on_team_start(self):
+        # Update progress after individual agents complete
+        logger.info("🏥 Running multidisciplinary team analysis...")
+        self.store.update_agent(self.record, 'final', status='processing', progress=25, overall_progress=80)
+
+    def on_team_chunk(self, chunk, tokens_received):
+        progress = _stream_progress(tokens_received)
+        self.store.append_result(self.record, 'FinalDiagnosis', chunk)
+        self.store.update_agent(self.record, 'final', progress=progress, overall_progress=80 + progress // 5)
+
+    def on_team_done(self, final_diagnosis):
+        logger.info("✅ Final diagnosis completed")
+
+    def on_stage(self, span):
+        self.store.add_stage(self.record, span)
+
+
 class AnalysisManager:
     def __init__(self):
-        self.current_analyses = {}
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # Compact records; finished analyses are evicted after a TTL and then served from disk
+        self.store = StateStore(persist_dir='results')
+        self.engine = get_engine()
+        # Admission control: bounded wait queue plus a cap on analyses running at once
+        self.queue = JobQueue(on_change=self._queue_changed)
+        # PDF parsing is CPU-bound, so it runs in worker processes instead of next to the request threads
+        self.extraction_pool = get_extraction_pool()
+        self.metrics = get_metrics()
+        self.analyses_total = self.metrics.counter('analyses_total', 'Finished analyses by outcome')
+        self.metrics.callback('queue_depth', 'Analyses waiting for a slot',
+                              lambda: self.queue.stats()['queued'])
+        self.metrics.callback('analyses_in_flight', 'Analyses currently running',
+                              lambda: self.queue.stats()['in_flight'])
+        self.metrics.callback('extraction_workers_busy', 'Extraction worker processes running a job',
+                              lambda: self.extraction_pool.stats()['busy'])
+        self.metrics.callback('extraction_jobs_total', 'PDF extractions run in worker processes by outcome',
+                              self._extraction_job_counts, kind='counter')
+    
+    def _extraction_job_counts(self):
+        stats = self.extraction_pool.stats()
+        return {(('outcome', name),): stats[name] for name in ('completed', 'failed', 'timeouts', 'crashed')}
     
-    def start_analysis(self, file_path, analysis_id):
-        """Start analysis in background thread"""
+    def _queue_changed(self, pending_ids):
+        # Everyone still waiting moved up a place
+        for analysis_id in pending_ids:
+            self.store.touch(analysis_id)
+    
+    def wait_for_change(self, analysis_id, seen_version, timeout=15):
+        """Block until the analysis version moves past seen_version; returns the current version"""
+        return self.store.wait_for_change(analysis_id, seen_version, timeout)
+    
+    def start_analysis(self, file_path, analysis_id, use_cache=True, run_all=False, upload_span=None,
+                       profile=False):
+        """Start an analysis that was already admitted with self.queue.admit()"""
         logger.info(f"🚀 Starting analysis {analysis_id} for file: {file_path}")
         
-        self.current_analyses[analysis_id] = {
-            'status': 'starting',
-            'progress': 0,
-            'results': {},
-            'start_time': datetime.now(),
-            'file_path': file_path,
-            'original_filename': os.path.basename(file_path),
-            'agent_progress': {
-                'cardiologist': {'status': 'waiting', 'progress': 0},
-                'psychologist': {'status': 'waiting', 'progress': 0},
-                'pulmonologist': {'status': 'waiting', 'progress': 0},
-                'final': {'status': 'waiting', 'progress': 0}
-            }
-        }
+        record = self.store.create(analysis_id, file_path,
+                                   ['cardiologist', 'psychologist', 'pulmonologist', 'final'])
+        if upload_span is not None:
+            self.store.add_stage(record, upload_span)
         
         # Start analysis in background
-        future = self.executor.submit(self._run_analysis, file_path, analysis_id)
+        self.engine.submit(self._run_queued(file_path, analysis_id, use_cache, run_all, profile))
         return analysis_id
     
-    def _run_analysis(self, file_path, analysis_id):
-        """Run the actual analysis (background thread)"""
+    async def _run_queued(self, file_path, analysis_id, use_cache=True, run_all=False, profile=False):
+        """Wait for a free analysis slot, then run the analysis"""
+        try:
+            with self.metrics.span('queue_wait') as span:
+                await self.queue.acquire(analysis_id)
+        except BaseException:
+            self.queue.cancel(analysis_id)
+            raise
+        self._add_stage(analysis_id, span)
+        started = time.monotonic()
+        try:
+            if profile:
+                status, error = await self._run_profiled(file_path, analysis_id, use_cache, run_all)
+            else:
+                status, error = await self._run_analysis(file_path, analysis_id, use_cache, run_all)
+            self._finish(self.store.get(analysis_id), status, error)
+        finally:
+            await self.queue.release(analysis_id, time.monotonic() - started)
+    
+    async def _run_profiled(self, file_path, analysis_id, use_cache=True, run_all=False):
+        """Run the analysis under cProfile and tracemalloc, then save both next to the results.
+
+        The profile is attached to the record before the analysis is marked finished,
+        so anything waiting for completion sees it.
+        """
+        logger.info(f"🔬 Profiling analysis {analysis_id}")
+        profiler = AnalysisProfiler(analysis_id, output_dir='results')
+        try:
+            return await profiler.run(self._run_analysis(file_path, analysis_id, use_cache, run_all, profiler))
+        finally:
+            try:
+                files = await self.engine.run_blocking(profiler.save)
+                record = self.store.get(analysis_id)
+                if record is not None:
+                    self.store.update(record, profile=files)
+                logger.info(f"🔬 Profile saved: {', '.join(files.values())}")
+            except Exception as e:
+                logger.error(f"❌ Error saving profile: {e}")
+    
+    async def _run_analysis(self, file_path, analysis_id, use_cache=True, run_all=False, profiler=None):
+        """Run the actual analysis (coroutine on the analysis engine loop).
+
+        Returns (status, error) for the caller to finish the record with.
+        With a profiler, blocking work is profiled in the worker threads too,
+        and PDF extraction runs in this process so it shows up in the profile.
+        """
+        store = self.store
+        blocking = profiler.profiled if profiler else lambda func: func
+        analysis = store.get(analysis_id)
         try:
             logger.info(f"🔍 Starting analysis for: {file_path}")
             
             # Update status
-            self.current_analyses[analysis_id]['status'] = 'processing_file'
-            self.current_analyses[analysis_id]['progress'] = 10
+            store.update(analysis, status='processing_file', progress=10)
             
-            # Process the file using your existing process_medical_report function
-            medical_report = self._process_medical_report(file_path)
+            # PDF parsing happens in an extraction worker process, waited on from the pool's own
+            # threads so it doesn't hold up the engine's blocking pool (or other extractions)
+            in_process = profiler is not None
+            with self.metrics.span('extraction') as span:
+                medical_report, structured_data = await self.engine.run_blocking(
+                    blocking(self._process_medical_report), file_path, span, in_process,
+                    executor=None if in_process else self.extraction_pool.wait_executor())
+                if not medical_report:
+                    span.fail()
+            store.add_stage(analysis, span)
             if not medical_report:
-                self.current_analyses[analysis_id]['status'] = 'error'
-                self.current_analyses[analysis_id]['error'] = 'Failed to process file'
                 logger.error(f"❌ Failed to process file: {file_path}")
-                return
+                return 'error', 'Failed to process file'
             
             logger.info(f"✅ Successfully processed file. Content length: {len(medical_report)}")
-            self.current_analyses[analysis_id]['progress'] = 25
-            
-            # Initialize agents with the actual medical report content
-            agents = {
-                "Cardiologist": Cardiologist(medical_report),
-                "Psychologist": Psychologist(medical_report),
-                "Pulmonologist": Pulmonologist(medical_report)
-            }
             
             logger.info("🤖 Running AI agents in parallel...")
-            self.current_analyses[analysis_id]['status'] = 'running_agents'
-            self.current_analyses[analysis_id]['progress'] = 30
-            
-            # Function to run individual agents (matches your main.py approach)
-            def get_response(agent_name, agent):
-                try:
-                    logger.info(f"🔄 Starting {agent_name} analysis...")
-                    
-                    # Update agent status to processing
-                    agent_key = agent_name.lower()
-                    if agent_key in self.current_analyses[analysis_id]['agent_progress']:
-                        self.current_analyses[analysis_id]['agent_progress'][agent_key]['status'] = 'processing'
-                        self.current_analyses[analysis_id]['agent_progress'][agent_key]['progress'] = 25
-                    
-                    # Run the actual AI agent
-                    result = agent.run()
-                    
-                    # Update progress
-                    if agent_key in self.current_analyses[analysis_id]['agent_progress']:
-                        self.current_analyses[analysis_id]['agent_progress'][agent_key]['progress'] = 75
-                        time.sleep(0.5)  # Brief pause for UI update
-                        self.current_analyses[analysis_id]['agent_progress'][agent_key]['progress'] = 100
-                    
-                    logger.info(f"✅ {agent_name} completed analysis")
-                    return agent_name, result
-                except Exception as e:
-                    logger.error(f"⚠️ Error in {agent_name}: {e}")
-                    return agent_name, f"Analysis error: {str(e)}"
-            
-            # Run agents concurrently (exactly like your main.py)
-            responses = {}
-            with ThreadPoolExecutor() as executor:
-                futures = {executor.submit(get_response, name, agent): name for name, agent in agents.items()}
-                
-                for future in as_completed(futures):
-                    agent_name, response = future.result()
-                    responses[agent_name] = response
-                    
-                    # Update agent status in real-time
-                    agent_key = agent_name.lower()
-                    if agent_key in self.current_analyses[analysis_id]['agent_progress']:
-                        self.current_analyses[analysis_id]['agent_progress'][agent_key]['status'] = 'completed'
-                        self.current_analyses[analysis_id]['agent_progress'][agent_key]['progress'] = 100
-                        self.current_analyses[analysis_id]['results'][agent_name] = response
-                    
-                    logger.info(f"✅ {agent_name} analysis completed and stored")
-            
-            # Update progress after individual agents complete
-            self.current_analyses[analysis_id]['progress'] = 80
+            store.update(analysis, status='running_agents', progress=30)
             
-            # Run multidisciplinary team analysis (exactly like your main.py)
-            logger.info("🏥 Running multidisciplinary team analysis...")
-            self.current_analyses[analysis_id]['agent_progress']['final']['status'] = 'processing'
-            
-            team_agent = MultidisciplinaryTeam(
-                cardiologist_report=responses.get("Cardiologist", ""),
-                psychologist_report=responses.get("Psychologist", ""),
-                pulmonologist_report=responses.get("Pulmonologist", "")
+            # Relevant specialists run concurrently, then the multidisciplinary team (exactly like your main.py)
+            responses, final_diagnosis = await self.engine.analyze(
+                medical_report, use_cache=use_cache, hooks=_StatusHooks(store, analysis), run_all=run_all,
+                structured_data=structured_data
             )
             
-            final_diagnosis = team_agent.run()
-            logger.info("✅ Final diagnosis completed")
+            # Save results to files (with timestamp to avoid conflicts)
+            with self.metrics.span('persist') as span:
+                await self.engine.run_blocking(blocking(self._save_results), analysis_id, responses,
+                                               final_diagnosis)
+            store.add_stage(analysis, span)
             
             # Complete analysis
-            self.current_analyses[analysis_id]['results']['FinalDiagnosis'] = final_diagnosis
-            self.current_analyses[analysis_id]['agent_progress']['final']['status'] = 'completed'
-            self.current_analyses[analysis_id]['agent_progress']['final']['progress'] = 100
-            self.current_analyses[analysis_id]['status'] = 'completed'
-            self.current_analyses[analysis_id]['progress'] = 100
-            self.current_analyses[analysis_id]['end_time'] = datetime.now()
-            
-            # Save results to files (with timestamp to avoid conflicts)
-            self._save_results(analysis_id, responses, final_diagnosis)
+            store.set_result(analysis, 'FinalDiagnosis', final_diagnosis)
+            store.update_agent(analysis, 'final', status='completed', progress=100)
             
             logger.info(f"✅ Analysis {analysis_id} completed successfully")
+            return 'completed', None
             
         except Exception as e:
             logger.error(f"❌ Analysis error: {e}")
-            self.current_analyses[analysis_id]['status'] = 'error'
-            self.current_analyses[analysis_id]['error'] = str(e)
+            return 'error', str(e)
+    
+    def _finish(self, analysis, status, error=None):
+        self.store.finish(analysis, status, error=error)
+        self.analyses_total.inc(status=status)
     
-    def _process_medical_report(self, file_path):
-        """Process medical report from file - exactly like your main.py"""
+    def _add_stage(self, analysis_id, span):
+        record = self.store.get(analysis_id)
+        if record is not None:
+            self.store.add_stage(record, span)
+    
+    def _process_medical_report(self, file_path, span=None, in_process=False):
+        """Process medical report from file - exactly like your main.py.
+
+        Returns (report text, structured form data or None), or (None, None)
+        on failure. span, if given, is labelled with the extraction method used.
+        PDFs are parsed by the extraction pool unless in_process is set.
+        """
         if not os.path.exists(file_path):
             logger.error(f"❌ File not found: {file_path}")
-            return None
+            return None, None
         
         file_extension = os.path.splitext(file_path)[1].lower()
         
@@ -188,10 +284,13 @@ class AnalysisManager:
             logger.info("📄 Processing PDF file...")
             try:
                 pdf_processor = PDFProcessor(file_path)
-                extraction_result = pdf_processor.process_pdf()
+                extraction_result, medical_report = pdf_processor.process_with_cache(
+                    get_extraction_cache(), None if in_process else self.extraction_pool.extract)
+                if span is not None:
+                    span.detail = 'cache' if pdf_processor.cache_hit else \
+                        '+'.join(sorted(extraction_result.get('method_used') or {})) or 'none'
                 
                 if extraction_result['success']:
-                    medical_report = pdf_processor.format_for_agents(extraction_result)
                     logger.info("✅ PDF processed successfully")
                     
                     # Save extracted text for reference (like your main.py)
@@ -202,29 +301,31 @@ class AnalysisManager:
                         f.write(medical_report)
                     logger.info(f"📝 Extracted text saved to: {extracted_text_path}")
                     
-                    return medical_report
+                    return medical_report, extraction_result.get('structured_data')
                 else:
                     logger.error("❌ Failed to extract text from PDF")
-                    return None
+                    return None, None
                     
             except Exception as e:
                 logger.error(f"❌ Error processing PDF: {e}")
-                return None
+                return None, None
                 
         elif file_extension == '.txt':
             logger.info("📝 Processing text file...")
+            if span is not None:
+                span.detail = 'text'
             try:
                 with open(file_path, "r", encoding="utf-8") as file:
                     medical_report = file.read()
                 logger.info("✅ Text file processed successfully")
-                return medical_report
+                return medical_report, None
             except Exception as e:
                 logger.error(f"❌ Error reading text file: {e}")
-                return None
+                return None, None
         else:
             logger.error(f"❌ Unsupported file format: {file_extension}")
             logger.error("Supported formats: .pdf, .txt")
-            return None
+            return None, None
     
     def _save_results(self, analysis_id, responses, final_diagnosis):
         """Save analysis results to files"""
@@ -232,20 +333,25 @@ class AnalysisManager:
         
         # Save individual reports (only for file system, not shown in UI history)
         for agent_name, response in responses.items():
-            filename = f"results/{timestamp}_{agent_name.lower()}_report.txt"
+            filename = f"results/{timestamp}_{analysis_id}_{agent_name.lower()}_report.txt"
             with open(filename, "w", encoding="utf-8") as f:
                 f.write(f"### {agent_name} Report:\n\n{response}")
             logger.info(f"📁 Saved {agent_name} report: {filename}")
         
         # Save final diagnosis
-        filename = f"results/{timestamp}_final_diagnosis.txt"
+        filename = f"results/{timestamp}_{analysis_id}_final_diagnosis.txt"
         with open(filename, "w", encoding="utf-8") as f:
             f.write(f"### Final Diagnosis:\n\n{final_diagnosis}")
         logger.info(f"📁 Saved final diagnosis: {filename}")
+        
+        # Catalogue it so /results never has to scan the directory
+        record = self.store.get(analysis_id)
+        get_results_index().add(os.path.basename(filename), analysis_id,
+                                record.original_filename if record else None)
     
     def get_analysis_status(self, analysis_id):
-        """Get current analysis status"""
-        return self.current_analyses.get(analysis_id, {})
+        """Get current analysis status (from disk once the record has been evicted)"""
+        return self.store.get_status(analysis_id) or {}
 
 # Initialize analysis manager
 analysis_manager = AnalysisManager()
@@ -267,19 +373,40 @@ def upload_file():
             return jsonify({'error': 'No file selected'}), 400
         
         if file:
-            # Secure filename and save
-            filename = secure_filename(file.filename)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            saved_filename = f"{timestamp}_{filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], saved_filename)
-            file.save(file_path)
+            analysis_id = f"analysis_{timestamp}_{uuid.uuid4().hex[:6]}"
             
-            logger.info(f"📁 File saved to: {file_path}")
-            logger.info(f"📊 File size: {os.path.getsize(file_path)} bytes")
+            # Admission control: reject fast instead of queueing without bound
+            try:
+                analysis_manager.queue.admit(analysis_id)
+            except QueueFullError as e:
+                logger.warning(f"🚦 Queue full, rejecting upload (retry after {e.retry_after}s)")
+                response = jsonify({'error': 'Server busy: analysis queue is full', 'retry_after': e.retry_after})
+                response.status_code = 429
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
             
-            # Start analysis
-            analysis_id = f"analysis_{timestamp}"
-            analysis_manager.start_analysis(file_path, analysis_id)
+            try:
+                # Secure filename and save
+                filename = secure_filename(file.filename)
+                saved_filename = f"{timestamp}_{filename}"
+                file_path = os.path.join(app.config['UPLOAD_FOLDER'], saved_filename)
+                with analysis_manager.metrics.span('upload_save') as save_span:
+                    file.save(file_path)
+                
+                logger.info(f"📁 File saved to: {file_path}")
+                logger.info(f"📊 File size: {os.path.getsize(file_path)} bytes")
+                
+                # Start analysis (no_cache=1 forces fresh model responses, run_all=1 skips routing,
+                # profile=1 saves a cProfile/tracemalloc report with the results)
+                use_cache = not is_truthy(request.form.get('no_cache'))
+                run_all = is_truthy(request.form.get('run_all'))
+                analysis_manager.start_analysis(file_path, analysis_id, use_cache=use_cache, run_all=run_all,
+                                                upload_span=save_span,
+                                                profile=profiling_enabled(request.form.get('profile')))
+            except Exception:
+                analysis_manager.queue.cancel(analysis_id)
+                raise
             
             logger.info(f"🚀 Started analysis with ID: {analysis_id}")
             
@@ -287,13 +414,22 @@ def upload_file():
                 'success': True,
                 'analysis_id': analysis_id,
                 'filename': filename,  # Return original filename for UI
-                'saved_as': saved_filename
+                'saved_as': saved_filename,
+                'queue_position': analysis_manager.queue.position(analysis_id),
+                'estimated_wait_seconds': analysis_manager.queue.estimated_wait(analysis_id)
             })
     
     except Exception as e:
         logger.error(f"Upload error: {e}")
         return jsonify({'error': str(e)}), 500
 
+def _serialize_status(analysis_id, status):
+    """Add live queue info to a status snapshot"""
+    if status.get('status') == 'queued':
+        status['queue_position'] = analysis_manager.queue.position(analysis_id)
+        status['estimated_wait_seconds'] = analysis_manager.queue.estimated_wait(analysis_id)
+    return status
+
 @app.route('/status/<analysis_id>')
 def get_status(analysis_id):
     """Get analysis status"""
@@ -301,50 +437,88 @@ def get_status(analysis_id):
     if not status:
         return jsonify({'error': 'Analysis not found'}), 404
     
-    # Convert datetime objects to strings for JSON serialization
-    status_copy = status.copy()
-    if 'start_time' in status_copy:
-        status_copy['start_time'] = status_copy['start_time'].isoformat()
-    if 'end_time' in status_copy:
-        status_copy['end_time'] = status_copy['end_time'].isoformat()
+    return jsonify(_serialize_status(analysis_id, status))
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/events/<analysis_id>')
+def analysis_events(analysis_id):
+    """Server-Sent Events stream of analysis changes.
+
+    Sends 'state' when status/progress change, 'chunk' with only the new text
+    of a growing result, 'result' when a result is replaced, and 'done' once
+    the analysis has completed or failed.
+    """
+    if not analysis_manager.get_analysis_status(analysis_id):
+        return jsonify({'error': 'Analysis not found'}), 404
     
-    return jsonify(status_copy)
+    def stream():
+        version = None
+        sent_state = None
+        sent_results = {}
+        while True:
+            new_version = analysis_manager.wait_for_change(analysis_id, version)
+            if new_version == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = new_version
+            
+            status = analysis_manager.get_analysis_status(analysis_id)
+            if not status:
+                yield _sse('done', {'status': 'error', 'error': 'Analysis not found'})
+                return
+            
+            # Snapshots are fresh copies, so they can be kept and compared directly
+            state = _serialize_status(analysis_id, status)
+            results = state.pop('results', {})
+            if state != sent_state:
+                yield _sse('state', state)
+                sent_state = state
+            
+            for agent_name, text in list(results.items()):
+                text = text or ''
+                previous = sent_results.get(agent_name)
+                if previous == text:
+                    continue
+                if previous is not None and text.startswith(previous):
+                    yield _sse('chunk', {'agent': agent_name, 'text': text[len(previous):]})
+                else:
+                    yield _sse('result', {'agent': agent_name, 'text': text})
+                sent_results[agent_name] = text
+            
+            if state.get('status') in ('completed', 'error'):
+                yield _sse('done', {'status': state['status'], 'error': state.get('error')})
+                return
+    
+    return app.response_class(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def _parse_date_arg(name):
+    """Parse a YYYY-MM-DD (or full ISO) query parameter, None when absent"""
+    value = request.args.get(name)
+    return datetime.fromisoformat(value) if value else None
 
 @app.route('/results')
 def list_results():
-    """List summary of analysis results (simplified for new UI)"""
+    """Page through saved analyses, newest first.
+
+    Query parameters: limit (default 10, max 100), cursor (from the previous
+    page's next_cursor), from / to (dates, to is exclusive).
+    """
     try:
-        # For the new UI, we return a simplified list
-        # The detailed results are managed client-side
-        results = []
-        results_dir = 'results'
-        
-        if os.path.exists(results_dir):
-            files = [f for f in os.listdir(results_dir) if f.endswith('_final_diagnosis.txt')]
-            files.sort(key=lambda x: os.path.getmtime(os.path.join(results_dir, x)), reverse=True)
-            
-            for file in files[:10]:  # Last 10 analyses
-                file_path = os.path.join(results_dir, file)
-                stat = os.stat(file_path)
-                
-                # Extract timestamp from filename
-                timestamp_str = file.split('_')[0] + '_' + file.split('_')[1]
-                try:
-                    analysis_date = datetime.strptime(timestamp_str, '%Y%m%d_%H%M%S')
-                    formatted_date = analysis_date.strftime('%d/%m/%Y')
-                except:
-                    formatted_date = datetime.fromtimestamp(stat.st_mtime).strftime('%d/%m/%Y')
-                
-                results.append({
-                    'id': timestamp_str,
-                    'filename': file.replace('_final_diagnosis.txt', '').replace(timestamp_str + '_', ''),
-                    'date': formatted_date,
-                    'size': stat.st_size,
-                    'modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
-                })
-        
-        return jsonify({'results': results})
+        limit = min(max(int(request.args.get('limit', 10)), 1), 100)
+        since = _parse_date_arg('from')
+        until = _parse_date_arg('to')
+        results, next_cursor = get_results_index().page(
+            limit=limit, cursor=request.args.get('cursor'), since=since, until=until
+        )
+        return jsonify({'results': results, 'next_cursor': next_cursor})
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -353,15 +527,39 @@ def download_file(filename):
     """Download result file"""
     return send_from_directory('results', filename)
 
+def _model_call_counts():
+    stats = get_rate_limiter().stats()
+    return {(('outcome', name),): stats[name] for name in ('calls', 'retries', 'failures', 'hedges', 'hedge_wins')}
+
+analysis_manager.metrics.callback('model_requests_total', 'Model calls through the rate limiter by outcome',
+                                  _model_call_counts, kind='counter')
+analysis_manager.metrics.callback('model_throttled_seconds_total', 'Time model calls waited for the rate limiter',
+                                  lambda: get_rate_limiter().stats()['throttled_seconds'], kind='counter')
+analysis_manager.metrics.callback('model_abandoned_calls', 'Timed-out synchronous model calls whose thread is still running',
+                                  lambda: get_rate_limiter().stats()['abandoned_calls'])
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text-format metrics: stage latency histograms, in-flight gauges, errors, queue depth"""
+    return app.response_class(analysis_manager.metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/debug')
 def debug_info():
     """Debug endpoint to check system status"""
     debug_data = {
         'api_key_configured': bool(os.getenv('GOOGLE_API_KEY')),
+        'model_backend': backend_name(),
         'uploads_directory': os.path.exists('uploads'),
         'results_directory': os.path.exists('results'),
         'templates_directory': os.path.exists('templates'),
-        'current_analyses': len(analysis_manager.current_analyses),
+        'current_analyses': len(analysis_manager.store),
+        'analysis_state': analysis_manager.store.memory_footprint(),
+        'queue': analysis_manager.queue.stats(),
+        'indexed_results': get_results_index().count(),
+        'extraction_cache': get_extraction_cache().stats(),
+        'extraction_pool': analysis_manager.extraction_pool.stats(),
+        'response_cache': get_response_cache().stats() if get_response_cache() else None,
+        'rate_limiter': get_rate_limiter().stats(),
         'server_time': datetime.now().isoformat()
     }
     return jsonify(debug_data)
@@ -371,6 +569,7 @@ if __name__ == '__main__':
     print("📍 Dashboard will be available at: http://localhost:5000")
     print("📊 Upload medical reports and view real-time analysis results")
     print("🔍 Debug endpoint available at: http://localhost:5000/debug")
+    print("📈 Metrics endpoint available at: http://localhost:5000/metrics")
     
     # Check API key on startup
     api_key = os.getenv('GOOGLE_API_KEY')
@@ -380,4 +579,11 @@ if __name__ == '__main__':
     else:
         print(f"✅ API Key configured (length: {len(api_key)})")
     
+    # Import and configure the model client in the background so the first upload doesn't wait for it
+    threading.Thread(target=configure_models, daemon=True).start()
+    
+    # Warm the extraction workers in the serving process (the debug reloader's watcher doesn't need them)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        analysis_manager.extraction_pool.start()
+    
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
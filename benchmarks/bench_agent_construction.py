@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Agent construction cost with per-agent Gemini setup vs. the shared model registry
+"""
+
+import os
+import sys
+import time
+import argparse
+import warnings
+
+warnings.filterwarnings('ignore', category=FutureWarning)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import google.generativeai as genai
+from google.generativeai import client as genai_client
+from Utils import ModelRegistry
+from Utils.Agents import Agent, Cardiologist, Psychologist, Pulmonologist, MultidisciplinaryTeam
+
+class PerAgentSetup(Agent):
+    """The original Agent.__init__: configure the client and build a model every time"""
+    def __init__(self, medical_report=None, role=None, extra_info=None):
+        self.medical_report = medical_report
+        self.role = role
+        self.extra_info = extra_info
+        genai.configure(api_key=os.getenv("GOOGLE_API_KEY") or "benchmark-key")
+        self.model = genai.GenerativeModel(self.model_name)
+        self.prompt_template = self.create_prompt_template()
+
+def build_analysis_legacy(report):
+    # Four agents per analysis, as app._run_analysis builds them
+    return [PerAgentSetup(report, role) for role in
+            ("Cardiologist", "Psychologist", "Pulmonologist", "MultidisciplinaryTeam")]
+
+def build_analysis_shared(report):
+    return [Cardiologist(report), Psychologist(report), Pulmonologist(report),
+            MultidisciplinaryTeam({"Cardiologist": "", "Psychologist": "", "Pulmonologist": ""})]
+
+def make_ready(agent):
+    # What GenerativeModel.generate_content does before its first request
+    if agent.model._client is None:
+        agent.model._client = genai_client.get_default_generative_client()
+
+def bench(builder, analyses):
+    start = time.perf_counter()
+    for _ in range(analyses):
+        for agent in builder("Patient Name: Test Patient\nAge: 35\nChief Complaint: chest pain"):
+            make_ready(agent)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Agent construction benchmark')
+    parser.add_argument('--analyses', type=int, default=100, help='Simulated analyses (4 agents each)')
+    args = parser.parse_args()
+
+    ModelRegistry.configure(os.getenv("GOOGLE_API_KEY") or "benchmark-key")
+    # Warm both paths once so import-time costs are excluded
+    for agent in build_analysis_legacy("") + build_analysis_shared(""):
+        make_ready(agent)
+
+    before = bench(build_analysis_legacy, args.analyses)
+    after = bench(build_analysis_shared, args.analyses)
+    agents = args.analyses * 4
+
+    print(f"📊 Agent construction + client setup ({args.analyses} analyses, {agents} agents)")
+    print(f"  Per-agent configure + model (before): {before * 1e6 / agents:8.1f} µs/agent  ({before:.3f}s total)")
+    print(f"  Shared model registry (after):        {after * 1e6 / agents:8.1f} µs/agent  ({after:.3f}s total)")
+    print(f"  Speedup:                              {before / after:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Benchmark - PDFProcessor extraction methods over synthetic medical PDFs
+
+Generates text-only, table-heavy, image-only (scanned) and mixed documents
+with reportlab, then times each extraction method in a fresh process so
+wall time, pages/sec and peak RSS are not skewed by earlier runs. Results
+are written as JSON; pass an earlier file with --compare to see the change.
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import multiprocessing
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+DOC_TYPES = ['text', 'tables', 'scanned', 'mixed']
+METHODS = ['extract_text_pdfplumber', 'extract_text_pypdf2', 'extract_text_ocr', 'extract_form_data', 'process_pdf']
+SCAN_DPI = 150
+# Fits the default letter frame (456 x 636 pt)
+SCAN_SIZE_INCHES = (6.25, 8.75)
+
+def _text_page(page, styles):
+    from reportlab.platypus import Paragraph
+    story = [Paragraph(f"CLINICAL NOTES - Page {page}", styles['Heading2']),
+             Paragraph("Patient Name: Jane Doe  DOB: 04/12/1975  Age: 49  Gender: Female", styles['Normal']),
+             Paragraph("Symptoms: shortness of breath, chest tightness, fatigue", styles['Normal'])]
+    for i in range(14):
+        story.append(Paragraph(
+            f"Note {i}: patient describes intermittent palpitations and breathlessness on exertion, sleep is "
+            f"disturbed, mood low but improving with support. Observations stable. Plan: continue monitoring.",
+            styles['Normal']))
+    return story
+
+def _table_page(page, styles):
+    from reportlab.lib import colors
+    from reportlab.platypus import Paragraph, Table, TableStyle
+    rows = [['Time', 'HR', 'BP', 'SpO2', 'Temp', 'Notes']]
+    rows += [[f"{h:02d}:00", str(60 + (h + page) % 40), f"{110 + h}/{70 + h}", f"{94 + h % 5}%", "36.8",
+              "" if h % 3 else "stable"] for h in range(24)]
+    table = Table(rows)
+    table.setStyle(TableStyle([('GRID', (0, 0), (-1, -1), 0.5, colors.black)]))
+    return [Paragraph(f"VITALS CHART - Page {page}", styles['Heading2']),
+            Paragraph("Patient Name: Jane Doe  Staff ID: 48213  Location: Ward C", styles['Normal']),
+            table]
+
+def _scanned_page(page, styles):
+    """A page that is only a raster image of text, like a scanner produces"""
+    from PIL import Image as PILImage, ImageDraw, ImageFont
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Image
+    width, height = int(SCAN_SIZE_INCHES[0] * SCAN_DPI), int(SCAN_SIZE_INCHES[1] * SCAN_DPI)
+    image = PILImage.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.load_default(size=24)
+    except TypeError:  # Pillow < 10.1 has a single fixed-size default font
+        font = ImageFont.load_default()
+    lines = [f"STAFF INCIDENT REPORT - Page {page}", "Staff Name: John Smith   Staff ID: 48213",
+             "Date of Incident: 03/14/2024   Location: Ward B", "Type of Injury: Sprain, left wrist",
+             "Symptoms: Swelling, pain on movement"]
+    lines += [f"Observation {i}: patient alert, vitals within normal range." for i in range(20)]
+    for i, line in enumerate(lines):
+        draw.text((40, 40 + i * 48), line, fill=0, font=font)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    buffer.seek(0)
+    return [Image(buffer, width=SCAN_SIZE_INCHES[0] * inch, height=SCAN_SIZE_INCHES[1] * inch)]
+
+PAGE_BUILDERS = {
+    'text': [_text_page],
+    'tables': [_table_page],
+    'scanned': [_scanned_page],
+    'mixed': [_text_page, _table_page, _scanned_page],
+}
+
+def create_document(pdf_path, doc_type, pages):
+    """Build a synthetic document; mixed cycles through text, table and scanned pages"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, PageBreak
+    styles = getSampleStyleSheet()
+    builders = PAGE_BUILDERS[doc_type]
+    story = []
+    for page in range(1, pages + 1):
+        story.extend(builders[(page - 1) % len(builders)](page, styles))
+        if page < pages:
+            story.append(PageBreak())
+    SimpleDocTemplate(pdf_path, pagesize=letter).build(story)
+
+def _peak_rss_mb(children=False):
+    if not children:
+        # ru_maxrss survives exec, so a spawned child would report the parent's peak; VmHWM starts fresh
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _measure(pdf_path, method, results):
+    """Child process: run one extraction method once"""
+    from Utils.PDFProcessor import PDFProcessor
+    processor = PDFProcessor(pdf_path)
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    output = getattr(processor, method)()
+    wall = time.perf_counter() - start
+    if isinstance(output, str):
+        size = {'chars': len(output)}
+    elif method == 'process_pdf':
+        size = {'chars': len(output['text']), 'success': output['success'],
+                'tables': len(output['structured_data'].get('tables', []))}
+    else:
+        size = {'fields': len([key for key in output if key != 'tables']), 'tables': len(output.get('tables', []))}
+    results.put({
+        'wall_seconds': wall,
+        'baseline_rss_mb': baseline,
+        'peak_rss_mb': _peak_rss_mb(),
+        # OCR renders and recognises pages in worker processes
+        'children_peak_rss_mb': _peak_rss_mb(children=True),
+        **size,
+    })
+
+def run_isolated(pdf_path, method, timeout):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_measure, args=(pdf_path, method, results))
+    process.start()
+    try:
+        return results.get(timeout=timeout)
+    except Exception:
+        return {'error': f'no result within {timeout}s' if process.is_alive() else f'exit code {process.exitcode}'}
+    finally:
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+
+def ocr_available():
+    return bool(shutil.which('tesseract') and shutil.which('pdftoppm'))
+
+def benchmark(pdf_path, doc_type, pages, method, repeats, timeout):
+    runs = [run_isolated(pdf_path, method, timeout) for _ in range(repeats)]
+    errors = [run['error'] for run in runs if 'error' in run]
+    runs = [run for run in runs if 'error' not in run]
+    row = {'doc_type': doc_type, 'pages': pages, 'method': method, 'repeats': len(runs)}
+    if errors:
+        row['errors'] = errors
+    if not runs:
+        return row
+    wall = statistics.median(run['wall_seconds'] for run in runs)
+    peaks = [run['peak_rss_mb'] for run in runs if run['peak_rss_mb'] is not None]
+    children = [run['children_peak_rss_mb'] for run in runs if run['children_peak_rss_mb'] is not None]
+    row.update({
+        'wall_seconds': round(wall, 4),
+        'wall_seconds_min': round(min(run['wall_seconds'] for run in runs), 4),
+        'pages_per_second': round(pages / wall, 2) if wall else None,
+        'baseline_rss_mb': runs[0]['baseline_rss_mb'],
+        'peak_rss_mb': max(peaks) if peaks else None,
+        'children_peak_rss_mb': max(children) if children else None,
+    })
+    row.update({key: runs[0][key] for key in ('chars', 'success', 'fields', 'tables') if key in runs[0]})
+    return row
+
+def _key(row):
+    return (row['doc_type'], row['pages'], row['method'])
+
+def compare(rows, baseline_path):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {_key(row): row for row in json.load(f)['results']}
+    print(f"\n📈 Compared with {baseline_path} (wall time, peak RSS)")
+    for row in rows:
+        old = baseline.get(_key(row))
+        if not old or 'wall_seconds' not in old or 'wall_seconds' not in row:
+            continue
+        change = 100 * (row['wall_seconds'] / old['wall_seconds'] - 1) if old['wall_seconds'] else 0.0
+        rss = ""
+        if old.get('peak_rss_mb') and row.get('peak_rss_mb'):
+            rss = f"{old['peak_rss_mb']:>8.0f} ->{row['peak_rss_mb']:>6.0f} MB"
+        print(f"  {row['doc_type']:<8}{row['pages']:>5}p  {row['method']:<26}"
+              f"{old['wall_seconds']:>8.3f}s ->{row['wall_seconds']:>8.3f}s {change:>+7.1f}%  {rss}")
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='PDF extraction benchmark suite')
+    parser.add_argument('--types', default=','.join(DOC_TYPES), help=f'Document types ({", ".join(DOC_TYPES)})')
+    parser.add_argument('--pages', default='1,10,50,200', help='Comma-separated page counts (1-200)')
+    parser.add_argument('--methods', default=','.join(METHODS), help='Comma-separated PDFProcessor methods')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per measurement (median is reported)')
+    parser.add_argument('--ocr-max-pages', type=int, default=50, help='Skip OCR on documents longer than this')
+    parser.add_argument('--timeout', type=float, default=1800, help='Seconds before a single run is abandoned')
+    parser.add_argument('--docs-dir', help='Keep generated PDFs here and reuse them on later runs')
+    parser.add_argument('--json', default=os.path.join('results', 'bench_pdf_extraction.json'),
+                        help='Where to write the results')
+    parser.add_argument('--compare', help='Earlier JSON results to compare against')
+    args = parser.parse_args()
+
+    doc_types = [t for t in args.types.split(',') if t]
+    page_counts = [int(p) for p in args.pages.split(',') if p]
+    methods = [m for m in args.methods.split(',') if m]
+    unknown = [t for t in doc_types if t not in DOC_TYPES] + [m for m in methods if m not in METHODS]
+    if unknown or not all(1 <= p <= 200 for p in page_counts):
+        parser.error(f"unknown type/method {unknown} or page count outside 1-200")
+    has_ocr = ocr_available()
+    if not has_ocr:
+        print("⚠️  tesseract/poppler not found: extract_text_ocr is skipped and scanned pages yield no text")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        docs_dir = args.docs_dir or tmp_dir
+        os.makedirs(docs_dir, exist_ok=True)
+        for doc_type in doc_types:
+            for pages in page_counts:
+                pdf_path = os.path.join(docs_dir, f'{doc_type}_{pages}p.pdf')
+                if not os.path.exists(pdf_path):
+                    print(f"📄 Creating {pages}-page {doc_type} document...")
+                    create_document(pdf_path, doc_type, pages)
+                for method in methods:
+                    if method == 'extract_text_ocr' and (not has_ocr or pages > args.ocr_max_pages):
+                        continue
+                    row = benchmark(pdf_path, doc_type, pages, method, args.repeats, args.timeout)
+                    row['file_bytes'] = os.path.getsize(pdf_path)
+                    rows.append(row)
+                    if 'wall_seconds' in row:
+                        print(f"  ⏱️  {doc_type:<8}{pages:>5}p  {method:<26}{row['wall_seconds']:>9.3f}s"
+                              f"{row['pages_per_second']:>9.1f} p/s  peak {row['peak_rss_mb']} MB")
+                    else:
+                        print(f"  ❌ {doc_type:<8}{pages:>5}p  {method:<26}{row.get('errors')}")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'ocr_available': has_ocr,
+            'repeats': args.repeats,
+        },
+        'results': rows,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📁 Results saved to: {args.json}")
+
+    if args.compare:
+        compare(rows, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Prompt size of the compact format_for_agents vs. the old repr-based one
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from Utils.PDFProcessor import PDFProcessor
+from Utils.Agents import estimate_tokens
+
+# Every analysis sends the formatted report to each specialist
+SPECIALIST_PROMPTS = 3
+
+def _build(pdf_path, story):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+    SimpleDocTemplate(pdf_path, pagesize=letter).build(story)
+
+def _grid(rows, spans=()):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+    table = Table(rows)
+    table.setStyle(TableStyle([('GRID', (0, 0), (-1, -1), 0.5, colors.black)] +
+                              [('SPAN', start, end) for start, end in spans]))
+    return table
+
+def create_vitals_chart(pdf_path, pages=10):
+    """Discharge summary with a dense vitals table on every page"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, PageBreak
+    styles = getSampleStyleSheet()
+    story = []
+    for page in range(1, pages + 1):
+        story.append(Paragraph(f"VITALS CHART - Page {page}", styles['Heading2']))
+        story.append(Paragraph("Patient Name: Jane Doe  DOB: 04/12/1975  Age: 49  Gender: Female", styles['Normal']))
+        rows = [['Time', 'HR', 'BP', 'SpO2', 'Temp', 'Notes']]
+        rows += [[f"{h:02d}:00", str(70 + h), f"{110 + h}/{70 + h}", f"{95 + h % 4}%", "36.8", "" if h % 3 else "stable"]
+                 for h in range(24)]
+        story.append(_grid(rows))
+        story.append(PageBreak())
+    _build(pdf_path, story)
+
+def create_incident_form(pdf_path, pages=4):
+    """Incident form laid out as a sparse grid with merged and empty cells"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, PageBreak
+    styles = getSampleStyleSheet()
+    story = []
+    for page in range(1, pages + 1):
+        story.append(Paragraph(f"STAFF INCIDENT REPORT FORM - Page {page}", styles['Heading2']))
+        rows = [
+            ['Staff Name:', 'John Smith', '', '', 'Staff ID:', '48213'],
+            ['Date of Incident:', '03/14/2024', '', '', 'Location:', 'Ward B'],
+            ['Type of Injury:', 'Sprain, left wrist', '', '', '', ''],
+            ['Symptoms:', 'Swelling, pain on movement', '', '', '', ''],
+            ['Witness', '', '', 'Contact', '', ''],
+            ['', '', '', '', '', ''],
+            ['First aid given:', 'Yes', 'By:', 'Nurse Lee', '', ''],
+        ]
+        story.append(_grid(rows, spans=[((1, 2), (5, 2)), ((1, 3), (5, 3)), ((0, 5), (5, 5))]))
+        story.append(PageBreak())
+    _build(pdf_path, story)
+
+def create_clinical_note(pdf_path, pages=5):
+    """Plain narrative clinical notes with no tables"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, PageBreak
+    styles = getSampleStyleSheet()
+    story = []
+    for page in range(1, pages + 1):
+        story.append(Paragraph(f"CLINICAL NOTES - Page {page}", styles['Heading2']))
+        for i in range(12):
+            story.append(Paragraph(
+                f"Note {i}: patient describes intermittent palpitations and breathlessness on exertion, "
+                f"sleep is disturbed, mood low but improving with support. Plan: continue monitoring.", styles['Normal']))
+        story.append(PageBreak())
+    _build(pdf_path, story)
+
+SAMPLES = {
+    'vitals_chart': create_vitals_chart,
+    'incident_form': create_incident_form,
+    'clinical_note': create_clinical_note,
+}
+
+def legacy_format_for_agents(processor, extraction_result):
+    """The original format_for_agents: += concatenation and repr() of table lists"""
+    formatted_text = f"""
+Medical Report Analysis
+=======================
+Extraction Method: {processor.describe_methods(extraction_result['method_used'])}
+
+RAW TEXT CONTENT:
+{extraction_result['text']}
+
+STRUCTURED DATA EXTRACTED:
+"""
+    structured_data = extraction_result['structured_data']
+    if structured_data:
+        for key, value in structured_data.items():
+            if key != 'tables':
+                formatted_text += f"{key.replace('_', ' ').title()}: {value}\n"
+        if 'tables' in structured_data:
+            formatted_text += "\nTABULAR DATA:\n"
+            for i, table in enumerate(structured_data['tables']):
+                formatted_text += f"Table {i+1}:\n{table}\n"
+    return formatted_text
+
+def measure(name, pdf_path):
+    processor = PDFProcessor(pdf_path)
+    result = processor.process_pdf()
+    before = legacy_format_for_agents(processor, result)
+    after = processor.format_for_agents(result)
+    return {
+        'sample': name,
+        'tables': len(result['structured_data'].get('tables', [])),
+        'before_chars': len(before),
+        'after_chars': len(after),
+        'before_tokens': estimate_tokens(before),
+        'after_tokens': estimate_tokens(after),
+        'before_tokens_per_analysis': estimate_tokens(before) * SPECIALIST_PROMPTS,
+        'after_tokens_per_analysis': estimate_tokens(after) * SPECIALIST_PROMPTS,
+        'reduction_pct': round(100 * (1 - len(after) / len(before)), 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Prompt size benchmark for format_for_agents')
+    parser.add_argument('--pdf', action='append', default=[], help='Extra PDF(s) to measure')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, create in SAMPLES.items():
+            pdf_path = os.path.join(tmp_dir, f'{name}.pdf')
+            print(f"📄 Creating sample: {name}")
+            create(pdf_path)
+            rows.append(measure(name, pdf_path))
+    for pdf_path in args.pdf:
+        rows.append(measure(os.path.basename(pdf_path), pdf_path))
+
+    print("\n📊 Prompt size per specialist (tokens ≈ chars / 4)")
+    print(f"  {'Sample':<24}{'Tables':>7}{'Before':>10}{'After':>10}{'Saved':>8}{'Per analysis':>22}")
+    for row in rows:
+        print(f"  {row['sample']:<24}{row['tables']:>7}{row['before_tokens']:>10}{row['after_tokens']:>10}"
+              f"{row['reduction_pct']:>7}%{row['before_tokens_per_analysis']:>11} -> {row['after_tokens_per_analysis']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n📁 Results saved to: {args.json}")
+
+if __name__ == "__main__":
+    main()
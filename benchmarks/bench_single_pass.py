@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Single-pass page walker vs. the old two-pass pdfplumber extraction
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import pdfplumber
+from Utils.PDFProcessor import PDFProcessor
+
+def create_discharge_summary(pdf_path, pages):
+    """Create a synthetic multi-page discharge summary with a vitals table on each page"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, PageBreak
+
+    styles = getSampleStyleSheet()
+    story = []
+    for page in range(1, pages + 1):
+        story.append(Paragraph(f"DISCHARGE SUMMARY - Page {page}", styles['Heading2']))
+        story.append(Paragraph("Patient Name: Jane Doe", styles['Normal']))
+        story.append(Paragraph("DOB: 04/12/1975 Age: 49 Gender: Female", styles['Normal']))
+        story.append(Paragraph(f"Date of Incident: 0{page % 9 + 1}/15/2024 Location: Ward C", styles['Normal']))
+        story.append(Paragraph("Symptoms: shortness of breath, chest tightness, fatigue", styles['Normal']))
+        for i in range(8):
+            story.append(Paragraph(
+                f"Progress note {i}: patient stable overnight, observations within expected range, "
+                f"continue current medication and review in the morning round.", styles['Normal']))
+        rows = [['Time', 'HR', 'BP', 'SpO2', 'Temp']]
+        rows += [[f"{h:02d}:00", str(70 + h), f"{110 + h}/{70 + h}", f"{95 + h % 4}%", "36.8"] for h in range(10)]
+        table = Table(rows)
+        table.setStyle(TableStyle([('GRID', (0, 0), (-1, -1), 0.5, colors.black)]))
+        story.append(table)
+        story.append(PageBreak())
+
+    SimpleDocTemplate(pdf_path, pagesize=letter).build(story)
+
+def two_pass_extraction(processor):
+    """The original process_pdf path: one pdfplumber pass for text, a second for tables/fields"""
+    text = processor.extract_text_pdfplumber()
+    form_data = {}
+    with pdfplumber.open(processor.pdf_path) as pdf:
+        for page in pdf.pages:
+            tables = page.extract_tables()
+            if tables:
+                form_data['tables'] = tables
+            page_text = page.extract_text()
+            if page_text:
+                form_data.update(processor.parse_medical_form_fields(page_text))
+    return text, form_data
+
+def single_pass_extraction(processor):
+    """The single-pass page walker used by process_pdf"""
+    pages = processor.extract_pages()
+    text = "".join(page['text'] + "\n" for page in pages if page['text'])
+    return text, processor.merge_page_results(pages)
+
+def time_it(func, processor, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = func(processor)
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+def main():
+    parser = argparse.ArgumentParser(description='Single-pass extraction benchmark')
+    parser.add_argument('--pages', type=int, default=40, help='Pages in the synthetic document')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per variant (best time is reported)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, 'discharge_summary.pdf')
+        print(f"📄 Creating {args.pages}-page synthetic discharge summary...")
+        create_discharge_summary(pdf_path, args.pages)
+        processor = PDFProcessor(pdf_path)
+
+        before, (before_text, before_data) = time_it(two_pass_extraction, processor, args.repeats)
+        after, (after_text, after_data) = time_it(single_pass_extraction, processor, args.repeats)
+
+    print("\n📊 Results (best of %d)" % args.repeats)
+    print(f"  Two-pass (before):    {before:.2f}s  ({args.pages / before:.1f} pages/s)")
+    print(f"  Single-pass (after):  {after:.2f}s  ({args.pages / after:.1f} pages/s)")
+    print(f"  Speedup:              {before / after:.2f}x")
+    print(f"  Same text:            {'✅' if before_text == after_text else '❌'}")
+    print(f"  Tables kept:          {len(before_data.get('tables', []))} before, {len(after_data.get('tables', []))} after")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Startup import time of Main.py and app.py
+
+Imports each entry point in a fresh interpreter with `python -X importtime`
+and fails (exit status 1) when the median import time exceeds its budget
+or when a heavy dependency (PDF/OCR libraries, the Gemini client) is
+imported at startup instead of on first use.
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Milliseconds; the model client and PDF libraries used to add ~550 ms to app.py
+DEFAULT_BUDGETS_MS = {'Main': 100, 'app': 250}
+
+# Loaded lazily by ModelRegistry / PDFProcessor; importing them at startup is a regression
+HEAVY_MODULES = ('google.generativeai', 'pdfplumber', 'PyPDF2', 'pytesseract', 'pdf2image', 'PIL')
+
+
+def parse_importtime(stderr, target):
+    """Imports made while importing target: [(name, self_us, cumulative_us, depth)], target's own row last"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+
+    # importtime lists a module after its children, so target's subtree is the run
+    # of rows since the previous top-level import (e.g. site)
+    for end in range(len(rows) - 1, -1, -1):
+        if rows[end][0] == target and rows[end][3] == 0:
+            break
+    else:
+        return []
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def measure(target, python):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # app.py creates uploads/, results/ and templates/ in the working directory
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+        result = subprocess.run([python, '-X', 'importtime', '-c', f'import {target}'],
+                                cwd=tmp_dir, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+    rows = parse_importtime(result.stderr, target)
+    if not rows:
+        raise RuntimeError(f"No importtime output for {target}")
+    return rows
+
+
+def heavy_imports(rows):
+    names = {name for name, _, _, _ in rows}
+    return [heavy for heavy in HEAVY_MODULES if heavy in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup import-time benchmark with a time budget')
+    parser.add_argument('--targets', default='Main,app', help='Comma-separated modules to import')
+    parser.add_argument('--repeats', type=int, default=5, help='Fresh interpreters per target (median is used)')
+    parser.add_argument('--budget', action='append', default=[], metavar='TARGET=MS',
+                        help='Override a budget, e.g. --budget app=300 (repeatable)')
+    parser.add_argument('--top', type=int, default=8, help='Slowest direct imports to list per target')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter to measure')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    for item in args.budget:
+        target, _, ms = item.partition('=')
+        budgets[target] = float(ms)
+
+    results, failures = [], []
+    for target in [t.strip() for t in args.targets.split(',') if t.strip()]:
+        runs = [measure(target, args.python) for _ in range(args.repeats)]
+        totals_ms = [rows[-1][2] / 1000 for rows in runs]
+        median_ms = statistics.median(totals_ms)
+        budget_ms = budgets.get(target)
+
+        # Slowest direct imports, from the median run
+        rows = runs[totals_ms.index(sorted(totals_ms)[len(totals_ms) // 2])]
+        direct = sorted((row for row in rows if row[3] == 1), key=lambda row: row[2], reverse=True)
+        heavy = heavy_imports(rows)
+
+        within_budget = budget_ms is None or median_ms <= budget_ms
+        status = "✅" if within_budget and not heavy else "❌"
+        print(f"\n{status} import {target}: median {median_ms:.1f} ms "
+              f"(min {min(totals_ms):.1f}, max {max(totals_ms):.1f}, budget "
+              f"{f'{budget_ms:.0f} ms' if budget_ms is not None else 'none'})")
+        for name, _, cumulative_us, _ in direct[:args.top]:
+            print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+        if not within_budget:
+            failures.append(f"{target}: {median_ms:.1f} ms > {budget_ms:.0f} ms budget")
+        if heavy:
+            print(f"   ⚠️ Heavy modules imported at startup: {', '.join(heavy)}")
+            failures.append(f"{target}: imports {', '.join(heavy)} at startup")
+
+        results.append({
+            'target': target,
+            'median_ms': round(median_ms, 1),
+            'runs_ms': [round(ms, 1) for ms in totals_ms],
+            'budget_ms': budget_ms,
+            'heavy_imports': heavy,
+            'slowest_imports': [{'module': name, 'cumulative_ms': round(cumulative_us / 1000, 1)}
+                                for name, _, cumulative_us, _ in direct[:args.top]],
+        })
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({'python': args.python, 'repeats': args.repeats, 'results': results}, f, indent=2)
+        print(f"\n📁 Results saved to: {args.json}")
+
+    if failures:
+        print("\n❌ Startup budget exceeded:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("\n✅ All targets within their startup budget")
+
+
+if __name__ == "__main__":
+    main()
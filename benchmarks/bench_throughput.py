@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark - End-to-end analysis throughput against the local model stand-in
+
+Runs the web app (uploads through Flask's test client) or Main.py's batch
+mode over synthetic reports with MODEL_BACKEND=local, so results depend
+only on the configured latency/error profile, not on the network or keys.
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+REPORTS = [
+    "Patient reports chest pain and palpitations on exertion; ECG shows sinus tachycardia. "
+    "Blood pressure 150/95. History of hypertension.",
+    "Patient describes panic attacks, anxiety and insomnia over the last month, with shortness of breath "
+    "and chest tightness during episodes.",
+    "Persistent cough and wheezing, asthma since childhood, uses an inhaler twice daily. SpO2 94%.",
+    "Incident report. Type of Injury: sprained ankle after slipping on a wet floor. Symptoms: swelling.",
+]
+
+
+def write_reports(folder, count, repeat):
+    """count distinct .txt reports; repeat > 1 makes each one longer"""
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"report_{i:04d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Report {i}. " + " ".join([REPORTS[i % len(REPORTS)]] * repeat))
+        paths.append(path)
+    return paths
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 3) if ordered else None
+
+
+def bench_app(paths):
+    import importlib.util
+    spec = importlib.util.spec_from_file_location('app', os.path.join(REPO_ROOT, 'app.py'))
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+    client = app_module.app.test_client()
+    store = app_module.analysis_manager.store
+
+    started = time.perf_counter()
+    ids, rejected = [], 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            response = client.post('/upload', data={'file': (io.BytesIO(f.read()), os.path.basename(path))})
+        if response.status_code == 429:
+            rejected += 1
+        else:
+            ids.append(response.get_json()['analysis_id'])
+
+    latencies, failed = [], 0
+    for analysis_id in ids:
+        while store.get(analysis_id).status not in ('completed', 'error'):
+            time.sleep(0.05)
+        record = store.get(analysis_id)
+        failed += record.status == 'error'
+        latencies.append((record.end_time - record.start_time).total_seconds())
+    wall = time.perf_counter() - started
+    return {
+        'completed': len(ids) - failed,
+        'failed': failed,
+        'rejected': rejected,
+        'wall_seconds': round(wall, 2),
+        'docs_per_minute': round((len(ids) - failed) * 60 / wall, 2),
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95),
+        'rate_limiter': app_module.get_rate_limiter().stats(),
+    }
+
+
+def bench_batch(folder, args):
+    from Utils.AnalysisEngine import AnalysisEngine
+    from Utils.BatchRunner import BatchRunner
+    from Utils.RateLimiter import get_rate_limiter
+    engine = AnalysisEngine(max_concurrency=args.max_concurrency)
+    runner = BatchRunner(engine, output_dir=os.path.join(os.path.dirname(folder), 'batch_out'),
+                         use_cache=False, force=True)
+    started = time.perf_counter()
+    runner.run(folder)
+    summary = runner.summary(time.perf_counter() - started)
+    summary['rate_limiter'] = get_rate_limiter().stats()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analysis throughput benchmark with the local model backend')
+    parser.add_argument('--target', choices=['app', 'batch'], default='app',
+                        help='app: uploads through the Flask app; batch: Main.py --batch pipeline')
+    parser.add_argument('--reports', type=int, default=20, help='Number of reports to analyze')
+    parser.add_argument('--repeat', type=int, default=1, help='Repeat each report body to make it longer')
+    parser.add_argument('--latency', default='lognormal:0.5,0.3', help='LOCAL_MODEL_LATENCY distribution')
+    parser.add_argument('--chunk-delay', type=float, default=0.02, help='Seconds between streamed chunks')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of model calls that fail')
+    parser.add_argument('--max-concurrency', type=int, default=8, help='Model calls in flight')
+    parser.add_argument('--rpm', type=float, default=0, help='LLM_RPM limit (0 = unlimited)')
+    parser.add_argument('--seed', default='0', help='LOCAL_MODEL_SEED')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    os.environ.update({
+        'MODEL_BACKEND': 'local',
+        'LOCAL_MODEL_LATENCY': args.latency,
+        'LOCAL_MODEL_CHUNK_DELAY': str(args.chunk_delay),
+        'LOCAL_MODEL_ERROR_RATE': str(args.error_rate),
+        'LOCAL_MODEL_SEED': args.seed,
+        'MAX_CONCURRENT_MODEL_CALLS': str(args.max_concurrency),
+        'MAX_QUEUE_DEPTH': str(args.reports),
+        'LLM_RPM': str(args.rpm),
+        'LLM_BACKOFF_BASE': '0.1',
+        'LLM_CACHE_ENABLED': '',
+    })
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)  # uploads/, results/ and cache/ stay out of the repo
+        paths = write_reports(os.path.join(tmp_dir, 'reports'), args.reports, args.repeat)
+        print(f"🚀 {args.target}: {args.reports} reports, latency {args.latency}, "
+              f"error rate {args.error_rate}, {args.max_concurrency} concurrent model calls")
+        result = bench_app(paths) if args.target == 'app' else bench_batch(os.path.dirname(paths[0]), args)
+        os.chdir(REPO_ROOT)
+
+    result = {'target': args.target, 'reports': args.reports, 'latency': args.latency,
+              'chunk_delay': args.chunk_delay, 'error_rate': args.error_rate,
+              'max_concurrency': args.max_concurrency, 'seed': args.seed, **result}
+    print("\n📊 Throughput")
+    for key in ('completed', 'failed', 'rejected', 'skipped', 'wall_seconds', 'docs_per_minute',
+                'latency_p50', 'latency_p95'):
+        if key in result:
+            print(f"   {key:<16} {result[key]}")
+    limiter = result['rate_limiter']
+    print(f"   model calls      {limiter['calls']} (retries {limiter['retries']}, failures {limiter['failures']})")
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n📁 Results saved to: {json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -134,7 +134,7 @@ def test_pdf_extraction(pdf_path):
         
         if result['success']:
             print(f"  ✅ PDF extraction successful")
-            print(f"  📄 Method: {result['method_used']}")
+            print(f"  📄 Method: {processor.describe_methods(result['method_used'])}")
             print(f"  📝 Text length: {len(result['text'])} chars")
             
             # Show first 100 characters
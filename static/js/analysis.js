@@ -22,6 +22,13 @@ async function startAnalysis() {
 
         const result = await response.json();
 
+        if (response.status === 429) {
+            const retryAfter = response.headers.get('Retry-After') || result.retry_after;
+            showError(`Server is busy. Please try again in about ${retryAfter} seconds.`);
+            resetAnalysisState();
+            return;
+        }
+
         if (result.success) {
             currentAnalysisId = result.analysis_id;
             
@@ -34,8 +41,8 @@ async function startAnalysis() {
             finalDiagnosis.container.classList.remove('hidden');
             finalDiagnosis.container.classList.add('fade-in');
 
-            // Start polling for status updates
-            startStatusPolling();
+            // Subscribe to status updates (falls back to polling)
+            startStatusStream();
 
             analyzeBtn.innerHTML = '<span class="loading-spinner"></span> Analyzing with AI...';
         } else {
@@ -56,6 +63,8 @@ function resetAnalysisUI() {
         agent.progress.style.width = '0%';
         agent.content.classList.add('hidden');
         agent.content.textContent = '';
+        delete agent.content.dataset.renderedLength;
+        delete agent.content.dataset.skipped;
     });
 
     // Reset final diagnosis
@@ -64,6 +73,57 @@ function resetAnalysisUI() {
     finalDiagnosis.progress.style.width = '0%';
     finalDiagnosis.content.classList.add('hidden');
     finalDiagnosis.content.innerHTML = '';
+    delete finalDiagnosis.content.dataset.renderedLength;
+}
+
+function startStatusStream() {
+    if (!window.EventSource) {
+        startStatusPolling();
+        return;
+    }
+    if (statusEventSource) {
+        statusEventSource.close();
+    }
+
+    // Local copy of the status, patched by incremental events
+    const status = { results: {} };
+    const source = new EventSource(`/events/${currentAnalysisId}`);
+    statusEventSource = source;
+
+    source.addEventListener('state', (event) => {
+        Object.assign(status, JSON.parse(event.data));
+        updateAnalysisStatus(status);
+    });
+
+    source.addEventListener('chunk', (event) => {
+        const data = JSON.parse(event.data);
+        status.results[data.agent] = (status.results[data.agent] || '') + data.text;
+        updateAnalysisStatus(status);
+    });
+
+    source.addEventListener('result', (event) => {
+        const data = JSON.parse(event.data);
+        status.results[data.agent] = data.text;
+        updateAnalysisStatus(status);
+    });
+
+    source.addEventListener('done', (event) => {
+        source.close();
+        statusEventSource = null;
+        const data = JSON.parse(event.data);
+        status.status = data.status;
+        status.error = data.error;
+        finishAnalysis(status);
+    });
+
+    source.onerror = () => {
+        // Stream unavailable or dropped: fall back to polling
+        source.close();
+        statusEventSource = null;
+        if (analysisInProgress) {
+            startStatusPolling();
+        }
+    };
 }
 
 function startStatusPolling() {
@@ -80,17 +140,7 @@ function startStatusPolling() {
 
             if (status.status === 'completed' || status.status === 'error') {
                 clearInterval(statusCheckInterval);
-                analysisInProgress = false;
-                analyzeBtn.disabled = false;
-                analyzeBtn.textContent = '🔍 Analyze Another Report';
-                
-                if (status.status === 'completed') {
-                    // Add to history
-                    addToHistory(currentFile.name, status.results);
-                    loadAnalysisHistory();
-                } else if (status.status === 'error') {
-                    showError('Analysis failed: ' + (status.error || 'Unknown error'));
-                }
+                finishAnalysis(status);
             }
         } catch (error) {
             console.error('Status check failed:', error);
@@ -98,9 +148,31 @@ function startStatusPolling() {
     }, 1000);
 }
 
+function finishAnalysis(status) {
+    analysisInProgress = false;
+    analyzeBtn.disabled = false;
+    analyzeBtn.textContent = '🔍 Analyze Another Report';
+    
+    if (status.status === 'completed') {
+        // Add to history
+        addToHistory(currentFile.name, status.results);
+        loadAnalysisHistory();
+    } else if (status.status === 'error') {
+        showError('Analysis failed: ' + (status.error || 'Unknown error'));
+    }
+}
+
 function updateAnalysisStatus(status) {
     if (!status.agent_progress) return;
 
+    // Waiting for a free analysis slot
+    if (status.status === 'queued' && status.queue_position) {
+        const wait = status.estimated_wait_seconds ? `, ~${status.estimated_wait_seconds}s` : '';
+        analyzeBtn.innerHTML = `<span class="loading-spinner"></span> Queued (position ${status.queue_position}${wait})`;
+    } else if (analysisInProgress && status.status !== 'completed' && status.status !== 'error') {
+        analyzeBtn.innerHTML = '<span class="loading-spinner"></span> Analyzing with AI...';
+    }
+
     // Update individual agents
     Object.keys(agents).forEach(agentKey => {
         const agentStatus = status.agent_progress[agentKey];
@@ -112,18 +184,24 @@ function updateAnalysisStatus(status) {
             const statusText = {
                 'waiting': 'Waiting for analysis...',
                 'processing': '🔄 Analyzing with AI...',
-                'completed': '✅ Analysis completed'
+                'completed': '✅ Analysis completed',
+                'skipped': '⏭️ Not relevant to this report'
             };
             agentUI.statusText.textContent = statusText[agentStatus.status] || agentStatus.status;
             agentUI.progress.style.width = (agentStatus.progress || 0) + '%';
 
-            if (agentStatus.status === 'completed' && status.results) {
+            // Routed away from this report: say so instead of leaving an empty card
+            if (agentStatus.status === 'skipped' && !agentUI.content.dataset.skipped) {
+                agentUI.content.dataset.skipped = 'true';
+                agentUI.content.textContent = 'This specialist was not needed for this report.';
+                agentUI.content.classList.remove('hidden');
+            }
+
+            if ((agentStatus.status === 'completed' || agentStatus.status === 'processing') && status.results) {
                 const agentName = agentKey.charAt(0).toUpperCase() + agentKey.slice(1);
                 const result = status.results[agentName];
                 if (result) {
-                    agentUI.content.innerHTML = formatMedicalText(result);
-                    agentUI.content.classList.remove('hidden');
-                    agentUI.content.classList.add('fade-in');
+                    renderAgentText(agentUI.content, result, agentStatus.status === 'completed');
                 }
             }
         }
@@ -142,10 +220,24 @@ function updateAnalysisStatus(status) {
         finalDiagnosis.statusText.textContent = statusText[finalStatus.status] || finalStatus.status;
         finalDiagnosis.progress.style.width = (finalStatus.progress || 0) + '%';
 
-        if (finalStatus.status === 'completed' && status.results && status.results.FinalDiagnosis) {
-            finalDiagnosis.content.innerHTML = formatMedicalText(status.results.FinalDiagnosis);
-            finalDiagnosis.content.classList.remove('hidden');
-            finalDiagnosis.content.classList.add('fade-in');
+        if ((finalStatus.status === 'completed' || finalStatus.status === 'processing') &&
+            status.results && status.results.FinalDiagnosis) {
+            renderAgentText(finalDiagnosis.content, status.results.FinalDiagnosis, finalStatus.status === 'completed');
         }
     }
+}
+
+// Render streamed (partial) or final agent text, re-rendering only when it changed
+function renderAgentText(container, text, isFinal) {
+    if (container.dataset.renderedLength === String(text.length) && container.dataset.final === String(isFinal)) {
+        return;
+    }
+    container.innerHTML = formatMedicalText(text);
+    container.dataset.renderedLength = String(text.length);
+    container.dataset.final = String(isFinal);
+    container.classList.remove('hidden');
+    container.classList.toggle('streaming', !isFinal);
+    if (isFinal) {
+        container.classList.add('fade-in');
+    }
 }
\ No newline at end of file
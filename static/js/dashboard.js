@@ -5,6 +5,7 @@ let currentFile = null;
 let analysisInProgress = false;
 let currentAnalysisId = null;
 let statusCheckInterval = null;
+let statusEventSource = null;
 let analysisHistory = [];
 
 // DOM elements
@@ -177,6 +178,10 @@ function resetAnalysisState() {
     if (statusCheckInterval) {
         clearInterval(statusCheckInterval);
     }
+    if (statusEventSource) {
+        statusEventSource.close();
+        statusEventSource = null;
+    }
 }
 
 // Initialize event listeners
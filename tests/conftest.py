@@ -0,0 +1,30 @@
+import os
+import sys
+import importlib
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+# Fast, deterministic model stand-in with no rate limiting
+for name, value in {'MODEL_BACKEND': 'local', 'LOCAL_MODEL_LATENCY': 'fixed:0', 'LOCAL_MODEL_CHUNK_DELAY': '0',
+                    'LLM_RPM': '0', 'LLM_CACHE_ENABLED': ''}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory so results/, uploads/ and cache/ stay out of the repo"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('RESULTS_INDEX_PATH', str(tmp_path / 'results_index.sqlite3'))
+    import Utils.ResultsIndex as results_index
+    monkeypatch.setattr(results_index, '_default_index', None)
+    return tmp_path
+
+
+@pytest.fixture
+def app_module(workdir):
+    """app.py, imported once; the working directory is a fresh one per test"""
+    module = sys.modules.get('app') or importlib.import_module('app')
+    os.makedirs('results', exist_ok=True)
+    return module
@@ -0,0 +1,28 @@
+from Utils.AnalysisEngine import AnalysisEngine
+from Utils.BatchRunner import BatchRunner, output_folder_name
+
+
+def test_document_without_a_diagnosis_is_failed_and_retried(workdir, monkeypatch):
+    (workdir / "reports").mkdir()
+    (workdir / "reports" / "report.txt").write_text("Patient reports chest pain.", encoding="utf-8")
+    engine = AnalysisEngine()
+
+    async def analyze(medical_report, **kwargs):
+        return {'Cardiologist': None}, None  # every model call failed
+
+    monkeypatch.setattr(engine, 'analyze', analyze)
+    runner = BatchRunner(engine, output_dir=str(workdir / "out"), extract_workers=1)
+    summary = runner.run(str(workdir / "reports"))
+    assert (summary['completed'], summary['failed']) == (0, 1)
+
+    rerun = BatchRunner(engine, output_dir=str(workdir / "out"), extract_workers=1)
+    root, documents = str(workdir / "reports"), [str(workdir / "reports" / "report.txt")]
+    assert len(rerun.plan(root, documents)) == 1
+
+
+def test_output_folders_are_distinct_for_similar_paths():
+    root = "reports"
+    paths = ["report.pdf", "report.PDF", "a b.pdf", "a_b.pdf", "a/b__c.pdf", "a__b/c.pdf"]
+    folders = [output_folder_name(root, f"{root}/{path}") for path in paths]
+    assert len(set(folders)) == len(paths)
+    assert folders[0] == output_folder_name(root, "reports/report.pdf")
@@ -0,0 +1,41 @@
+import json
+
+from Utils.ExtractionCache import ExtractionCache
+
+
+def entry_bytes(result, formatted):
+    return len(json.dumps({'result': result, 'formatted': formatted}, ensure_ascii=False).encode('utf-8'))
+
+
+def test_hits_misses_and_key_changes_with_the_extractor_version(tmp_path):
+    report = tmp_path / "report.pdf"
+    report.write_bytes(b"%PDF-1.4 fake")
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    key = cache.make_key(str(report), "5")
+    assert cache.get(key) is None
+
+    cache.put(key, {'success': True, 'text': "Chest pain"}, "Medical Report:\nChest pain")
+    assert cache.get(key)['formatted'] == "Medical Report:\nChest pain"
+    assert cache.get(cache.make_key(str(report), "6")) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 2, 0.333)
+
+
+def test_least_recently_used_entries_are_evicted_over_the_byte_budget(tmp_path):
+    result, formatted = {'text': "x" * 100}, "y" * 100
+    size = entry_bytes(result, formatted)
+    cache = ExtractionCache(str(tmp_path), max_bytes=2 * size)
+    cache.put('a', result, formatted)
+    cache.put('b', result, formatted)
+    cache.get('a')  # 'b' is now the least recently used
+    cache.put('c', result, formatted)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    stats = cache.stats()
+    assert (stats['evictions'], stats['entries'], stats['total_bytes']) == (1, 2, 2 * size)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.json', 'c.json']
+
+    # The budget and LRU contents survive a restart
+    reopened = ExtractionCache(str(tmp_path), max_bytes=size)
+    assert reopened.stats()['entries'] == 1
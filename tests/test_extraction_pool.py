@@ -0,0 +1,27 @@
+import os
+import sys
+import subprocess
+import multiprocessing
+
+import pytest
+
+from Utils.ExtractionPool import _Worker
+
+
+@pytest.mark.skipif(not hasattr(os, 'killpg'), reason="process groups are POSIX only")
+def test_killing_a_worker_kills_the_processes_it_started():
+    worker = _Worker(multiprocessing.get_context('spawn'))
+    ocr = None
+    try:
+        worker.wait_ready(60)
+        # Stands in for an OCR pool process the worker started: same process group
+        ocr = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'],
+                               preexec_fn=lambda: os.setpgid(0, worker.process.pid))
+        worker.stop(graceful=False)
+        assert ocr.wait(10) is not None
+        assert not worker.process.is_alive()
+    finally:
+        if ocr is not None and ocr.poll() is None:
+            ocr.kill()
+        if worker.process.is_alive():
+            worker.process.kill()
@@ -0,0 +1,59 @@
+import re
+import random
+
+from Utils.FormFields import DEFAULT_FIELDS, SCAN_BLOCK, FormFieldExtractor
+
+LABELS = [label for _, labels, _ in DEFAULT_FIELDS for label in labels]
+VALUES = ['John Smith', '12/03/1985', '4-7-21', '42', 'M', 'Female', '80412', 'Ward B', 'chest pain, dizziness.',
+          'fracture', '']
+SEPARATORS = ['', ' ', ': ', ':\n', '\t', '  :  ']
+# Non-ASCII text switches the scanner to its IGNORECASE path; the Kelvin sign and long s case-fold to k / s
+NOISE = ['the', 'patient', 'ward', '\n', '.', ',', 'é', 'İ', 'ß', 'K', 'ſ', 'Ä°', '🙂', '12']
+
+
+def legacy_extract(text, fields=DEFAULT_FIELDS):
+    """The per-field re.search loop FormFieldExtractor replaced"""
+    found = {}
+    for name, labels, value_pattern in fields:
+        pattern = rf"(?:{'|'.join(re.escape(label) for label in labels)})[\s:]*({value_pattern})"
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            found[name] = match.group(1).strip()
+    return found
+
+
+def random_label(rng):
+    label = rng.choice(LABELS)
+    return rng.choice([label, label.lower(), label.upper(), label.swapcase()])
+
+
+def random_text(rng):
+    parts = []
+    for _ in range(rng.randint(0, 30)):
+        roll = rng.random()
+        if roll < 0.3:
+            parts.append(random_label(rng) + rng.choice(SEPARATORS) + rng.choice(VALUES))
+        elif roll < 0.35:
+            # Put a label across a scan block boundary
+            parts.append('x' * (SCAN_BLOCK - rng.randint(1, 12)))
+        else:
+            parts.append(rng.choice(NOISE))
+    return rng.choice([' ', '\n', '']).join(parts)
+
+
+def test_extract_matches_the_legacy_regex_loop():
+    rng = random.Random(1234)
+    extractor = FormFieldExtractor(DEFAULT_FIELDS)
+    for _ in range(1500):
+        text = random_text(rng)
+        assert extractor.extract(text) == legacy_extract(text), repr(text)
+
+
+def test_registered_fields_match_the_legacy_regex_loop():
+    rng = random.Random(99)
+    fields = DEFAULT_FIELDS + [('blood_pressure', ['BP', 'Blood Pressure'], r'\d{2,3}/\d{2,3}')]
+    extractor = FormFieldExtractor(DEFAULT_FIELDS)
+    extractor.register('blood_pressure', ['BP', 'Blood Pressure'], r'\d{2,3}/\d{2,3}')
+    for _ in range(300):
+        text = random_text(rng) + rng.choice(['', ' BP: 120/80', ' blood pressure 90/60', ' bp'])
+        assert extractor.extract(text) == legacy_extract(text, fields), repr(text)
@@ -0,0 +1,32 @@
+import io
+
+import pytest
+
+from Utils.JobQueue import JobQueue, QueueFullError
+
+
+def test_admit_rejects_past_max_depth_with_a_retry_hint():
+    queue = JobQueue(max_depth=2, max_in_flight=2, initial_duration=30)
+    queue.admit('a')
+    queue.admit('b')
+    with pytest.raises(QueueFullError) as rejected:
+        queue.admit('c')
+    assert rejected.value.retry_after == 15  # one job's duration spread over the in-flight slots
+    assert queue.position('b') == 2 and queue.position('c') is None
+
+    queue.cancel('a')
+    queue.admit('c')
+    assert queue.stats()['queued'] == 2
+
+
+def test_upload_is_rejected_with_429_and_retry_after(app_module, monkeypatch):
+    queue = JobQueue(max_depth=1, max_in_flight=1, initial_duration=12)
+    queue.admit('waiting')
+    monkeypatch.setattr(app_module.analysis_manager, 'queue', queue)
+
+    response = app_module.app.test_client().post(
+        '/upload', data={'file': (io.BytesIO(b"Patient reports chest pain."), 'report.txt')})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '12'
+    assert response.get_json()['retry_after'] == 12
+    assert queue.stats()['queued'] == 1
@@ -0,0 +1,17 @@
+import Utils.LocalModel as local_model
+from Utils.LocalModel import LocalModel
+
+
+def test_attempt_counts_are_bounded_and_keep_recent_prompts(monkeypatch):
+    monkeypatch.setattr(local_model, 'MAX_TRACKED_PROMPTS', 3)
+    model = LocalModel(latency="uniform:0,1", error_rate=0.5, seed="7")
+    first = model._draw("prompt 0")
+    retry = model._draw("prompt 0")
+    for i in range(1, 10):
+        model._draw(f"prompt {i}")
+    assert len(model._attempts) == 3
+    assert model._attempts[model._digest("prompt 9")] == 1
+
+    # A forgotten prompt starts again from its first attempt
+    assert model._draw("prompt 0") == first
+    assert retry != first
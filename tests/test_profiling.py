@@ -0,0 +1,26 @@
+import asyncio
+import tracemalloc
+
+from Utils.Profiling import AnalysisProfiler
+
+
+async def _work():
+    return sum(range(1000))
+
+
+def test_tracing_started_elsewhere_is_left_running(tmp_path):
+    tracemalloc.start()
+    try:
+        assert asyncio.run(AnalysisProfiler('a', output_dir=str(tmp_path)).run(_work())) == sum(range(1000))
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_profiler_stops_the_tracing_it_started(tmp_path):
+    profiler = AnalysisProfiler('a', output_dir=str(tmp_path))
+    asyncio.run(profiler.run(_work()))
+    assert not tracemalloc.is_tracing()
+    files = profiler.save()
+    summary = (tmp_path / files['summary']).read_text(encoding='utf-8')
+    assert 'cProfile.py' not in summary.split('Top 25 functions')[0]
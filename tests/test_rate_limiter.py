@@ -0,0 +1,94 @@
+import time
+import asyncio
+
+import pytest
+
+from Utils.RateLimiter import RateLimiter
+
+
+class FakeStream:
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_hedged_loser_that_finished_has_its_stream_closed():
+    limiter = RateLimiter(rpm=0, tpm=0, max_retries=0, hedge_percentile=50, hedge_budget=1.0)
+    for _ in range(20):
+        limiter._tracker('first_chunk').record(0.01)
+    streams = []
+    hedged = None
+
+    async def open_stream():
+        stream = FakeStream()
+        streams.append(stream)
+        # The primary is slow enough to be hedged, then both answer in the same wakeup
+        if len(streams) == 2:
+            hedged.set()
+        await hedged.wait()
+        return 'first chunk', stream
+
+    async def run():
+        nonlocal hedged
+        hedged = asyncio.Event()
+        result = await limiter.call(open_stream, kind='first_chunk')
+        await asyncio.sleep(0.1)  # let the losing attempt finish and be closed
+        return result
+
+    first, winner = asyncio.run(run())
+    assert len(streams) == 2
+    assert not winner.closed
+    assert [stream.closed for stream in streams if stream is not winner] == [True]
+
+
+def test_call_sync_times_out_a_hung_call():
+    limiter = RateLimiter(rpm=0, tpm=0, max_retries=0, call_timeout=0.1)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        limiter.call_sync(lambda: time.sleep(5))
+    assert time.monotonic() - started < 2
+    assert limiter.stats()['failures'] == 1
+    assert limiter.stats()['abandoned_calls'] == 1
+
+
+def test_stream_that_stalls_after_the_first_chunk_times_out():
+    from Utils.Agents import Cardiologist
+
+    class Chunk:
+        text = "Sinus rhythm. "
+
+    class StalledStream:
+        def __init__(self):
+            self.sent = False
+            self.closed = False
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            if self.sent:
+                await asyncio.sleep(60)
+            self.sent = True
+            return Chunk()
+
+        async def aclose(self):
+            self.closed = True
+
+    class Model:
+        def __init__(self):
+            self.response = StalledStream()
+
+        async def generate_content_async(self, prompt, stream=False):
+            return self.response
+
+    agent = Cardiologist("Patient reports palpitations.")
+    agent.model = Model()
+    agent.rate_limiter = RateLimiter(rpm=0, tpm=0, max_retries=0, call_timeout=0.1)
+    chunks = []
+    started = time.monotonic()
+    assert asyncio.run(agent.run_stream_async(lambda text, tokens: chunks.append(text), use_cache=False)) is None
+    assert time.monotonic() - started < 2
+    assert chunks == [Chunk.text]
+    assert agent.model.response.closed
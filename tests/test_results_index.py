@@ -0,0 +1,41 @@
+import sqlite3
+from datetime import datetime
+
+from Utils.ResultsIndex import ResultsIndex, get_results_index
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2026, 1, 2, 3, 4, 5)
+
+
+def test_analyses_finishing_in_the_same_second_keep_both_results(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'datetime', _FrozenDatetime)
+    analysis_ids = ['analysis_20260102_030405_aaaaaa', 'analysis_20260102_030405_bbbbbb']
+    for analysis_id in analysis_ids:
+        app_module.analysis_manager._save_results(analysis_id, {'Cardiologist': 'ok'}, f"Diagnosis {analysis_id}")
+
+    results, _ = get_results_index().page(limit=10)
+    assert sorted(result['analysis_id'] for result in results) == analysis_ids
+    for result in results:
+        with open(f"results/{result['file']}", encoding="utf-8") as f:
+            assert result['analysis_id'] in f.read()
+
+
+def test_index_keyed_on_filename_is_migrated(workdir):
+    db_path = str(workdir / 'old.sqlite3')
+    (workdir / 'results').mkdir()
+    (workdir / 'results' / '20250101_120000_final_diagnosis.txt').write_text('old')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE results (filename TEXT PRIMARY KEY, analysis_id TEXT, original_filename TEXT, "
+                 "created_at REAL NOT NULL, size INTEGER NOT NULL, modified REAL NOT NULL)")
+    conn.execute("INSERT INTO results VALUES ('20250101_120000_final_diagnosis.txt', 'analysis_old', 'scan.pdf', "
+                 "1735732800.0, 3, 1735732800.0)")
+    conn.commit()
+    conn.close()
+
+    index = ResultsIndex(db_path=db_path, results_dir='results')
+    assert index.rebuild() == 1
+    results, _ = index.page()
+    assert [(r['analysis_id'], r['filename']) for r in results] == [('analysis_old', 'scan.pdf')]
@@ -0,0 +1,31 @@
+from Utils.AnalysisEngine import AnalysisEngine, PipelineHooks
+from Utils.SpecialistRouter import SpecialistRouter
+
+REPORT = "Patient reports stress at work."
+
+
+class _RoutingRecorder(PipelineHooks):
+    def __init__(self):
+        self.decision = None
+
+    def on_routing(self, decision):
+        self.decision = decision
+
+
+def _selected(structured_data):
+    engine = AnalysisEngine()
+    hooks = _RoutingRecorder()
+    engine.run(engine.analyze(REPORT, use_cache=False, hooks=hooks, structured_data=structured_data))
+    return hooks.decision['selected']
+
+
+def test_boosted_field_scores_double():
+    router = SpecialistRouter()
+    plain = router.score(REPORT + " Symptoms: palpitations")
+    boosted = router.score(REPORT, {'symptoms': 'palpitations'})
+    assert boosted['Cardiologist'] == 2 * plain['Cardiologist']
+
+
+def test_boosted_field_changes_selection(workdir):
+    assert _selected(None) == ['Psychologist']
+    assert _selected({'symptoms': 'palpitations'}) == ['Cardiologist']
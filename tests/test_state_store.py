@@ -0,0 +1,68 @@
+import threading
+from types import SimpleNamespace
+
+from Utils.StateStore import StateStore
+
+
+def test_update_wakes_only_that_analysis_listeners(tmp_path):
+    store = StateStore(persist_dir=str(tmp_path))
+    busy = store.create('busy', 'busy.pdf', ['Cardiologist'])
+    store.create('idle', 'idle.pdf', ['Cardiologist'])
+    idle_version = store.version('idle')
+    wakeups = []
+    waiting = threading.Event()
+    original = store._conditions['idle'].wait
+
+    def wait(timeout=None):
+        waiting.set()
+        wakeups.append(timeout)
+        return original(timeout)
+
+    store._conditions['idle'].wait = wait
+    listener = threading.Thread(target=store.wait_for_change, args=('idle', idle_version, 0.5))
+    listener.start()
+    waiting.wait(1)
+    for i in range(20):
+        store.append_result(busy, 'Cardiologist', f"chunk {i} ")
+    listener.join()
+    assert len(wakeups) == 1  # waited once and timed out; no wakeups from the busy analysis
+
+
+def test_wait_for_change_returns_on_update_and_eviction(tmp_path):
+    store = StateStore(persist_dir=str(tmp_path), ttl_seconds=0)
+    record = store.create('a1', 'a1.pdf', ['Cardiologist'])
+    seen = store.version('a1')
+    threading.Timer(0.05, store.append_result, (record, 'Cardiologist', "text")).start()
+    assert store.wait_for_change('a1', seen, timeout=5) == seen + 1
+
+    store.finish(record, 'completed')
+    seen = store.version('a1')
+    threading.Timer(0.05, store.get, ('a1',)).start()  # any read evicts past the TTL
+    assert store.wait_for_change('a1', seen, timeout=5) == -1
+
+
+def test_finished_records_are_evicted_by_count_and_served_from_disk(tmp_path):
+    store = StateStore(persist_dir=str(tmp_path), ttl_seconds=3600, max_finished=2)
+    for analysis_id in ('a1', 'a2', 'a3'):
+        store.finish(store.create(analysis_id, f'{analysis_id}.pdf', ['Cardiologist']), 'completed')
+    running = store.create('a4', 'a4.pdf', ['Cardiologist'])
+
+    assert store.get('a1') is None  # oldest finished record dropped from memory
+    assert store.get('a3') is not None and store.get('a4') is running
+    assert store.get_status('a1')['status'] == 'completed'  # still served from its status file
+    assert store.memory_footprint()['evictions'] == 1
+
+
+def test_finished_records_are_evicted_after_the_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('Utils.StateStore.time', SimpleNamespace(monotonic=lambda: now[0]))
+    store = StateStore(persist_dir=str(tmp_path), ttl_seconds=60, max_finished=100)
+    store.finish(store.create('done', 'done.pdf', ['Cardiologist']), 'failed', error='boom')
+    store.create('running', 'running.pdf', ['Cardiologist'])
+
+    now[0] += 59
+    assert store.get('done') is not None
+    now[0] += 2
+    assert store.get('done') is None
+    assert store.get('running') is not None  # unfinished analyses are never evicted
+    assert store.get_status('done')['error'] == 'boom'
@@ -0,0 +1,34 @@
+from Utils.Agents import MultidisciplinaryTeam
+from Utils.AnalysisEngine import AnalysisEngine
+
+REPORT = "Patient reports chest pain, palpitations and panic attacks."
+
+
+def test_team_reviews_the_report_when_every_specialist_failed():
+    prompt = MultidisciplinaryTeam({'Cardiologist': None, 'Psychologist': None}, medical_report=REPORT).build_prompt()
+    assert f"Medical Report:\n{REPORT}" in prompt
+    assert "None" not in prompt
+
+
+def test_team_uses_findings_when_a_specialist_answered():
+    prompt = MultidisciplinaryTeam({'Cardiologist': "- Sinus tachycardia", 'Psychologist': None},
+                                   medical_report=REPORT).build_prompt()
+    assert "Cardiologist Findings:" in prompt
+    assert REPORT not in prompt
+
+
+def test_engine_falls_back_to_the_report_when_specialists_fail(workdir, monkeypatch):
+    engine = AnalysisEngine()
+    team_prompts = []
+
+    async def run_agent(agent, use_cache=True, on_chunk=None):
+        if isinstance(agent, MultidisciplinaryTeam):
+            team_prompts.append(agent.build_prompt())
+            return "Final diagnosis"
+        return None  # every specialist call failed
+
+    monkeypatch.setattr(engine, 'run_agent', run_agent)
+    responses, final_diagnosis = engine.run(engine.analyze(REPORT, use_cache=False, run_all=True))
+    assert set(responses.values()) == {None}
+    assert final_diagnosis == "Final diagnosis"
+    assert REPORT in team_prompts[0]